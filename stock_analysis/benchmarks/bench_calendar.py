@@ -0,0 +1,70 @@
+"""Panel alignment: pandas outer join versus trading-calendar offset maps.
+
+Each synthetic ticker keeps only its own bars (late listings and gaps of
+bench_parallel_metrics), as the price CSVs do. The panel is aligned with
+pd.concat, with align_prices() building the calendar, and as a bare gather
+with the calendar and offset maps built once beforehand.
+
+Usage (from stock_analysis/):
+    python benchmarks/bench_calendar.py --tickers 600 --days 2520 --repeat 5
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parallel_metrics import synthetic_prices  # noqa: E402
+from bist_risk.metrics_engine import align_prices  # noqa: E402
+from bist_risk.trading_calendar import TradingCalendar  # noqa: E402
+
+
+def best_of(repeat, func):
+    """Fastest of ``repeat`` calls in seconds, and the last result."""
+    best = np.inf
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tickers', type=int, default=600)
+    parser.add_argument('--days', type=int, default=2520)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    prices = synthetic_prices(args.tickers, args.days)
+    dates = pd.bdate_range('2015-01-01', periods=args.days, name='Date')
+    series = {}
+    for j in range(args.tickers):
+        valid = ~np.isnan(prices[:, j])
+        series[f"S{j:05d}.IS"] = pd.Series(prices[valid, j], index=dates[valid], name='Close')
+    data = {stock: close.to_frame() for stock, close in series.items()}
+
+    concat_s, panel = best_of(args.repeat, lambda: pd.concat(series, axis=1, sort=True))
+    align_s, (_, _, aligned) = best_of(args.repeat, lambda: align_prices(data))
+    indexes = [close.index for close in series.values()]
+    build_s, (calendar, offsets) = best_of(args.repeat, lambda: TradingCalendar.with_offsets(indexes))
+    columns = [close.to_numpy() for close in series.values()]
+    gather_s, gathered = best_of(args.repeat, lambda: calendar.gather(columns, offsets))
+
+    identical = np.array_equal(panel.to_numpy(), aligned, equal_nan=True) and np.array_equal(aligned, gathered,
+                                                                                             equal_nan=True)
+    missing = int(sum(offset.missing for offset in offsets))
+    print(f"{args.tickers} hisse x {len(calendar)} bar, {missing} eksik bar (en iyi {args.repeat} ölçüm)")
+    print(f"{'yöntem':<28} {'saniye':>9}")
+    for label, seconds in [('pd.concat', concat_s), ('align_prices', align_s), ('takvim ve ofset haritaları', build_s),
+                           ('yalnızca toplama (gather)', gather_s)]:
+        print(f"{label:<28} {seconds:9.4f}")
+    print(f"Sonuçlar aynı: {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Import-time budget for the CLI and the analysis scripts, measured with ``python -X importtime``.
+
+Each module is imported in a fresh interpreter from an empty working
+directory. The check fails (exit code 1) if the import takes longer than
+the budget, pulls in one of the heavy libraries, or creates files.
+
+Usage (from stock_analysis/):
+    python benchmarks/bench_import_time.py --budget-ms 50
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must only be imported by the stage that uses them
+HEAVY_MODULES = ('numpy', 'pandas', 'scipy', 'matplotlib', 'seaborn', 'yfinance')
+
+
+def import_profile(module):
+    """Run ``import module`` under -X importtime.
+
+    Returns ``(cumulative, created)``: cumulative microseconds of the module
+    and of everything imported beneath it, and files created in the cwd.
+    """
+    env = dict(os.environ, PYTHONPATH=SCRIPT_DIR)
+    with tempfile.TemporaryDirectory() as cwd:
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                              cwd=cwd, env=env, capture_output=True, text=True, check=True)
+        created = os.listdir(cwd)
+
+    # Children are listed before their parent; the last top-level entry
+    # is the module itself, preceded by everything it imported
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name.rstrip()
+        if not name.startswith('  ') and name.strip() != module:
+            # A new top-level import; keep the parent packages of ``module``
+            if not module.startswith(name.strip() + '.'):
+                cumulative = {}
+            continue
+        cumulative[name.strip()] = int(cumulative_us)
+    return cumulative, created
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modules', nargs='+', default=['bist_risk.cli', 'bist30_analysis', 'stock_analysis'])
+    parser.add_argument('--budget-ms', type=float, default=50.0)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        runs = [import_profile(module) for _ in range(args.repeat)]
+        cumulative, created = min(runs, key=lambda run: run[0][module])
+        elapsed_ms = cumulative[module] / 1000
+        heavy = sorted(name for name in cumulative if name.split('.')[0] in HEAVY_MODULES)
+        problems = []
+        if elapsed_ms > args.budget_ms:
+            problems.append(f'bütçe aşıldı ({args.budget_ms:.0f} ms)')
+        if heavy:
+            problems.append(f"ağır modüller: {', '.join(sorted({name.split('.')[0] for name in heavy}))}")
+        if created:
+            problems.append(f"oluşturulan dosyalar: {', '.join(created)}")
+        failed = failed or bool(problems)
+
+        slowest = sorted((name for name in cumulative if name != module),
+                         key=cumulative.get, reverse=True)[:5]
+        print(f"{module:18s} {elapsed_ms:7.1f} ms  {'HATA: ' + '; '.join(problems) if problems else 'OK'}")
+        for name in slowest:
+            print(f"    {name:30s} {cumulative[name] / 1000:7.1f} ms")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
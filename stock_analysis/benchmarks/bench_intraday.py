@@ -0,0 +1,92 @@
+"""Intraday scale: streaming bar resampling and the column-blocked metric engine at 100x the daily rows.
+
+The resampling half writes one synthetic minute-bar CSV and builds each
+interval's bars from it, once from the whole file in memory and once a
+chunk at a time (BarResampler). The engine half computes the metrics of
+a daily and a ``--bars``-per-day price matrix, unblocked and in column
+blocks, reporting the time and tracemalloc peak of each.
+
+Usage (from stock_analysis/):
+    python benchmarks/bench_intraday.py --tickers 300 --days 1260 --bars 96 --resample-days 250
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parallel_metrics import synthetic_prices  # noqa: E402
+from synthetic_data import synthetic_ohlcv, write_stock_csv  # noqa: E402
+from bist_risk.bars import resample_bars, resample_csv  # noqa: E402
+from bist_risk.data_loader import read_stock_csv  # noqa: E402
+from bist_risk.metrics_engine import BLOCK_BYTES, compute_universe_metrics  # noqa: E402
+
+
+def measure(func):
+    """``(seconds, peak MB, result)`` of one call under tracemalloc."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 2**20, result
+
+
+def bench_resample(days, intervals, chunk_rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'S00000_IS.csv')
+        index, bars = synthetic_ohlcv(1, days, '1min')
+        write_stock_csv(path, 'S00000.IS', index, {field: values[:, 0] for field, values in bars.items()},
+                        'Datetime')
+        print(f"Yeniden örnekleme: {days} gün x 480 dakika bar ({os.path.getsize(path) / 2**20:.1f} MB CSV)")
+        print(f"{'aralık':>7} {'bar':>8} {'tümü s':>8} {'tümü MB':>8} {'akış s':>8} {'akış MB':>8} {'aynı':>6}")
+        for interval in intervals:
+            whole_s, whole_mb, whole = measure(lambda: resample_bars(read_stock_csv(path), interval))
+            stream_s, stream_mb, stream = measure(lambda: resample_csv(path, interval, chunk_rows))
+            identical = whole.equals(stream)
+            print(f"{interval:>7} {len(stream):>8} {whole_s:8.2f} {whole_mb:8.1f} {stream_s:8.2f} {stream_mb:8.1f}"
+                  f" {str(identical):>6}")
+
+
+def bench_engine(tickers, days, bars_per_day):
+    print(f"\nMetrik motoru: {tickers} hisse (blok: {BLOCK_BYTES / 2**20:.0f} MB fiyat)")
+    print(f"{'satır':>9} {'matris MB':>10} {'blok':>6} {'saniye':>8} {'tepe MB':>8} {'aynı':>6}")
+    for rows in (days, days * bars_per_day):
+        prices = synthetic_prices(tickers, rows)
+        dates = pd.date_range('2015-01-01', periods=rows, freq='min').values
+        expected = None
+        # A budget of the whole matrix is the unblocked engine
+        for block_bytes in dict.fromkeys((prices.nbytes, min(prices.nbytes, BLOCK_BYTES))):
+            seconds, peak, metrics = measure(lambda: compute_universe_metrics(prices, dates, block_bytes=block_bytes))
+            expected = expected or metrics
+            identical = all(np.array_equal(expected[key], metrics[key], equal_nan=metrics[key].dtype.kind == 'f')
+                            for key in expected if metrics[key].dtype.kind != 'M')
+            label = 'var' if prices.nbytes > block_bytes else 'yok'
+            print(f"{rows:>9} {prices.nbytes / 2**20:10.1f} {label:>6} {seconds:8.2f} {peak:8.1f}"
+                  f" {str(identical):>6}")
+            del metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tickers', type=int, default=300)
+    parser.add_argument('--days', type=int, default=1260)
+    parser.add_argument('--bars', type=int, default=96, help="Gün içi senaryoda gün başına bar sayısı")
+    parser.add_argument('--resample-days', type=int, default=250)
+    parser.add_argument('--intervals', nargs='+', default=['5m', '15m', '1h', '1d'])
+    parser.add_argument('--chunk-rows', type=int, default=100_000)
+    args = parser.parse_args()
+
+    bench_resample(args.resample_days, args.intervals, args.chunk_rows)
+    bench_engine(args.tickers, args.days, args.bars)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Speedup of the process-pool metric stage versus worker count.
+
+Usage (from stock_analysis/):
+    python benchmarks/bench_parallel_metrics.py --tickers 1000 --days 2520 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bist_risk.metrics_engine import compute_universe_metrics  # noqa: E402
+from bist_risk.parallel_metrics import compute_universe_metrics_parallel  # noqa: E402
+
+
+def synthetic_prices(tickers, days, seed=0):
+    """Geometric random-walk price matrix with some late listings and gaps."""
+    rng = np.random.default_rng(seed)
+    vol = rng.uniform(0.01, 0.04, tickers)
+    prices = 10 * np.exp(np.cumsum(rng.standard_normal((days, tickers)) * vol, axis=0))
+    listing = rng.integers(0, days // 2, tickers) * (rng.random(tickers) < 0.1)
+    prices[np.arange(days)[:, None] < listing] = np.nan
+    prices[rng.random((days, tickers)) < 0.002] = np.nan
+    return prices
+
+
+def best_of(func, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - started)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tickers', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=2520)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    prices = synthetic_prices(args.tickers, args.days)
+    dates = np.arange(args.days).astype('datetime64[D]')
+    print(f"{args.tickers} hisse x {args.days} gün, {os.cpu_count()} CPU")
+
+    serial, expected = best_of(lambda: compute_universe_metrics(prices, dates), args.repeat)
+    print(f"{'workers':>8} {'saniye':>10} {'hızlanma':>10} {'aynı':>6}")
+    print(f"{'seri':>8} {serial:10.3f} {1.0:10.2f} {'-':>6}")
+    for workers in args.workers:
+        seconds, result = best_of(
+            lambda: compute_universe_metrics_parallel(prices, dates, workers=workers), args.repeat)
+        identical = all(
+            np.array_equal(expected[key].view(np.int64) if expected[key].dtype.kind == 'M' else expected[key],
+                           result[key].view(np.int64) if result[key].dtype.kind == 'M' else result[key],
+                           equal_nan=expected[key].dtype.kind == 'f')
+            for key in expected
+        )
+        print(f"{workers:>8} {seconds:10.3f} {serial / seconds:10.2f} {str(identical):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""Time and peak memory of every pipeline stage on synthetic universes, as JSON with regression checks.
+
+For each ticker count a synthetic OHLCV universe is written in the format
+of data/*_IS.csv (see synthetic_data.py) and the pipeline is run on it
+stage by stage: CSV load, returns and metrics, per-stock max drawdown,
+risk ranking, sector summary, correlation matrix, summary report and
+plots. Each stage is timed in one pass and its tracemalloc peak
+(allocations above what was live when the stage started) is measured in
+a second pass, so the tracing overhead does not distort the timings.
+
+The results are written as JSON. Given a ``--baseline`` from an earlier
+run, every stage slower or larger than the thresholds in
+``pipeline_thresholds.json`` is reported and the exit code is 1.
+The growth column is the log-log slope of the stage time between two
+ticker counts: 1 is linear, above 1 is where the stage stops scaling.
+
+Usage (from stock_analysis/):
+    python benchmarks/bench_pipeline.py --tickers 30 300 3000 --days 1260 --output pipeline.json
+    python benchmarks/bench_pipeline.py --tickers 30 300 3000 --days 1260 --baseline pipeline.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_data import BAR_FREQUENCIES, write_universe  # noqa: E402
+from bist_risk.data_loader import load_cached_data  # noqa: E402
+from bist_risk.pipeline import calculate_max_drawdown, calculate_returns_and_metrics, create_risk_ranking  # noqa: E402
+from bist_risk.plotting import PLOT_MODES, render_figures  # noqa: E402
+from bist_risk.reporting import (create_correlation_matrix, create_sector_summary, figure_specs,  # noqa: E402
+                                 generate_summary_report)
+from bist_risk.universe import load_universes  # noqa: E402
+
+STAGES = ('load', 'metrics', 'drawdown', 'ranking', 'sector', 'correlation', 'report', 'plots')
+THRESHOLDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pipeline_thresholds.json')
+RESULTS_VERSION = 1
+
+
+def run_stages(universe_path, data_dir, plots, measure):
+    """Run every stage on the synthetic universe, calling each through ``measure(stage, func)``."""
+    universe = next(iter(load_universes(universe_path).values()))
+    all_data = measure('load', lambda: load_cached_data(universe, data_dir=data_dir)[0])
+    results = measure('metrics', lambda: calculate_returns_and_metrics(all_data, universe))
+    measure('drawdown', lambda: [calculate_max_drawdown(data['Close']) for data in all_data.values()])
+    risk_df = measure('ranking', lambda: create_risk_ranking(results, path='reports/risk_ranking.csv'))
+    sector_summary = measure('sector', lambda: create_sector_summary(risk_df, path='reports/sector_summary.csv'))
+    correlation_matrix = measure('correlation',
+                                 lambda: create_correlation_matrix(results, path='reports/correlation_matrix.csv'))
+    start = min(data.index[0] for data in all_data.values()).date()
+    end = max(data.index[-1] for data in all_data.values()).date()
+    measure('report', lambda: generate_summary_report(results, risk_df, start, end,
+                                                      path='reports/summary_report.md', label=universe.label))
+    if plots != 'none':
+        measure('plots', lambda: render_figures(
+            figure_specs(results, risk_df, sector_summary, correlation_matrix, label=universe.label),
+            mode=plots, workers=1))
+
+
+def timed_pass(universe_path, data_dir, plots):
+    """``{stage: seconds}`` of one pipeline run."""
+    seconds = {}
+
+    def measure(stage, func):
+        started = time.perf_counter()
+        result = func()
+        seconds[stage] = time.perf_counter() - started
+        return result
+
+    run_stages(universe_path, data_dir, plots, measure)
+    return seconds
+
+
+def memory_pass(universe_path, data_dir, plots):
+    """``{stage: (peak MB, retained MB)}`` of one pipeline run under tracemalloc.
+
+    The peak is the highest traced allocation during the stage above what
+    was live when it started; retained is what the stage left allocated.
+    """
+    megabytes = {}
+
+    def measure(stage, func):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+        megabytes[stage] = ((peak - before) / 2**20, (current - before) / 2**20)
+        return result
+
+    tracemalloc.start()
+    try:
+        run_stages(universe_path, data_dir, plots, measure)
+    finally:
+        tracemalloc.stop()
+    return megabytes
+
+
+def in_fresh_directory(func, *args):
+    """Run ``func`` in an empty working directory with reports/ and plots/, so nothing is skipped."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as work:
+        os.makedirs(os.path.join(work, 'reports'))
+        os.makedirs(os.path.join(work, 'plots'))
+        os.chdir(work)
+        try:
+            return func(*args)
+        finally:
+            os.chdir(cwd)
+
+
+def run(tickers, days, freq, plots):
+    """Measurements of one ticker count as ``{stage: {'seconds', 'peak_mb', 'retained_mb'}}``."""
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        universe_path = write_universe(tmp, tickers, days, freq)
+        generate_seconds = time.perf_counter() - started
+        data_dir = os.path.join(tmp, 'data')
+
+        # The stages print progress messages; keep the table readable
+        with open(os.devnull, 'w') as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                seconds = in_fresh_directory(timed_pass, universe_path, data_dir, plots)
+                megabytes = in_fresh_directory(memory_pass, universe_path, data_dir, plots)
+            finally:
+                sys.stdout = stdout
+
+    return {
+        'tickers': tickers,
+        'bars': days * BAR_FREQUENCIES[freq],
+        'generate_seconds': round(generate_seconds, 4),
+        'stages': {
+            stage: {'seconds': round(seconds[stage], 4),
+                    'peak_mb': round(megabytes[stage][0], 3),
+                    'retained_mb': round(megabytes[stage][1], 3)}
+            for stage in seconds
+        },
+    }
+
+
+def growth(runs, stage):
+    """Log-log slope of the stage time between consecutive ticker counts (None for the first)."""
+    slopes = [None]
+    for previous, current in zip(runs, runs[1:]):
+        before = previous['stages'].get(stage, {}).get('seconds')
+        after = current['stages'].get(stage, {}).get('seconds')
+        if before and after and current['tickers'] != previous['tickers']:
+            slopes.append(math.log(after / before) / math.log(current['tickers'] / previous['tickers']))
+        else:
+            slopes.append(None)
+    return slopes
+
+
+def regressions(results, baseline, thresholds):
+    """Human-readable lines for every stage over its time or memory threshold versus ``baseline``.
+
+    Runs are matched on ticker count, history length and frequency; stages below
+    ``min_seconds`` / ``min_mb`` in both runs are too small to compare.
+    """
+    if (baseline['days'], baseline['freq']) != (results['days'], results['freq']):
+        return []
+    previous = {entry['tickers']: entry for entry in baseline['runs']}
+    found = []
+    for entry in results['runs']:
+        if entry['tickers'] not in previous:
+            continue
+        for stage, now in entry['stages'].items():
+            before = previous[entry['tickers']]['stages'].get(stage)
+            if before is None:
+                continue
+            limits = {**thresholds, **thresholds.get('stages', {}).get(stage, {})}
+            checks = (('seconds', 'time_ratio', 'min_seconds', 's'), ('peak_mb', 'memory_ratio', 'min_mb', 'MB'))
+            for key, ratio, floor, unit in checks:
+                if max(now[key], before[key]) < limits[floor]:
+                    continue
+                if now[key] > before[key] * limits[ratio]:
+                    found.append(f"{entry['tickers']} hisse, {stage}: {before[key]:.3f} {unit} -> {now[key]:.3f} {unit}"
+                                 f" (sınır x{limits[ratio]:g})")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tickers', type=int, nargs='+', default=[30, 300, 1000])
+    parser.add_argument('--days', type=int, default=1260)
+    parser.add_argument('--freq', choices=list(BAR_FREQUENCIES), default='1d')
+    parser.add_argument('--plots', choices=PLOT_MODES, default='draft')
+    parser.add_argument('--output', help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument('--baseline', help="Karşılaştırılacak önceki JSON sonuçları")
+    parser.add_argument('--thresholds', default=THRESHOLDS_PATH, help="Gerileme sınırları (JSON)")
+    args = parser.parse_args()
+
+    results = {
+        'version': RESULTS_VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'days': args.days,
+        'freq': args.freq,
+        'plots': args.plots,
+        'runs': [run(tickers, args.days, args.freq, args.plots) for tickers in sorted(args.tickers)],
+    }
+
+    runs = results['runs']
+    stages = [stage for stage in STAGES if stage in runs[0]['stages']]
+    print(f"{args.days} gün x {BAR_FREQUENCIES[args.freq]} bar ({args.freq}), süre saniye, bellek MB (tracemalloc)")
+    print(f"{'aşama':>12} {'hisse':>7} {'saniye':>9} {'tepe MB':>9} {'kalan MB':>9} {'büyüme':>7}")
+    for stage in stages:
+        for entry, slope in zip(runs, growth(runs, stage)):
+            measured = entry['stages'][stage]
+            print(f"{stage:>12} {entry['tickers']:>7} {measured['seconds']:9.3f} {measured['peak_mb']:9.1f}"
+                  f" {measured['retained_mb']:9.1f} {'-' if slope is None else f'{slope:.2f}':>7}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Sonuçlar yazıldı: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        with open(args.thresholds, 'r', encoding='utf-8') as f:
+            thresholds = json.load(f)
+        found = regressions(results, baseline, thresholds)
+        for line in found:
+            print(f"Gerileme: {line}")
+        if found:
+            sys.exit(1)
+        print("✓ Gerileme yok")
+
+
+if __name__ == "__main__":
+    main()
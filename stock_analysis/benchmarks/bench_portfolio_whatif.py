@@ -0,0 +1,60 @@
+"""Cost of single-weight what-if queries: rank-one update versus recomputing w' C w.
+
+Usage (from stock_analysis/):
+    python benchmarks/bench_portfolio_whatif.py --tickers 500 --queries 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parallel_metrics import synthetic_prices  # noqa: E402
+from bist_risk.metrics_engine import log_returns, nan_covariance  # noqa: E402
+from bist_risk.portfolio_risk import PortfolioRisk  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tickers', type=int, default=500)
+    parser.add_argument('--days', type=int, default=2520)
+    parser.add_argument('--queries', type=int, default=100_000)
+    args = parser.parse_args()
+
+    cov = np.nan_to_num(nan_covariance(log_returns(synthetic_prices(args.tickers, args.days))))
+    weights = np.full(args.tickers, 1.0 / args.tickers)
+    portfolio = PortfolioRisk(cov, range(args.tickers), weights)
+
+    rng = np.random.default_rng(0)
+    positions = rng.integers(0, args.tickers, args.queries)
+    new_weights = rng.uniform(0, 2.0 / args.tickers, args.queries)
+
+    def recompute(i, weight):
+        candidate = portfolio.weights.copy()
+        candidate[i] = weight
+        return np.sqrt(candidate @ cov @ candidate)
+
+    sample = min(args.queries, 2000)
+    timings = {}
+    started = time.perf_counter()
+    expected = [recompute(i, w) for i, w in zip(positions[:sample], new_weights[:sample])]
+    timings['yeniden hesaplama'] = (time.perf_counter() - started) / sample
+    started = time.perf_counter()
+    single = [portfolio.volatility_if(i, w) for i, w in zip(positions[:sample], new_weights[:sample])]
+    timings['volatility_if'] = (time.perf_counter() - started) / sample
+    started = time.perf_counter()
+    batch = portfolio.volatilities_if(positions, new_weights)
+    timings['volatilities_if'] = (time.perf_counter() - started) / args.queries
+
+    print(f"{args.tickers} hisse, {args.queries} sorgu")
+    for name, seconds in timings.items():
+        print(f"{name:>18} {seconds * 1e6:10.3f} µs/sorgu")
+    error = max(np.max(np.abs(np.subtract(single, expected))), np.max(np.abs(batch[:sample] - expected)))
+    print(f"{'en büyük fark':>18} {error:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Time to score every day of a price history at once versus ranking each day with pandas.
+
+Usage (from stock_analysis/):
+    python benchmarks/bench_risk_history.py --tickers 500 --days 2520 --window 252
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parallel_metrics import synthetic_prices  # noqa: E402
+from bist_risk.pipeline import RISK_WEIGHTS  # noqa: E402
+from bist_risk.risk_scoring import FACTOR_SIGNS, factor_history, risk_categories, risk_scores  # noqa: E402
+
+
+def pandas_scores(factors, method):
+    """The former create_risk_ranking score, one date at a time."""
+    df = pd.DataFrame(factors, columns=list(FACTOR_SIGNS)).dropna()
+    score = sum((df[name] * sign).rank(pct=True, method=method) * RISK_WEIGHTS[name]
+                for name, sign in FACTOR_SIGNS.items())
+    return score.reindex(range(len(factors))).to_numpy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tickers', type=int, default=500)
+    parser.add_argument('--days', type=int, default=2520)
+    parser.add_argument('--window', type=int, default=252)
+    parser.add_argument('--method', choices=('dense', 'average'), default='dense')
+    args = parser.parse_args()
+
+    prices = synthetic_prices(args.tickers, args.days)
+    started = time.perf_counter()
+    factors = factor_history(prices, args.window)
+    factor_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    scores = risk_scores(factors, RISK_WEIGHTS, args.method)
+    codes = risk_categories(scores)
+    score_seconds = time.perf_counter() - started
+
+    scored_days = np.flatnonzero(~np.isnan(scores).all(axis=1))
+    sample = scored_days[:min(len(scored_days), 200)]
+    started = time.perf_counter()
+    expected = np.array([pandas_scores(factors[day], args.method) for day in sample])
+    pandas_seconds = (time.perf_counter() - started) / max(len(sample), 1) * len(scored_days)
+
+    print(f"{args.tickers} hisse, {args.days} gün, {args.window} günlük pencere, {len(scored_days)} gün skorlandı")
+    print(f"{'faktörler':>22} {factor_seconds:8.2f} s")
+    print(f"{'skor + kategori':>22} {score_seconds:8.2f} s")
+    print(f"{'pandas, gün gün (tah.)':>22} {pandas_seconds:8.2f} s")
+    transitions = np.count_nonzero((codes[1:] != codes[:-1]) & (codes[1:] >= 0) & (codes[:-1] >= 0))
+    print(f"{'kategori geçişi':>22} {transitions:8d}")
+    error = np.nanmax(np.abs(scores[sample] - expected)) if len(sample) else 0.0
+    print(f"{'en büyük fark':>22} {error:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Run time and peak memory of the batched Monte Carlo VaR/ES versus batch size.
+
+Usage (from stock_analysis/):
+    python benchmarks/bench_tail_risk.py --tickers 500 --paths 100000 --chunk-sizes 2000 10000 50000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parallel_metrics import synthetic_prices  # noqa: E402
+from bist_risk.metrics_engine import log_returns, nan_covariance  # noqa: E402
+from bist_risk.tail_risk import monte_carlo_var_es  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tickers', type=int, default=500)
+    parser.add_argument('--days', type=int, default=2520)
+    parser.add_argument('--paths', type=int, default=100_000)
+    parser.add_argument('--chunk-sizes', type=int, nargs='+', default=[2000, 10_000, 50_000])
+    parser.add_argument('--levels', type=float, nargs='+', default=[97.5, 99])
+    args = parser.parse_args()
+
+    returns = log_returns(synthetic_prices(args.tickers, args.days))
+    mean, cov = np.nanmean(returns, axis=0), nan_covariance(returns)
+    weights = np.full(args.tickers, 1.0 / args.tickers)
+    print(f"{args.tickers} hisse, {args.paths} senaryo, düzeyler {args.levels}")
+    print(f"{'grup':>8} {'saniye':>8} {'tepe MB':>8} {'aynı':>6}")
+
+    expected = None
+    for chunk_size in args.chunk_sizes:
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = monte_carlo_var_es(mean, cov, args.levels, args.paths, chunk_size, seed=0, weights=weights)
+        seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        expected = expected or result
+        identical = all(np.array_equal(a, b) for a, b in zip(expected, result))
+        print(f"{chunk_size:>8} {seconds:8.2f} {peak / 1e6:8.1f} {str(identical):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Time of each compute stage for synthetic universes of thousands of symbols.
+
+A universe CSV with a two-level sector hierarchy is written to a temporary
+directory and loaded through the registry; prices are synthetic random
+walks. Stages are timed as the CLI runs them: coverage check, per-stock
+metrics, price hashes, ranking, sector summary and correlation matrix.
+
+Usage (from stock_analysis/):
+    python benchmarks/bench_universe_scale.py --tickers 100 1000 3000 --days 2520
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parallel_metrics import synthetic_prices  # noqa: E402
+from bist_risk.pipeline import calculate_returns_and_metrics, create_risk_ranking, price_hashes  # noqa: E402
+from bist_risk.reporting import create_correlation_matrix, create_sector_summary  # noqa: E402
+from bist_risk.universe import load_universes  # noqa: E402
+
+STAGES = ('load', 'coverage', 'metrics', 'hashes', 'ranking', 'sector', 'correlation')
+
+
+def write_universe_csv(path, tickers, groups=5, sectors=40):
+    """Universe file with ``tickers`` symbols spread over ``sectors`` sectors in ``groups`` groups."""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['symbol', 'name', 'sector'])
+        for i in range(tickers):
+            sector = i % sectors
+            writer.writerow([f'S{i:05d}.IS', f'Hisse {i}', f'Grup {sector % groups}/Sektör {sector}'])
+
+
+def synthetic_data(universe, days, seed=0):
+    """``{symbol: DataFrame}`` of synthetic OHLCV-style prices for every symbol."""
+    prices = synthetic_prices(len(universe), days, seed)
+    dates = pd.bdate_range('2015-01-01', periods=days, name='Date')
+    all_data = {}
+    for j, symbol in enumerate(universe):
+        close = pd.Series(prices[:, j], index=dates).dropna()
+        all_data[symbol] = pd.DataFrame({'Close': close, 'Volume': 1000})
+    return all_data
+
+
+def run(tickers, days):
+    timings = {}
+
+    def timed(stage, func):
+        started = time.perf_counter()
+        result = func()
+        timings[stage] = time.perf_counter() - started
+        return result
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'scale.csv')
+        write_universe_csv(path, tickers)
+        universe = timed('load', lambda: load_universes(path)['scale'])
+    all_data = synthetic_data(universe, days)
+
+    missing = timed('coverage', lambda: universe.missing(all_data))
+    assert not missing
+    results = timed('metrics', lambda: calculate_returns_and_metrics(all_data, universe))
+    timed('hashes', lambda: price_hashes(all_data))
+    risk_df = timed('ranking', lambda: create_risk_ranking(results, path=None))
+    timed('sector', lambda: create_sector_summary(risk_df, path=None))
+    timed('correlation', lambda: create_correlation_matrix(results, path=None))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tickers', type=int, nargs='+', default=[100, 1000, 3000])
+    parser.add_argument('--days', type=int, default=2520)
+    args = parser.parse_args()
+
+    rows = []
+    for tickers in args.tickers:
+        # The stages print progress messages; keep the table readable
+        with open(os.devnull, 'w') as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                rows.append((tickers, run(tickers, args.days)))
+            finally:
+                sys.stdout = stdout
+
+    print(f"{args.days} gün, süreler saniye cinsinden")
+    print(f"{'hisse':>7} " + ' '.join(f'{stage:>11}' for stage in STAGES) + f" {'toplam':>9}")
+    for tickers, timings in rows:
+        print(f"{tickers:>7} " + ' '.join(f'{timings[stage]:11.3f}' for stage in STAGES)
+              + f" {sum(timings.values()):9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Batched GARCH-family fits: cold and warm-started, versus one generic optimizer per symbol.
+
+Usage (from stock_analysis/):
+    python benchmarks/bench_volatility_models.py --tickers 500 --days 2520 --model gjr --workers 1 4
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.optimize import minimize
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bist_risk.volatility_models import (SCALE, feasible, fit_batch, fit_volatility_models,  # noqa: E402
+                                         log_likelihood, start_grid)
+
+
+def gjr_returns(tickers, days, seed=0):
+    """Daily returns simulated from GJR-GARCH(1,1) with random parameters per symbol."""
+    rng = np.random.default_rng(seed)
+    alpha = rng.uniform(0.02, 0.08, tickers)
+    gamma = rng.uniform(0.0, 0.08, tickers)
+    beta = rng.uniform(0.8, 0.86, tickers)
+    target = rng.uniform(0.01, 0.03, tickers) ** 2
+    omega = target * (1 - alpha - gamma / 2 - beta)
+    returns = np.empty((days, tickers))
+    variance = target.copy()
+    for t in range(days):
+        returns[t] = np.sqrt(variance) * rng.standard_normal(tickers)
+        variance = omega + (alpha + gamma * (returns[t] < 0)) * returns[t] ** 2 + beta * variance
+    return returns
+
+
+def scipy_fit(model, returns):
+    """One symbol fitted with Nelder-Mead on the same likelihood (the naive baseline)."""
+    errors = (returns - returns.mean()) * SCALE
+    errors, backcast = errors[:, None], np.array([np.mean(errors ** 2)])
+
+    def objective(params):
+        if not feasible(model, params[None])[0]:
+            return np.inf
+        return -log_likelihood(model, params[None], errors, backcast)[0][0]
+
+    return minimize(objective, start_grid(model)[0], method='Nelder-Mead')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tickers', type=int, default=500)
+    parser.add_argument('--days', type=int, default=2520)
+    parser.add_argument('--model', choices=('garch', 'gjr', 'ewma'), default='gjr')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1])
+    parser.add_argument('--scipy-sample', type=int, default=5,
+                        help="scipy ile uyarlanıp tüm evrene ölçeklenen hisse sayısı")
+    args = parser.parse_args()
+
+    returns = gjr_returns(args.tickers, args.days + 1)
+    print(f"{args.tickers} hisse, {args.days} gün, model {args.model}")
+    print(f"{'çalışma':>24} {'saniye':>8} {'ort. yineleme':>14}")
+
+    # Yesterday's fit is the warm start of today's
+    yesterday = fit_batch(args.model, returns[:-1])
+    expected = None
+    for workers in args.workers:
+        started = time.perf_counter()
+        cold = fit_volatility_models(args.model, returns[1:], workers=workers)
+        cold_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        warm = fit_volatility_models(args.model, returns[1:], start=yesterday['params'], workers=workers)
+        warm_seconds = time.perf_counter() - started
+        print(f"{f'soğuk, {workers} süreç':>24} {cold_seconds:8.2f} {cold['iterations'].mean():14.1f}")
+        print(f"{f'sıcak, {workers} süreç':>24} {warm_seconds:8.2f} {warm['iterations'].mean():14.1f}")
+        expected = expected or cold
+        if not all(np.array_equal(expected[key], cold[key], equal_nan=True) for key in cold):
+            print("Uyarı: süreç sayısı sonucu değiştirdi")
+
+    sample = min(args.scipy_sample, args.tickers)
+    started = time.perf_counter()
+    fits = [scipy_fit(args.model, returns[1:, j]) for j in range(sample)]
+    scipy_seconds = (time.perf_counter() - started) / max(sample, 1) * args.tickers
+    print(f"{'scipy, hisse hisse (tah.)':>24} {scipy_seconds:8.2f}")
+    gap = max(-fit.fun - loglik for fit, loglik in zip(fits, expected['loglik'] - args.days * np.log(SCALE)))
+    print(f"{'scipy log-olabilirlik farkı':>24} {gap:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Write a synthetic OHLCV universe in the format of data/*_IS.csv.
+
+Every symbol gets a CSV with yfinance's three-row header (Price / Ticker /
+Date) and Close, High, Low, Open, Volume columns, plus a universe CSV
+(symbol, name, sector) to run the pipeline on it. Prices are the random
+walks of bench_parallel_metrics, including late listings and gaps; bars
+can be daily or intraday within the Borsa Istanbul session.
+
+Usage (from stock_analysis/):
+    python benchmarks/synthetic_data.py --tickers 1000 --days 2520 --freq 1d --out synthetic
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parallel_metrics import synthetic_prices  # noqa: E402
+from bench_universe_scale import write_universe_csv  # noqa: E402
+from bist_risk.data_loader import stock_csv_path  # noqa: E402
+
+# Bars per trading day of each frequency within the 10:00-18:00 session
+BAR_FREQUENCIES = {'1d': 1, '1h': 8, '30min': 16, '15min': 32, '5min': 96, '1min': 480}
+SESSION_OPEN = pd.Timedelta(hours=10)
+START_DATE = '2015-01-01'
+
+
+def bar_index(days, freq):
+    """Timestamps of ``days`` business days of ``freq`` bars (bar start times for intraday)."""
+    dates = pd.bdate_range(START_DATE, periods=days)
+    per_day = BAR_FREQUENCIES[freq]
+    if per_day == 1:
+        return dates
+    offsets = np.asarray(SESSION_OPEN + pd.to_timedelta(freq) * np.arange(per_day), dtype='timedelta64[ns]')
+    return pd.DatetimeIndex((dates.values[:, None] + offsets).ravel())
+
+
+def synthetic_ohlcv(tickers, days, freq='1d', seed=0):
+    """``(index, {field: bars x tickers array})`` of synthetic Open/High/Low/Close/Volume bars."""
+    index = bar_index(days, freq)
+    rng = np.random.default_rng(seed + 1)
+    close = synthetic_prices(tickers, len(index), seed)
+    # Bar volatility shrinks with the number of bars per day
+    scale = 0.01 / np.sqrt(BAR_FREQUENCIES[freq])
+    # Each bar opens near the previous close (its own close on the first bar of a listing)
+    previous = np.vstack([close[:1], close[:-1]])
+    previous = np.where(np.isnan(previous), close, previous)
+    open_ = previous * np.exp(rng.standard_normal(close.shape) * scale / 4)
+    high = np.fmax(open_, close) * np.exp(np.abs(rng.standard_normal(close.shape)) * scale)
+    low = np.fmin(open_, close) * np.exp(-np.abs(rng.standard_normal(close.shape)) * scale)
+    volume = rng.integers(1_000, 10_000_000, close.shape) // BAR_FREQUENCIES[freq]
+    return index, {'Close': close, 'High': high, 'Low': low, 'Open': open_, 'Volume': volume}
+
+
+def write_stock_csv(path, symbol, index, bars, index_label='Date'):
+    """One symbol's bars as yfinance writes them; rows without a price are left out."""
+    frame = pd.DataFrame(bars, index=index)
+    frame = frame[frame['Close'].notna()]
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write('Price,' + ','.join(frame.columns) + '\n')
+        f.write('Ticker,' + ','.join([symbol] * len(frame.columns)) + '\n')
+        f.write(index_label + ',' * len(frame.columns) + '\n')
+        frame.to_csv(f, header=False)
+
+
+def write_universe(out_dir, tickers, days, freq='1d', seed=0):
+    """Write ``tickers`` symbol CSVs under ``out_dir/data`` and ``out_dir/universe.csv``.
+
+    Returns the universe file path; the symbols are those of
+    bench_universe_scale.write_universe_csv().
+    """
+    data_dir = os.path.join(out_dir, 'data')
+    os.makedirs(data_dir, exist_ok=True)
+    universe_path = os.path.join(out_dir, 'universe.csv')
+    write_universe_csv(universe_path, tickers)
+    symbols = pd.read_csv(universe_path)['symbol']
+
+    index, bars = synthetic_ohlcv(tickers, days, freq, seed)
+    # yfinance labels intraday indexes 'Datetime'
+    index_label = 'Date' if freq == '1d' else 'Datetime'
+    for j, symbol in enumerate(symbols):
+        write_stock_csv(stock_csv_path(symbol, data_dir), symbol, index,
+                        {field: values[:, j] for field, values in bars.items()}, index_label)
+    return universe_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tickers', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=2520)
+    parser.add_argument('--freq', choices=list(BAR_FREQUENCIES), default='1d')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='synthetic', help="Çıktı klasörü (data/ ve universe.csv)")
+    args = parser.parse_args()
+
+    universe_path = write_universe(args.out, args.tickers, args.days, args.freq, args.seed)
+    rows = args.days * BAR_FREQUENCIES[args.freq]
+    print(f"✓ {args.tickers} hisse x {rows} bar ({args.freq}) yazıldı: {args.out}/data, {universe_path}")
+
+
+if __name__ == "__main__":
+    main()
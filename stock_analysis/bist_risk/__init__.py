@@ -0,0 +1,8 @@
+"""BIST risk analysis: price sync, vectorized risk metrics, ranking, reports and plots.
+
+Run the pipeline with the ``bist-risk`` command (or ``python -m bist_risk``);
+see bist_risk/cli.py for the stages. Submodules import their heavy
+dependencies lazily, so importing the package is cheap.
+"""
+
+__version__ = '2.1.0'
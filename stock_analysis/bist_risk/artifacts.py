@@ -0,0 +1,35 @@
+import os
+import pickle
+
+ARTIFACTS_DIR = 'artifacts'
+
+# Stage that writes each artifact, named in the error when one is missing
+PRODUCERS = {
+    'metrics': 'compute',
+    'ranking': 'rank',
+}
+
+
+def artifact_path(name, directory=ARTIFACTS_DIR):
+    return os.path.join(directory, f'{name}.pkl')
+
+
+def save_artifact(name, value, directory=ARTIFACTS_DIR):
+    """Pickle a stage output for later stages (atomically replaced)."""
+    os.makedirs(directory, exist_ok=True)
+    path = artifact_path(name, directory)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_artifact(name, directory=ARTIFACTS_DIR):
+    """Load an artifact written by an earlier stage."""
+    path = artifact_path(name, directory)
+    if not os.path.exists(path):
+        stage = PRODUCERS.get(name, name)
+        raise FileNotFoundError(f"{path} bulunamadı; önce 'bist-risk {stage}' aşamasını çalıştırın")
+    with open(path, 'rb') as f:
+        return pickle.load(f)
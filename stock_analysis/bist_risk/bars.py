@@ -0,0 +1,177 @@
+"""Bar intervals, the Borsa Istanbul session calendar and streaming OHLCV resampling.
+
+Intervals use yfinance's names ('1m' ... '1h', '1d'). Intraday bars live
+within the continuous session of the equity market, 10:00-18:00 Istanbul
+time, so an interval has a fixed number of bars per session and metrics
+are annualised with TRADING_DAYS sessions of them (periods_per_year).
+
+Coarser bars are built from finer ones by bucketing every bar into the
+interval bar it starts in, counted from the session open: Open is the
+first, High the highest, Low the lowest, Close the last price and Volume
+the sum. BarResampler does this incrementally over chunks of bars, so a
+long minute-bar file is resampled without being loaded whole (see
+resample_csv).
+"""
+import numpy as np
+import pandas as pd
+
+from .data_loader import CHUNK_ROWS, read_stock_csv_chunks
+from .metrics_engine import TRADING_DAYS
+
+# Continuous session of the Borsa Istanbul equity market (Istanbul time);
+# bars of the opening and closing auctions join the first and last bar
+SESSION_OPEN = np.timedelta64(10 * 60, 'm')
+SESSION_MINUTES = 8 * 60
+
+# Minutes per bar of every interval; a daily bar is a whole session
+INTERVAL_MINUTES = {
+    '1m': 1, '2m': 2, '5m': 5, '15m': 15, '30m': 30, '60m': 60, '90m': 90, '1h': 60, '1d': SESSION_MINUTES,
+}
+
+# Days of history Yahoo Finance serves for each intraday interval
+MAX_HISTORY_DAYS = {'1m': 7, '2m': 60, '5m': 60, '15m': 60, '30m': 60, '60m': 730, '90m': 60, '1h': 730}
+
+# How the fields of the fine bars combine into a coarser bar
+AGGREGATION = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Adj Close': 'last', 'Volume': 'sum'}
+
+
+def interval_minutes(interval):
+    """Minutes per bar of ``interval``; ValueError for an unknown interval."""
+    try:
+        return INTERVAL_MINUTES[interval]
+    except KeyError:
+        raise ValueError(f"Bilinmeyen bar aralığı: {interval} (seçenekler: {', '.join(INTERVAL_MINUTES)})") from None
+
+
+def bars_per_session(interval):
+    """Bars of ``interval`` in one session (the last one may be shorter, e.g. 90m)."""
+    return -(-SESSION_MINUTES // interval_minutes(interval))
+
+
+def periods_per_year(interval):
+    """Bars of ``interval`` per year: the annualisation factor of their returns (252 for daily bars)."""
+    return TRADING_DAYS * bars_per_session(interval)
+
+
+def bar_label(interval):
+    """Turkish adjective for a return over one bar: 'Günlük', '5 dakikalık', '1 saatlik'."""
+    minutes = interval_minutes(interval)
+    if minutes == SESSION_MINUTES:
+        return 'Günlük'
+    if minutes % 60 == 0:
+        return f"{minutes // 60} saatlik"
+    return f"{minutes} dakikalık"
+
+
+def check_resample(source, target):
+    """Raise ValueError unless ``target`` bars can be built from ``source`` bars."""
+    fine, coarse = interval_minutes(source), interval_minutes(target)
+    if target != '1d' and (coarse < fine or coarse % fine):
+        raise ValueError(f"{target} bar'ları {source} bar'larından üretilemez "
+                         "(hedef aralık kaynak aralığın katı olmalı)")
+
+
+def bar_starts(index, interval):
+    """Start of the ``interval`` bar each timestamp of ``index`` falls in, as datetime64[ns].
+
+    Daily bars start at midnight of their date. Intraday bars are counted
+    from the session open; timestamps before it or after the last bar of
+    the session (the auctions) fall in the first or last bar.
+    """
+    values = np.asarray(pd.DatetimeIndex(index), dtype='datetime64[ns]')
+    days = values.astype('datetime64[D]').astype('datetime64[ns]')
+    if interval == '1d':
+        return days
+    step = np.timedelta64(interval_minutes(interval), 'm')
+    position = np.clip((values - days - SESSION_OPEN) // step, 0, bars_per_session(interval) - 1)
+    return days + SESSION_OPEN + position * step
+
+
+def _aggregate(data, starts):
+    """One bar per run of equal ``starts`` (sorted) of the fine bars in ``data``."""
+    columns = [col for col in data.columns if col in AGGREGATION]
+    if len(starts) == 0:
+        return pd.DataFrame(columns=columns, index=pd.DatetimeIndex([], name='Date'), dtype=np.float64)
+
+    first = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    last = np.r_[first[1:], len(starts)] - 1
+    bars = {}
+    for col in columns:
+        values = data[col].to_numpy(dtype=np.float64)
+        rule = AGGREGATION[col]
+        if rule == 'first':
+            bars[col] = values[first]
+        elif rule == 'last':
+            bars[col] = values[last]
+        elif rule == 'max':
+            bars[col] = np.fmax.reduceat(values, first)
+        elif rule == 'min':
+            bars[col] = np.fmin.reduceat(values, first)
+        else:
+            bars[col] = np.add.reduceat(np.nan_to_num(values), first)
+    return pd.DataFrame(bars, index=pd.DatetimeIndex(starts[first], name='Date'))
+
+
+def _priced(data):
+    # A row without a close is not a bar
+    return data[data['Close'].notna()] if 'Close' in data.columns else data
+
+
+def resample_bars(data, interval):
+    """``interval`` OHLCV bars of a DataFrame of finer bars (e.g. minute bars into 15m or 1d)."""
+    data = _priced(data[~data.index.duplicated(keep='last')].sort_index())
+    return _aggregate(data, bar_starts(data.index, interval))
+
+
+class BarResampler:
+    """Streaming resampler: chunks of fine bars in time order in, completed ``interval`` bars out.
+
+    The rows of the bar still being built are held back until a later bar
+    starts or flush() is called, so memory is bounded by one chunk and one
+    coarse bar whatever the length of the input. Rows dated at or before
+    the last row already seen are ignored.
+    """
+
+    def __init__(self, interval):
+        interval_minutes(interval)
+        self.interval = interval
+        self.last = None
+        self._pending = None
+
+    def update(self, data):
+        """Add a chunk of fine bars; returns the bars it completed (possibly none)."""
+        data = _priced(data[~data.index.duplicated(keep='last')].sort_index())
+        if self.last is not None:
+            data = data[data.index > self.last]
+        if data.empty:
+            return _aggregate(data, np.empty(0, dtype='datetime64[ns]'))
+        self.last = data.index[-1]
+        if self._pending is not None:
+            data = pd.concat([self._pending, data])
+
+        starts = bar_starts(data.index, self.interval)
+        # The last bar may continue in the next chunk
+        open_from = int(np.searchsorted(starts, starts[-1], 'left'))
+        self._pending = data.iloc[open_from:]
+        return _aggregate(data.iloc[:open_from], starts[:open_from])
+
+    def flush(self):
+        """The bar still being built, as a one-row DataFrame (empty if there is none)."""
+        pending, self._pending = self._pending, None
+        if pending is None:
+            return _aggregate(pd.DataFrame(columns=list(AGGREGATION)), np.empty(0, dtype='datetime64[ns]'))
+        return _aggregate(pending, bar_starts(pending.index, self.interval))
+
+
+def resample_csv(path, interval, chunk_rows=CHUNK_ROWS):
+    """Read a saved price CSV of finer bars as ``interval`` bars, ``chunk_rows`` rows at a time.
+
+    Usable as the ``reader`` of data_loader.load_cached_data().
+    """
+    resampler = BarResampler(interval)
+    frames = [resampler.update(chunk) for chunk in read_stock_csv_chunks(path, chunk_rows)]
+    frames.append(resampler.flush())
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return resampler.flush()
+    return pd.concat(frames)
@@ -0,0 +1,573 @@
+import argparse
+import contextlib
+import os
+import warnings
+from datetime import datetime
+
+from .artifacts import ARTIFACTS_DIR, load_artifact, save_artifact
+from .instrumentation import PROFILE_DIR, PROFILER_HOOKS, RunProfile, profiling, timed
+from .pipeline import (BAR_INTERVALS, COVARIANCE_METHODS, DEFAULT_INTERVAL, DEFAULT_MISSING_BARS, DEFAULT_START,
+                       MC_CHUNK_SIZE, MC_PATHS, MC_SEED, METRIC_PARAMS, MISSING_BARS, RANK_METHODS, RANK_VOLATILITIES,
+                       REPORTS_DIR, RISK_WEIGHTS, TAIL_LEVELS, TAIL_METHODS, VOL_MODELS, ensure_output_dirs, today)
+from .plotting import PLOT_MODES
+from .report_writer import DEFAULT_FORMATS, REPORT_FORMATS
+from .universe import DEFAULT_UNIVERSE, get_universe
+
+
+class PipelineError(RuntimeError):
+    """A stage cannot continue (no data, no metrics, stale inputs)."""
+
+
+@timed('fetch')
+def run_fetch(args, cache):
+    """Download or update prices under data/ (and the price store with --store).
+
+    With --resample-from the finer bars are downloaded; later stages
+    resample them to --interval.
+    """
+    from .pipeline import fetch_prices
+
+    all_data = fetch_prices(args.universe, args.start, args.end, full_refresh=args.full_refresh,
+                            workers=args.download_workers, store_dir=args.store,
+                            interval=args.resample_from or args.interval)
+    if not all_data:
+        raise PipelineError("Hiç veri indirilemedi!")
+    return all_data
+
+
+def _prices(args, all_data=None):
+    """Prices for the run: freshly fetched ones if given, otherwise the saved ones.
+
+    Every symbol of the universe must have data in the range; with
+    --allow-missing the ones without are reported and left out instead.
+    --resample-from bars are resampled to --interval.
+    """
+    from .bars import check_resample
+    from .pipeline import load_prices, resample_prices, select_range
+
+    try:
+        if args.resample_from:
+            check_resample(args.resample_from, args.interval)
+        if all_data is None:
+            all_data = load_prices(args.universe, args.start, args.end, store_dir=args.store,
+                                   interval=args.interval, resample_from=args.resample_from)
+        else:
+            all_data = select_range(all_data, args.start, args.end)
+            if args.resample_from:
+                all_data = resample_prices(all_data, args.interval)
+    except ValueError as e:
+        raise PipelineError(str(e)) from None
+
+    missing = args.universe.missing(all_data)
+    if missing:
+        listed = ', '.join(missing[:10]) + (f" ve {len(missing) - 10} hisse daha" if len(missing) > 10 else '')
+        if not args.allow_missing:
+            raise PipelineError(f"{len(missing)}/{len(args.universe)} hisse için kayıtlı fiyat verisi yok: "
+                                f"{listed}; önce 'bist-risk fetch' çalıştırın ya da --allow-missing ile "
+                                "bu hisseler olmadan devam edin")
+        print(f"\nUyarı: {len(missing)} hisse senedi için veri bulunamadı, analiz dışı bırakıldı: {listed}")
+        all_data = {stock: data for stock, data in all_data.items() if stock in args.universe and not data.empty}
+    if not all_data:
+        raise PipelineError("Hiç fiyat verisi bulunamadı; önce 'bist-risk fetch' çalıştırın")
+    return all_data
+
+
+@timed('compute')
+def run_compute(args, cache, all_data=None):
+    """Per-stock metrics, saved as the 'metrics' artifact."""
+    from .pipeline import (build_calendar, calculate_returns_and_metrics, compute_conditional_volatility,
+                           compute_rolling_metrics, compute_tail_risk, price_hashes, universe_hash)
+
+    if args.tail_risk and 'conditional' in args.tail_risk and not args.vol_model:
+        raise PipelineError("'conditional' kuyruk riski yöntemi için --vol-model gerekli")
+    all_data = _prices(args, all_data)
+    # One master calendar for every stage of this run that aligns the prices
+    calendar = build_calendar(all_data)
+
+    # Calculate metrics (unchanged stocks come from the cache when enabled)
+    results = calculate_returns_and_metrics(all_data, args.universe, cache=cache, workers=args.workers,
+                                            interval=args.interval, calendar=calendar, missing_bars=args.missing_bars)
+    if not results:
+        raise PipelineError("Hiç metrik hesaplanamadı!")
+    print(f"\n✓ {len(results)} hisse senedi için analiz tamamlandı")
+
+    # Rolling-window risk metrics (opt-in)
+    if args.rolling:
+        compute_rolling_metrics(all_data, args.rolling, interval=args.interval, calendar=calendar,
+                                missing_bars=args.missing_bars)
+
+    # GARCH-family next-day volatility, warm-started from --vol-state (opt-in)
+    if args.vol_model:
+        try:
+            compute_conditional_volatility(results, args.vol_model, workers=args.workers, state_path=args.vol_state,
+                                           interval=args.interval)
+        except ValueError as e:
+            raise PipelineError(str(e)) from None
+
+    # VaR / Expected Shortfall by method (opt-in)
+    if args.tail_risk:
+        compute_tail_risk(results, args.tail_risk, levels=args.var_levels, paths=args.mc_paths,
+                          chunk_size=args.mc_chunk_size, seed=args.mc_seed)
+
+    metrics = {
+        'universe': args.universe.name,
+        'label': args.universe.label,
+        'start': args.start,
+        'end': args.end,
+        'interval': args.interval,
+        # Later stages are keyed on every input plus the metric parameters; the universe's names and
+        # sectors label the ranking, the sector summary and the correlation matrix
+        'key': cache.key('run', price_hashes(all_data), universe_hash(args.universe), METRIC_PARAMS, args.interval,
+                         args.missing_bars, *([args.vol_model] if args.vol_model else [])),
+        'version': METRIC_PARAMS['version'],
+        'results': results,
+    }
+    save_artifact('metrics', metrics, args.artifacts_dir)
+    return metrics
+
+
+def _load_metrics(args):
+    """The 'metrics' artifact, with every stock's returns gathered back into one shared matrix."""
+    from .results import share_returns
+
+    metrics = load_artifact('metrics', args.artifacts_dir)
+    if metrics.get('version') != METRIC_PARAMS['version']:
+        raise PipelineError("Kayıtlı metrikler eski bir sürümle üretilmiş; önce 'bist-risk compute' çalıştırın")
+    share_returns(metrics['results'])
+    return metrics
+
+
+def _risk_weights(args):
+    """RISK_WEIGHTS with the --risk-weights overrides applied."""
+    from .risk_scoring import check_weights
+
+    weights = {**RISK_WEIGHTS, **dict(args.risk_weights or [])}
+    try:
+        check_weights(weights)
+    except ValueError as e:
+        raise PipelineError(str(e)) from e
+    return weights
+
+
+@timed('rank')
+def run_rank(args, cache, metrics=None, all_data=None):
+    """Risk ranking from the 'metrics' artifact, saved as the 'ranking' artifact.
+
+    With --state the ranking comes from the resumable streaming state
+    instead and only reports/risk_ranking.csv is written. --risk-history
+    also scores every past day over trailing windows of the prices.
+    """
+    from .pipeline import compute_risk_history, create_risk_ranking, update_streaming_ranking
+
+    weights = _risk_weights(args)
+    if args.rank_volatility == 'conditional' and args.state:
+        raise PipelineError("Akış durumuyla (--state) koşullu volatilite kullanılamaz")
+    if args.state and args.missing_bars != DEFAULT_MISSING_BARS:
+        raise PipelineError(f"Akış durumu (--state) yalnızca '{DEFAULT_MISSING_BARS}' eksik bar politikasıyla çalışır")
+    if args.risk_history:
+        compute_risk_history(_prices(args, all_data), args.risk_history, method=args.rank_method, weights=weights,
+                             interval=args.interval, missing_bars=args.missing_bars)
+
+    if args.state:
+        try:
+            update_streaming_ranking(_prices(args, all_data), args.universe, args.state,
+                                     method=args.rank_method, weights=weights, interval=args.interval)
+        except ValueError as e:
+            raise PipelineError(str(e)) from None
+        return None
+
+    metrics = metrics or _load_metrics(args)
+    if args.rank_volatility == 'conditional' and any('conditional_volatility' not in result
+                                                     for result in metrics['results'].values()):
+        raise PipelineError("Koşullu volatilite hesaplanmamış; önce 'bist-risk compute --vol-model ...' çalıştırın")
+    key = cache.key('ranking', metrics['key'], weights, args.rank_method, args.rank_volatility)
+    risk_df = cache.memoize(key, lambda: create_risk_ranking(metrics['results'], method=args.rank_method,
+                                                             weights=weights, volatility=args.rank_volatility),
+                            outputs=[os.path.join(REPORTS_DIR, 'risk_ranking.csv')])
+    ranking = {'metrics_key': metrics['key'], 'key': key, 'risk_df': risk_df, 'weights': weights}
+    save_artifact('ranking', ranking, args.artifacts_dir)
+    return ranking
+
+
+def _label(metrics):
+    # Metrics saved before universes had labels are BIST30 runs
+    return metrics.get('label', 'BIST30')
+
+
+def _interval(metrics):
+    # Metrics saved before intraday support are daily
+    return metrics.get('interval', DEFAULT_INTERVAL)
+
+
+def _ranked_metrics(args, metrics=None, ranking=None):
+    metrics = metrics or _load_metrics(args)
+    ranking = ranking or load_artifact('ranking', args.artifacts_dir)
+    if ranking['metrics_key'] != metrics['key']:
+        raise PipelineError("Risk sıralaması güncel metriklerden üretilmemiş; önce 'bist-risk rank' çalıştırın")
+    return metrics, ranking
+
+
+def _covariance(args, cache, metrics):
+    """Covariance estimate selected with --covariance, or None for pairwise correlations.
+
+    With --cov-state the estimate is never served from the cache: every run
+    has to bring the saved estimator state up to date, and the estimate
+    depends on that state as well as on the metrics. A state that covers a
+    stock whose price history was rewritten since it was saved is rebuilt.
+    """
+    from .pipeline import rewritten_histories
+    from .reporting import estimate_covariance
+
+    if args.covariance == 'pairwise':
+        return None
+    params = {'window': args.cov_window, 'decay': args.ewma_decay}
+    try:
+        if args.cov_state:
+            rewritten = rewritten_histories(args.cov_state, metrics['results'], args.interval)
+            return estimate_covariance(metrics['results'], args.covariance, state_path=args.cov_state,
+                                       rewritten=rewritten, **params)
+        return cache.memoize(cache.key('covariance', metrics['key'], args.covariance, params),
+                             lambda: estimate_covariance(metrics['results'], args.covariance, **params))
+    except ValueError as e:
+        raise PipelineError(str(e)) from None
+
+
+def _correlation(args, cache, metrics, covariance, path=None):
+    from .reporting import create_correlation_matrix
+
+    # 'by-symbol': entries of the name-indexed matrix are not reused
+    key = cache.key('correlation', 'by-symbol', metrics['key'])
+    if covariance is not None:
+        from .result_cache import hash_frame
+
+        # The estimate itself, which a resumed --cov-state makes more than a function of the options
+        key = cache.key(key, args.covariance, hash_frame(covariance))
+    return cache.memoize(key, lambda: create_correlation_matrix(metrics['results'], path=path, covariance=covariance),
+                         outputs=[path] if path else ())
+
+
+def _tables(args, cache, metrics, ranking, save):
+    """Sector summary and correlation tables, written to reports/ when ``save``."""
+    from .reporting import create_sector_summary
+
+    sector_path = os.path.join(REPORTS_DIR, 'sector_summary.csv') if save else None
+    correlation_path = os.path.join(REPORTS_DIR, 'correlation_matrix.csv') if save else None
+    sector_summary = cache.memoize(cache.key('sector_summary', ranking['key']),
+                                   lambda: create_sector_summary(ranking['risk_df'], path=sector_path),
+                                   outputs=[sector_path] if save else ())
+    correlation_matrix = _correlation(args, cache, metrics, _covariance(args, cache, metrics), correlation_path)
+    return sector_summary, correlation_matrix
+
+
+@timed('report')
+def run_report(args, cache, metrics=None, ranking=None, tables=None):
+    """Sector summary, correlation matrix and the summary report (Markdown, JSON, HTML with --report-formats).
+
+    ``tables`` are the saved _tables() of this run when the caller already built them.
+    """
+    from .reporting import generate_summary_report
+
+    metrics, ranking = _ranked_metrics(args, metrics, ranking)
+    if tables is None:
+        _tables(args, cache, metrics, ranking, save=True)
+
+    # The report mentions the universe, the data range, the bar interval and the
+    # weights, so they are part of the key (the ranking key covers the weights)
+    label, interval = _label(metrics), _interval(metrics)
+    formats = list(dict.fromkeys(args.report_formats))
+    cache.memoize(cache.key('report', ranking['key'], label, metrics['start'], metrics['end'], interval, formats),
+                  lambda: generate_summary_report(metrics['results'], ranking['risk_df'],
+                                                  metrics['start'], metrics['end'], label=label, interval=interval,
+                                                  weights=ranking.get('weights'), formats=formats),
+                  outputs=[os.path.join(REPORTS_DIR, f'summary_report.{fmt}') for fmt in formats])
+
+
+@timed('portfolio')
+def run_portfolio(args, cache, metrics=None):
+    """Risk and risk contributions of a weighted portfolio of the analysed stocks."""
+    from .reporting import create_portfolio_report, read_weights
+
+    metrics = metrics or _load_metrics(args)
+    covariance = _covariance(args, cache, metrics)
+    correlation_matrix = _correlation(args, cache, metrics, covariance)
+    try:
+        weights = read_weights(args.weights) if args.weights else None
+        create_portfolio_report(metrics['results'], correlation_matrix, weights, levels=args.var_levels,
+                                covariance=covariance, interval=_interval(metrics))
+    except ValueError as e:
+        raise PipelineError(str(e)) from None
+
+
+@timed('plot')
+def run_plot(args, cache, metrics=None, ranking=None, tables=None):
+    """Render the figures (figures with unchanged inputs are not redrawn).
+
+    ``tables`` are the _tables() of this run when the caller already built them.
+    """
+    from .reporting import plot_comprehensive_analysis
+
+    if args.plots == 'none':
+        return
+    metrics, ranking = _ranked_metrics(args, metrics, ranking)
+    sector_summary, correlation_matrix = tables or _tables(args, cache, metrics, ranking, save=False)
+    plot_comprehensive_analysis(metrics['results'], ranking['risk_df'], sector_summary, correlation_matrix,
+                                mode=args.plots, label=_label(metrics), interval=_interval(metrics))
+
+
+@timed('all')
+def run_all(args, cache):
+    """Every stage in one run, passing results along in memory."""
+    print(f"=== {args.universe.label} Kapsamlı Risk Analizi ===")
+    print(f"Analiz Tarihi: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+    print("="*50)
+
+    all_data = None if args.cache_only else run_fetch(args, cache)
+
+    # Streaming mode: update the saved metric state and the ranking only
+    if args.state:
+        run_rank(args, cache, all_data=all_data)
+        print("📋 reports/risk_ranking.csv - Risk sıralaması")
+        return
+
+    metrics = run_compute(args, cache, all_data)
+    ranking = run_rank(args, cache, metrics, all_data)
+    # Later stages only read the metrics; do not keep every price series alive through them
+    del all_data
+    # The sector summary and the correlation matrix are built once for both the figures and the report
+    tables = _tables(args, cache, metrics, ranking, save=True)
+    run_plot(args, cache, metrics, ranking, tables)
+    run_report(args, cache, metrics, ranking, tables)
+
+    print("\n" + "="*50)
+    print("✓ Analiz başarıyla tamamlandı!")
+    print("\nOluşturulan dosyalar:")
+    if args.plots != 'none':
+        print("📊 plots/risk_dashboard.png - Ana risk dashboard")
+        print("📊 plots/sector_analysis.png - Sektörel analiz")
+        print("📊 plots/individual_distributions.png - Bireysel dağılımlar")
+        print("📊 plots/correlation_matrix.png - Korelasyon matrisi")
+    print("📋 reports/risk_ranking.csv - Risk sıralaması")
+    if args.risk_history:
+        print("📋 reports/risk_history.csv - Günlük risk skoru geçmişi")
+        print("📋 reports/risk_transitions.csv - Risk kategorisi geçişleri")
+    print("📋 reports/sector_summary.csv - Sektör özeti")
+    print("📋 reports/correlation_matrix.csv - Korelasyon verileri")
+    for fmt in dict.fromkeys(args.report_formats):
+        print(f"📄 reports/summary_report.{fmt} - Kapsamlı rapor" + ('' if fmt == 'md' else f" ({fmt.upper()})"))
+    print("\n" + "="*50)
+
+
+STAGES = {
+    'fetch': run_fetch,
+    'compute': run_compute,
+    'rank': run_rank,
+    'report': run_report,
+    'plot': run_plot,
+    'portfolio': run_portfolio,
+    'all': run_all,
+}
+
+
+def _add_fetch_options(parser):
+    parser.add_argument('--full-refresh', action='store_true',
+                        help="Tüm fiyat geçmişini baştan indir")
+    parser.add_argument('--download-workers', type=int, default=8,
+                        help="Eşzamanlı indirme iş parçacığı sayısı")
+
+
+def _add_level_option(parser):
+    parser.add_argument('--var-levels', metavar='DÜZEY', type=float, nargs='+', default=list(TAIL_LEVELS),
+                        help="VaR/ES güven düzeyleri, yüzde (varsayılan: 95 97.5 99)")
+
+
+def _add_compute_options(parser):
+    parser.add_argument('--rolling', metavar='N', type=int, nargs='+',
+                        help="Kayan pencere metriklerini bu pencere uzunluklarıyla (bar) hesapla (örn: 20 60 252)")
+    parser.add_argument('--tail-risk', metavar='YÖNTEM', nargs='+', choices=TAIL_METHODS,
+                        help=f"VaR ve beklenen kaybı (ES) bu yöntemlerle hesapla: {', '.join(TAIL_METHODS)}")
+    _add_level_option(parser)
+    parser.add_argument('--mc-paths', type=int, default=MC_PATHS, help="Monte Carlo senaryo sayısı")
+    parser.add_argument('--mc-chunk-size', type=int, default=MC_CHUNK_SIZE,
+                        help="Bellekte aynı anda tutulan Monte Carlo senaryo sayısı")
+    parser.add_argument('--mc-seed', type=int, default=MC_SEED,
+                        help="Monte Carlo rastgele sayı tohumu (aynı tohum aynı sonucu verir)")
+    parser.add_argument('--vol-model', choices=VOL_MODELS,
+                        help="Koşullu volatiliteyi bu modelle tahmin et (garch, gjr = GJR-GARCH, ewma)")
+    parser.add_argument('--vol-state', metavar='PATH',
+                        help="Model parametrelerini bu JSON dosyasından başlat ve kaydet (sıcak başlangıç)")
+
+
+def _risk_weight(text):
+    factor, _, weight = text.partition('=')
+    if factor not in RISK_WEIGHTS:
+        raise argparse.ArgumentTypeError(f"bilinmeyen risk faktörü: {factor}")
+    try:
+        return factor, float(weight)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"geçersiz ağırlık: {text}") from None
+
+
+def _add_rank_options(parser):
+    parser.add_argument('--rank-method', choices=RANK_METHODS, default='dense',
+                        help="Risk skoru bileşenlerinin yüzdelik sıralama yöntemi")
+    parser.add_argument('--state', metavar='PATH',
+                        help="Metrikleri kayıtlı akış durumundan artımlı güncelle, yalnızca risk sıralamasını üret")
+    parser.add_argument('--risk-weights', metavar='FAKTÖR=AĞIRLIK', type=_risk_weight, nargs='+',
+                        help="Risk skoru ağırlıklarını değiştir (toplamları 1 olmalı), örn: Kurtosis=0.1 VaR_95=0.2; "
+                             f"faktörler: {', '.join(RISK_WEIGHTS)}")
+    parser.add_argument('--rank-volatility', choices=RANK_VOLATILITIES, default='historical',
+                        help="Risk skorundaki volatilite: historical = örneklem, conditional = --vol-model tahmini")
+    parser.add_argument('--risk-history', metavar='N', type=int,
+                        help="Her bar (günlük veride her gün) için son N bar'ın metrikleriyle risk skoru ve "
+                             "kategori geçişlerini hesapla")
+
+
+def _add_covariance_options(parser):
+    parser.add_argument('--covariance', choices=COVARIANCE_METHODS, default='pairwise',
+                        help="Korelasyon/kovaryans tahmincisi (pairwise = ikili Pearson korelasyonu)")
+    parser.add_argument('--cov-window', metavar='N', type=int, default=252,
+                        help="rolling tahmincisinin pencere uzunluğu (bar)")
+    parser.add_argument('--ewma-decay', type=float, default=0.94, help="ewma tahmincisinin azalma katsayısı")
+    parser.add_argument('--cov-state', metavar='PATH',
+                        help="Tahminci durumunu bu .npz dosyasından sürdür ve kaydet "
+                             "(yalnızca yeni günler işlenir)")
+
+
+def _add_plot_options(parser):
+    parser.add_argument('--plots', choices=PLOT_MODES, default='full',
+                        help="Grafikler: none = çizme, draft = hızlı düşük çözünürlük, full = 300 DPI")
+
+
+def _add_report_options(parser):
+    parser.add_argument('--report-formats', metavar='BİÇİM', nargs='+', choices=REPORT_FORMATS,
+                        default=list(DEFAULT_FORMATS),
+                        help="Özet raporun biçimleri: md, html, json "
+                             "(yalnızca girdisi değişen bölümler yeniden yazılır)")
+
+
+def _run_profile(args):
+    """RunProfile requested with the --profile options, or None."""
+    if not (args.profile or args.profile_memory or args.profile_hook):
+        return None
+    hooks = []
+    if args.profile_hook:
+        hooks.append(PROFILER_HOOKS[args.profile_hook](args.profile_dir, args.profile_stages))
+    return RunProfile(memory=args.profile_memory, hooks=hooks,
+                      metadata={'command': args.command, 'universe': args.universe.name})
+
+
+def _report_profile(args, profile):
+    print("\nAşama süreleri:")
+    for line in profile.summary_lines():
+        print(f"  {line}")
+    if args.profile:
+        profile.write(args.profile)
+        print(f"✓ Çalışma profili yazıldı: {args.profile}")
+    if args.profile_hook:
+        print(f"✓ Profil aracı çıktıları: {args.profile_dir}/")
+
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--universe', metavar='AD|DOSYA[#AD]', default=DEFAULT_UNIVERSE,
+                        help="Analiz edilecek hisse evreni: kayıtlı ad (bist30, universes/AD.csv ...) "
+                             "ya da CSV/JSON/YAML evren dosyası")
+    common.add_argument('--allow-missing', action='store_true',
+                        help="Verisi olmayan hisseleri hata vermek yerine analiz dışı bırak")
+    common.add_argument('--start', default=DEFAULT_START, help="Başlangıç tarihi (YYYY-AA-GG)")
+    common.add_argument('--end', help="Bitiş tarihi (YYYY-AA-GG, varsayılan: bugün)")
+    common.add_argument('--interval', choices=BAR_INTERVALS, default=DEFAULT_INTERVAL,
+                        help="Bar aralığı: 1d = günlük, 1m ... 1h = seans içi (data/<aralık>/ altında saklanır; "
+                             "yıllıklaştırma Borsa İstanbul seansına göre yapılır)")
+    common.add_argument('--resample-from', metavar='ARALIK', choices=BAR_INTERVALS,
+                        help="--interval bar'larını bu daha ince aralığın kayıtlı bar'larından üret (örn: 1m)")
+    common.add_argument('--missing-bars', choices=MISSING_BARS, default=DEFAULT_MISSING_BARS,
+                        help="Listelenmiş bir hissenin işlem takviminde eksik bar'ları: gap = sonraki getiri "
+                             "boşluğu kapsar, ffill = son fiyat taşınır (sıfır getiri)")
+    common.add_argument('--workers', type=int, default=1,
+                        help="Metrik hesaplaması için süreç sayısı (1 = seri)")
+    common.add_argument('--cache-dir', metavar='DIR',
+                        help="Hesaplanan metrikleri ve çıktıları bu klasörde önbelleğe al")
+    common.add_argument('--artifacts-dir', metavar='DIR', default=ARTIFACTS_DIR,
+                        help="Aşamalar arası ara çıktıların klasörü")
+    common.add_argument('--store', metavar='DIR',
+                        help="Fiyatları CSV yerine sütunlu ikili veri deposundan oku/yaz")
+    common.add_argument('--profile', metavar='JSON',
+                        help="Aşama ve alt adım sürelerini (ve bellek tepe noktalarını) bu JSON dosyasına yaz")
+    common.add_argument('--profile-memory', action='store_true',
+                        help="Aşama başına bellek tepe noktasını tracemalloc ile ölç (çalışmayı yavaşlatır)")
+    common.add_argument('--profile-hook', choices=list(PROFILER_HOOKS),
+                        help="Aşamaları profil aracıyla çalıştır: cprofile = .prof (pstats), "
+                             "sample = örneklemeli yığın sayımı (.folded, flame graph)")
+    common.add_argument('--profile-stages', metavar='AD', nargs='+',
+                        help="--profile-hook ile sarılacak aşama/adım adları (varsayılan: ana aşamalar)")
+    common.add_argument('--profile-dir', metavar='DIR', default=PROFILE_DIR,
+                        help="--profile-hook çıktılarının klasörü")
+
+    parser = argparse.ArgumentParser(prog='bist-risk', description="Hisse senedi risk analizi")
+    commands = parser.add_subparsers(dest='command', required=True, metavar='KOMUT')
+
+    fetch = commands.add_parser('fetch', parents=[common], help="Fiyat verilerini indir/güncelle")
+    _add_fetch_options(fetch)
+    compute = commands.add_parser('compute', parents=[common], help="Hisse başına risk metriklerini hesapla")
+    _add_compute_options(compute)
+    rank = commands.add_parser('rank', parents=[common], help="Risk sıralamasını oluştur")
+    _add_rank_options(rank)
+    report = commands.add_parser('report', parents=[common], help="Sektör özeti, korelasyon ve özet raporu yaz")
+    _add_covariance_options(report)
+    _add_report_options(report)
+    plot = commands.add_parser('plot', parents=[common], help="Grafikleri çiz")
+    _add_plot_options(plot)
+    _add_covariance_options(plot)
+    portfolio = commands.add_parser('portfolio', parents=[common],
+                                    help="Ağırlıklı portföyün riskini ve risk katkılarını hesapla")
+    portfolio.add_argument('--weights', metavar='CSV',
+                           help="symbol ve weight sütunlu ağırlık dosyası (varsayılan: eşit ağırlık)")
+    _add_level_option(portfolio)
+    _add_covariance_options(portfolio)
+
+    run = commands.add_parser('all', parents=[common], help="Tüm aşamaları sırayla çalıştır")
+    run.add_argument('--cache-only', action='store_true',
+                     help="Ağa bağlanmadan data/ klasöründeki CSV dosyalarını kullan")
+    _add_fetch_options(run)
+    _add_compute_options(run)
+    _add_rank_options(run)
+    _add_plot_options(run)
+    _add_covariance_options(run)
+    _add_report_options(run)
+    return parser
+
+
+def main(argv=None):
+    """Entry point of the ``bist-risk`` command; returns the exit status."""
+    args = build_parser().parse_args(argv)
+    args.end = args.end or today()
+    try:
+        args.universe = get_universe(args.universe)
+    except (ValueError, OSError, ImportError) as e:
+        print(f"Hata: {e}")
+        return 1
+
+    from .result_cache import ResultCache
+
+    warnings.filterwarnings('ignore')
+    ensure_output_dirs()
+    cache = ResultCache(args.cache_dir)
+
+    profile = _run_profile(args)
+    try:
+        with profiling(profile) if profile else contextlib.nullcontext():
+            STAGES[args.command](args, cache)
+    except (PipelineError, FileNotFoundError) as e:
+        print(f"Hata: {e}")
+        return 1
+    finally:
+        if profile:
+            _report_profile(args, profile)
+
+    if cache.enabled:
+        cache_stats = cache.stats()
+        print(f"\nÖnbellek: {cache_stats['hits']} isabet, {cache_stats['misses']} ıska, "
+              f"{cache_stats['evictions']} çıkarma ({cache_stats['bytes'] / 1e6:.1f} MB)")
+    return 0
+
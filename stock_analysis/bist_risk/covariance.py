@@ -0,0 +1,287 @@
+"""Covariance estimators of daily returns that update incrementally.
+
+Every estimator keeps O(N^2) running state for N symbols, so adding a
+day costs O(N^2) whatever the length of the history, and the state can
+be saved and resumed (see save() / load_estimator()). Updates take a
+block of rows at once, which turns the first build over the full history
+into a few matrix products. Missing returns (NaN) are skipped pairwise.
+
+- ``sample``: expanding pairwise-complete sample covariance
+- ``ledoit-wolf``: the same, shrunk towards a scaled identity (Ledoit & Wolf, 2004)
+- ``rolling``: sample covariance of the last ``window`` days
+- ``ewma``: RiskMetrics exponentially weighted covariance (zero mean, ``decay`` 0.94)
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+STATE_VERSION = 1
+
+DEFAULT_WINDOW = 252
+DEFAULT_DECAY = 0.94
+
+
+def correlation_from_covariance(cov):
+    """Correlation matrix of a covariance matrix (exactly 1 on the diagonal where defined)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std = np.sqrt(np.diag(cov))
+        corr = cov / np.outer(std, std)
+    np.clip(corr, -1.0, 1.0, out=corr)
+    np.fill_diagonal(corr, np.where(std > 0, 1.0, np.nan))
+    return corr
+
+
+class CovarianceEstimator:
+    """Base class: symbol bookkeeping, date filtering and persistence."""
+
+    kind = None
+    # Names of the (N x N) state matrices, grown when symbols are added
+    matrices = ()
+
+    def __init__(self, symbols=()):
+        self.symbols = []
+        self.index = {}
+        self.last_date = None
+        for name in self.matrices:
+            setattr(self, name, np.zeros((0, 0)))
+        self.add_symbols(symbols)
+
+    def params(self):
+        return {}
+
+    def add_symbols(self, symbols):
+        """Start tracking new symbols (they have no history yet)."""
+        new = [symbol for symbol in symbols if symbol not in self.index]
+        if not new:
+            return
+        for symbol in new:
+            self.index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        n = len(self.symbols)
+        for name in self.matrices:
+            old = getattr(self, name)
+            grown = np.zeros((n, n))
+            grown[:old.shape[0], :old.shape[1]] = old
+            setattr(self, name, grown)
+        self._grown(len(new))
+
+    def _grown(self, added):
+        """Hook for state that is not an (N x N) matrix."""
+
+    def update(self, dates, symbols, returns):
+        """Add the rows of a (dates x symbols) return matrix dated after the last update.
+
+        Returns the number of rows applied, so replaying history is harmless.
+        """
+        dates = pd.DatetimeIndex(dates)
+        returns = np.asarray(returns, dtype=np.float64)
+        if self.last_date is not None:
+            keep = dates > pd.Timestamp(self.last_date)
+            dates, returns = dates[keep], returns[keep]
+        if not len(dates):
+            return 0
+        self.add_symbols(symbols)
+        block = np.full((len(dates), len(self.symbols)), np.nan)
+        block[:, [self.index[symbol] for symbol in symbols]] = returns
+        self._add(block)
+        self.last_date = dates.max().isoformat()
+        return len(dates)
+
+    def _add(self, block):
+        raise NotImplementedError
+
+    def covariance(self):
+        raise NotImplementedError
+
+    def correlation(self):
+        return correlation_from_covariance(self.covariance())
+
+    def covariance_frame(self, symbols=None):
+        """Covariance as a symmetric DataFrame over ``symbols`` (default: all tracked)."""
+        symbols = self.symbols if symbols is None else list(symbols)
+        positions = [self.index[symbol] for symbol in symbols]
+        cov = self.covariance()[np.ix_(positions, positions)]
+        return pd.DataFrame((cov + cov.T) / 2, index=symbols, columns=symbols)
+
+    def _state(self):
+        return {name: getattr(self, name) for name in self.matrices}
+
+    def save(self, path):
+        """Write the estimator state to a .npz file (atomically replaced)."""
+        meta = {'version': STATE_VERSION, 'kind': self.kind, 'params': self.params(),
+                'symbols': self.symbols, 'last_date': self.last_date}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, meta=np.array(json.dumps(meta, ensure_ascii=False)), **self._state())
+        os.replace(tmp_path, path)
+
+
+def _pair_sums(block):
+    """Pairwise sums of a block of rows, as in metrics_engine._pairwise_sums but up to 4th order.
+
+    ``[i, j]`` of each matrix sums over the rows where both column i and j
+    are valid: counts, x_i, x_i^2, x_i x_j, x_i^2 x_j and x_i^2 x_j^2.
+    """
+    valid = ~np.isnan(block)
+    mask = valid.astype(np.float64)
+    x = np.where(valid, block, 0.0)
+    x2 = x * x
+    return {'n': mask.T @ mask, 'sx': x.T @ mask, 'sxx': x2.T @ mask,
+            'sxy': x.T @ x, 'sx2y': x2.T @ x, 'sx2y2': x2.T @ x2}
+
+
+class MomentCovariance(CovarianceEstimator):
+    """Pairwise sample covariance from running sums; expanding or over a rolling window.
+
+    With ``shrinkage`` the sample matrix is shrunk towards ``mean variance x
+    identity`` with the Ledoit-Wolf intensity, estimated from the same sums.
+    A rolling window keeps its last ``window`` rows: new rows are added to
+    the sums and expired ones subtracted, and the sums are rebuilt from the
+    kept rows once per window so rounding errors cannot accumulate.
+    """
+
+    matrices = ('n', 'sx', 'sxx', 'sxy', 'sx2y', 'sx2y2')
+
+    def __init__(self, symbols=(), window=None, shrinkage=False):
+        self.window = window
+        self.shrinkage = shrinkage
+        self.rows = np.zeros((0, 0))
+        self.since_rebuild = 0
+        super().__init__(symbols)
+
+    @property
+    def kind(self):
+        return 'ledoit-wolf' if self.shrinkage else 'rolling' if self.window else 'sample'
+
+    def params(self):
+        return {'window': self.window, 'shrinkage': self.shrinkage}
+
+    def _grown(self, added):
+        if self.window:
+            self.rows = np.hstack([self.rows, np.full((len(self.rows), added), np.nan)])
+
+    def _accumulate(self, block, sign=1.0):
+        for name, value in _pair_sums(block).items():
+            setattr(self, name, getattr(self, name) + sign * value)
+
+    def _add(self, block):
+        self._accumulate(block)
+        if not self.window:
+            return
+        self.rows = np.vstack([self.rows, block])
+        if len(self.rows) > self.window:
+            self._accumulate(self.rows[:-self.window], sign=-1.0)
+            self.rows = self.rows[-self.window:]
+        self.since_rebuild += len(block)
+        if self.since_rebuild >= self.window:
+            for name, value in _pair_sums(self.rows).items():
+                setattr(self, name, value)
+            self.since_rebuild = 0
+
+    def sample_covariance(self, ddof=1):
+        """Pairwise-complete sample covariance (NaN for pairs with ``ddof`` or fewer rows)."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = (self.sxy - self.sx * self.sx.T / self.n) / (self.n - ddof)
+        cov[self.n <= ddof] = np.nan
+        return cov
+
+    def shrinkage_intensity(self):
+        """Ledoit-Wolf weight of the scaled-identity target, in [0, 1]."""
+        n, sx, sxx, sxy = self.n, self.sx, self.sxx, self.sxy
+        with np.errstate(divide='ignore', invalid='ignore'):
+            a, b = sx / n, sx.T / n
+            s = self.sample_covariance(ddof=0)
+            # sum over rows of ((x_i - a)(x_j - b))^2, expanded into the running sums
+            fourth = (self.sx2y2 + b * b * sxx + a * a * sxx.T + n * a * a * b * b
+                      - 2 * b * self.sx2y - 2 * a * self.sx2y.T + 4 * a * b * sxy
+                      - 2 * a * b * b * sx - 2 * a * a * b * sx.T)
+            pi = np.nan_to_num((fourth - n * s * s) / (n * n))
+        s = np.nan_to_num(s)
+        p = len(s)
+        mu = np.trace(s) / p
+        delta = np.sum((s - mu * np.eye(p)) ** 2) / p
+        beta = min(np.sum(pi) / p, delta)
+        return beta / delta if delta > 0 else 0.0
+
+    def covariance(self):
+        cov = self.sample_covariance()
+        if not self.shrinkage:
+            return cov
+        intensity = self.shrinkage_intensity()
+        cov = np.nan_to_num(cov)
+        target = np.trace(cov) / len(cov) * np.eye(len(cov))
+        return (1 - intensity) * cov + intensity * target
+
+    def _state(self):
+        return {**super()._state(), 'rows': self.rows, 'since_rebuild': np.array(self.since_rebuild)}
+
+
+class EwmaCovariance(CovarianceEstimator):
+    """RiskMetrics exponentially weighted covariance: S <- decay S + (1 - decay) r r'.
+
+    Returns are taken as zero mean. The weight each pair has accumulated is
+    tracked too and divided out, which removes the start-up bias and
+    handles symbols listed later or with missing days.
+    """
+
+    kind = 'ewma'
+    matrices = ('weighted', 'weights')
+
+    def __init__(self, symbols=(), decay=DEFAULT_DECAY):
+        self.decay = decay
+        super().__init__(symbols)
+
+    def params(self):
+        return {'decay': self.decay}
+
+    def _add(self, block):
+        valid = ~np.isnan(block)
+        x = np.where(valid, block, 0.0)
+        k = len(block)
+        # Row t of the block is (k - 1 - t) days older than the last one
+        row_weights = (1 - self.decay) * self.decay ** np.arange(k - 1, -1, -1)[:, None]
+        self.weighted = self.decay ** k * self.weighted + (x * row_weights).T @ x
+        self.weights = self.decay ** k * self.weights + (valid * row_weights).T @ valid
+
+    def covariance(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = self.weighted / self.weights
+        cov[self.weights == 0] = np.nan
+        return cov
+
+
+def make_estimator(kind, symbols=(), window=DEFAULT_WINDOW, decay=DEFAULT_DECAY):
+    """New estimator of ``kind`` (sample, ledoit-wolf, rolling or ewma)."""
+    if kind == 'sample':
+        return MomentCovariance(symbols)
+    if kind == 'ledoit-wolf':
+        return MomentCovariance(symbols, shrinkage=True)
+    if kind == 'rolling':
+        return MomentCovariance(symbols, window=window)
+    if kind == 'ewma':
+        return EwmaCovariance(symbols, decay=decay)
+    raise ValueError(f"Bilinmeyen kovaryans tahmincisi: {kind}")
+
+
+def load_estimator(path):
+    """Restore an estimator saved with save()."""
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data['meta']))
+        if meta.get('version') != STATE_VERSION:
+            raise ValueError(f"Desteklenmeyen kovaryans durumu sürümü: {meta.get('version')}")
+        params = meta['params']
+        if meta['kind'] == 'ewma':
+            estimator = EwmaCovariance(decay=params['decay'])
+        else:
+            estimator = MomentCovariance(window=params['window'], shrinkage=params['shrinkage'])
+        estimator.symbols = meta['symbols']
+        estimator.index = {symbol: i for i, symbol in enumerate(estimator.symbols)}
+        estimator.last_date = meta['last_date']
+        for name in estimator.matrices:
+            setattr(estimator, name, data[name])
+        if isinstance(estimator, MomentCovariance):
+            estimator.rows = data['rows']
+            estimator.since_rebuild = int(data['since_rebuild'])
+    return estimator
@@ -0,0 +1,106 @@
+import os
+import pandas as pd
+
+from .instrumentation import span
+
+# Directory where download_stock_data() saves one CSV per symbol
+DATA_DIR = 'data'
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Rows per chunk of read_stock_csv_chunks()
+CHUNK_ROWS = 100_000
+
+
+def stock_csv_path(stock, data_dir=DATA_DIR):
+    """Return the CSV path used for a symbol, e.g. data/AKBNK_IS.csv."""
+    return os.path.join(data_dir, f"{stock.replace('.', '_')}.csv")
+
+
+def interval_data_dir(interval, data_dir=DATA_DIR):
+    """Directory of the CSVs of one bar interval: ``data_dir`` for daily bars, data/5m/ and so on for intraday."""
+    return data_dir if interval == '1d' else os.path.join(data_dir, interval)
+
+
+def flatten_columns(data):
+    """Drop the Ticker level yfinance adds to single-symbol downloads."""
+    if data is None:
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+    if isinstance(data.columns, pd.MultiIndex):
+        data = data.copy()
+        data.columns = data.columns.get_level_values(0)
+    data.index.name = 'Date'
+    return data
+
+
+def _header_skip(path):
+    """Rows below the header that carry no data: yfinance's Ticker and Date/Datetime rows."""
+    with open(path, 'r', encoding='utf-8') as f:
+        head = [f.readline() for _ in range(3)]
+
+    if head[0].startswith('Price') and head[1].startswith('Ticker'):
+        # First row holds the field names
+        return [1, 2] if head[2].startswith('Date') else [1]
+    return None
+
+
+def _price_columns(data):
+    """Date-indexed numeric OHLCV columns of a frame read from a price CSV."""
+    data.index = pd.to_datetime(data.index)
+    data.index.name = 'Date'
+    data = data[[col for col in data.columns if col in OHLCV_COLUMNS + ['Adj Close']]]
+    return data.apply(pd.to_numeric, errors='coerce')
+
+
+def read_stock_csv(path):
+    """Read a saved price CSV into a flat, date-indexed OHLCV DataFrame.
+
+    Handles both yfinance's three-row header (Price / Ticker / Date) and a
+    plain single-row header.
+    """
+    data = _price_columns(pd.read_csv(path, skiprows=_header_skip(path), index_col=0))
+    data = data[~data.index.duplicated(keep='last')].sort_index()
+    return data
+
+
+def read_stock_csv_chunks(path, chunk_rows=CHUNK_ROWS):
+    """Read a saved price CSV as read_stock_csv() does, ``chunk_rows`` rows at a time.
+
+    Yields the chunks in file order without sorting or removing duplicate
+    dates, so a long intraday file is never held in memory at once.
+    """
+    with pd.read_csv(path, skiprows=_header_skip(path), index_col=0, chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            yield _price_columns(chunk)
+
+
+def load_cached_data(stocks, data_dir=DATA_DIR, reader=read_stock_csv):
+    """Load previously saved CSVs for the given symbols.
+
+    Returns a tuple ``(all_data, missing)`` where ``all_data`` is the same
+    ``{symbol: DataFrame}`` mapping that download_stock_data() produces and
+    ``missing`` lists the symbols without a readable file. ``reader``
+    turns a CSV path into its DataFrame (e.g. bars.resample_csv).
+    """
+    all_data = {}
+    missing = []
+
+    for stock in stocks:
+        path = stock_csv_path(stock, data_dir)
+        if not os.path.exists(path):
+            missing.append(stock)
+            continue
+        try:
+            with span(stock):
+                data = reader(path)
+        except Exception as e:
+            print(f"✗ {stock} önbellek dosyası okunamadı: {e}")
+            missing.append(stock)
+            continue
+
+        if data.empty:
+            missing.append(stock)
+        else:
+            all_data[stock] = data
+
+    return all_data, missing
@@ -0,0 +1,176 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from .data_loader import DATA_DIR, OHLCV_COLUMNS, flatten_columns, read_stock_csv, stock_csv_path
+
+# Rows re-downloaded before the last stored date to detect adjusted history
+OVERLAP_ROWS = 5
+
+# Relative price difference on overlapping rows treated as a corporate action
+ADJUSTMENT_TOLERANCE = 1e-4
+
+
+def detect_adjustment(stored, fresh, tolerance=ADJUSTMENT_TOLERANCE):
+    """Return True if prices on dates present in both frames disagree.
+
+    yfinance back-adjusts the whole history after a split or dividend, so a
+    mismatch on the overlap means the stored series is stale.
+    """
+    common = stored.index.intersection(fresh.index)
+    if len(common) == 0:
+        return False
+
+    cols = [col for col in OHLCV_COLUMNS if col != 'Volume' and col in stored.columns and col in fresh.columns]
+    old = stored.loc[common, cols].to_numpy(dtype=float)
+    new = fresh.loc[common, cols].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rel_diff = np.abs(new - old) / np.abs(old)
+    return bool(np.nanmax(rel_diff, initial=0.0) > tolerance)
+
+
+def _replace_csv(data, path):
+    """Write ``data`` to ``path`` through a temporary file, so a failed write never leaves a truncated CSV."""
+    tmp_path = f"{path}.tmp"
+    data.to_csv(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _append_csv(rows, path):
+    """Append ``rows`` to a copy of the CSV at ``path`` and swap it in, so an interrupted append leaves the old file."""
+    tmp_path = f"{path}.tmp"
+    shutil.copyfile(path, tmp_path)
+    rows.to_csv(tmp_path, mode='a', header=False)
+    os.replace(tmp_path, path)
+
+
+def _start_path(path):
+    return f"{path}.start"
+
+
+def requested_start(path):
+    """Earliest start date already downloaded into the CSV at ``path``, or None if it was never recorded."""
+    try:
+        with open(_start_path(path)) as f:
+            return pd.Timestamp(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def _record_start(path, start):
+    with open(_start_path(path), 'w') as f:
+        f.write(pd.Timestamp(start).strftime('%Y-%m-%d'))
+
+
+def _mark_rewritten(path):
+    """Touch ``<csv>.rewritten``: rows before the last stored date changed, its mtime says when."""
+    with open(f"{path}.rewritten", 'w'):
+        pass
+
+
+def rewritten_since(stocks, since_ns, data_dir=DATA_DIR):
+    """Symbols of ``stocks`` whose stored history was rebuilt, backfilled or refreshed after ``since_ns``.
+
+    ``since_ns`` is a file time in nanoseconds, usually the mtime of a
+    state file built incrementally from the history: state covering the
+    old rows of these symbols no longer matches their CSV.
+    """
+    changed = []
+    for stock in stocks:
+        try:
+            if os.stat(f"{stock_csv_path(stock, data_dir)}.rewritten").st_mtime_ns > since_ns:
+                changed.append(stock)
+        except OSError:
+            continue
+    return changed
+
+
+def sync_stock(stock, download, start_date, end_date, data_dir=DATA_DIR, full_refresh=False,
+               overlap_rows=OVERLAP_ROWS):
+    """Bring one symbol's CSV up to date, downloading only the missing head and tail.
+
+    ``download(stock, start, end)`` must return a yfinance-style DataFrame.
+    When ``start_date`` is earlier than both the first stored date and the
+    earliest start already downloaded (kept in ``<csv>.start``), the missing
+    head is fetched and prepended. The last ``overlap_rows`` stored rows are
+    fetched again; new dates are appended to the file, and the full history
+    is re-downloaded only when the overlap shows a corporate-action
+    adjustment. A rebuild starts at the earlier of ``start_date`` and the
+    first stored date, and keeps the stored file when the re-download comes
+    back empty. Every write goes through a temporary file.
+
+    Returns ``(data, status)`` where ``status`` has ``action`` (``created``,
+    ``appended``, ``backfilled``, ``unchanged`` or ``rebuilt``) and
+    ``rows_added``. ``backfilled`` and ``rebuilt`` change rows before the
+    last stored date (as does ``full_refresh`` over an existing file), so
+    state built incrementally from the old history no longer matches it;
+    such writes touch ``<csv>.rewritten`` (see rewritten_since()).
+    """
+    path = stock_csv_path(stock, data_dir)
+    stored = None
+    if not full_refresh and os.path.exists(path):
+        stored = read_stock_csv(path)
+        if stored.empty:
+            stored = None
+
+    if stored is None:
+        data = flatten_columns(download(stock, start_date, end_date))
+        if data.empty:
+            return data, {'action': 'unchanged', 'rows_added': 0}
+        os.makedirs(data_dir, exist_ok=True)
+        refreshed = os.path.exists(path)
+        _replace_csv(data, path)
+        _record_start(path, start_date)
+        if refreshed:
+            _mark_rewritten(path)
+        return data, {'action': 'created', 'rows_added': len(data)}
+
+    # History older than the first stored row: fetched once per earlier start, since a later listing has none
+    backfilled = 0
+    first_date = stored.index[0]
+    known_start = min(first_date, requested_start(path) or first_date)
+    if pd.Timestamp(start_date) < known_start:
+        head = flatten_columns(download(stock, start_date, first_date.strftime('%Y-%m-%d')))
+        head = head[head.index < first_date].reindex(columns=stored.columns)
+        if not head.empty:
+            stored = pd.concat([head, stored])
+            _replace_csv(stored, path)
+            _mark_rewritten(path)
+            backfilled = len(head)
+        _record_start(path, start_date)
+    status = {'action': 'backfilled' if backfilled else 'unchanged', 'rows_added': backfilled}
+
+    # yfinance treats ``end`` as exclusive, so nothing new can exist yet
+    last_date = stored.index[-1]
+    if last_date + pd.Timedelta(days=1) >= pd.Timestamp(end_date):
+        return stored.loc[start_date:], status
+
+    fetch_start = stored.index[-min(overlap_rows, len(stored))]
+    fresh = flatten_columns(download(stock, fetch_start.strftime('%Y-%m-%d'), end_date))
+    if fresh.empty:
+        return stored.loc[start_date:], status
+
+    if detect_adjustment(stored, fresh):
+        print(f"↺ {stock}: düzeltilmiş fiyat geçmişi tespit edildi, tüm seri yeniden indiriliyor")
+        # From the first stored date too, so history older than this run's start is not cut off
+        rebuild_start = min(pd.Timestamp(start_date), stored.index[0])
+        data = flatten_columns(download(stock, rebuild_start.strftime('%Y-%m-%d'), end_date))
+        if data.empty:
+            print(f"⚠ {stock}: yeniden indirme boş döndü, kayıtlı seri korunuyor")
+            return stored.loc[start_date:], status
+        _replace_csv(data, path)
+        _mark_rewritten(path)
+        return data.loc[start_date:], {'action': 'rebuilt', 'rows_added': len(data)}
+
+    new_rows = fresh[fresh.index > last_date].reindex(columns=stored.columns)
+    if new_rows.empty:
+        return stored.loc[start_date:], status
+
+    _append_csv(new_rows, path)
+    data = pd.concat([stored, new_rows])
+    if not backfilled:
+        status['action'] = 'appended'
+    status['rows_added'] += len(new_rows)
+    return data.loc[start_date:], status
@@ -0,0 +1,106 @@
+import numpy as np
+
+# Rows processed per step: at least CHUNK_ROWS, and enough for about
+# CHUNK_CELLS values on narrow matrices (long intraday histories of a few
+# columns); bounds the size of every temporary array
+CHUNK_ROWS = 256
+CHUNK_CELLS = 2**18
+
+
+def drawdown_stats(wealth, chunk_rows=None):
+    """Maximum drawdown statistics for each column of a price/wealth path.
+
+    ``wealth`` is a 1-D series or a (rows x columns) matrix; NaN marks rows
+    where a column has no value. The matrix is scanned once, ``chunk_rows``
+    at a time (default: see CHUNK_ROWS), carrying only per-column running
+    state, so no full-length drawdown, running-max or cumulative series is
+    ever materialised.
+
+    Returns a dict of per-column arrays:
+
+    - ``max_drawdown``: most negative ``wealth / running_peak - 1``
+    - ``peak``, ``trough``: row indices of the worst drawdown episode
+    - ``recovery``: first row after the trough back at the peak level (-1 if none)
+    - ``peak_to_trough``: rows from peak to trough
+    - ``time_to_recovery``: rows from trough to recovery (NaN if not recovered)
+    - ``duration``: rows from peak to recovery, or to the last row if not recovered
+    """
+    wealth = np.asarray(wealth, dtype=np.float64)
+    if wealth.ndim == 1:
+        wealth = wealth[:, None]
+    n_rows, n_cols = wealth.shape
+    cols = np.arange(n_cols)
+    if chunk_rows is None:
+        chunk_rows = max(CHUNK_ROWS, CHUNK_CELLS // max(n_cols, 1))
+
+    peak_val = np.full(n_cols, -np.inf)
+    peak_idx = np.full(n_cols, -1, dtype=np.intp)
+    last_idx = np.full(n_cols, -1, dtype=np.intp)
+    best_dd = np.full(n_cols, np.inf)
+    best_peak = np.full(n_cols, -1, dtype=np.intp)
+    best_trough = np.full(n_cols, -1, dtype=np.intp)
+    best_level = np.full(n_cols, np.nan)
+    recovery = np.full(n_cols, -1, dtype=np.intp)
+
+    for start in range(0, n_rows, chunk_rows):
+        block = wealth[start:start + chunk_rows]
+        rows = np.arange(start, start + len(block))[:, None]
+        valid = ~np.isnan(block)
+
+        # Running peak and the row it was set on, continuing from the last chunk
+        running = np.fmax.accumulate(np.vstack([peak_val, block]), axis=0)[1:]
+        at_peak = valid & (block >= running)
+        running_idx = np.maximum.accumulate(np.vstack([peak_idx, np.where(at_peak, rows, -1)]), axis=0)[1:]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dd = np.where(valid, block / running - 1.0, np.inf)
+        worst = dd.argmin(axis=0)
+        worst_dd = dd[worst, cols]
+
+        improved = worst_dd < best_dd
+        best_dd = np.where(improved, worst_dd, best_dd)
+        best_trough = np.where(improved, start + worst, best_trough)
+        best_peak = np.where(improved, running_idx[worst, cols], best_peak)
+        best_level = np.where(improved, running[worst, cols], best_level)
+        recovery = np.where(improved, -1, recovery)
+
+        # First row after the current worst trough that regains its peak level
+        pending = recovery < 0
+        if pending.any():
+            regained = valid & (rows > best_trough) & (block >= best_level) & pending
+            found = regained.any(axis=0)
+            recovery = np.where(found, start + regained.argmax(axis=0), recovery)
+
+        has_rows = valid.any(axis=0)
+        last_idx = np.where(has_rows, start + len(block) - 1 - valid[::-1].argmax(axis=0), last_idx)
+        peak_val = running[-1]
+        peak_idx = running_idx[-1]
+
+    empty = np.isinf(best_dd)
+    # A path that never fell below its peak is "recovered" at its worst row
+    flat = best_dd == 0
+    recovery = np.where(flat, best_trough, recovery)
+    recovered = recovery >= 0
+    with np.errstate(invalid='ignore'):
+        time_to_recovery = np.where(recovered, recovery - best_trough, np.nan)
+        duration = np.where(recovered, recovery, last_idx) - best_peak
+
+    return {
+        'max_drawdown': np.where(empty, np.nan, best_dd),
+        'peak': best_peak,
+        'trough': best_trough,
+        'recovery': recovery,
+        'peak_to_trough': np.where(empty, np.nan, best_trough - best_peak),
+        'time_to_recovery': np.where(empty, np.nan, time_to_recovery),
+        'duration': np.where(empty, np.nan, duration),
+    }
+
+
+def index_to_dates(indices, dates):
+    """Map row indices from drawdown_stats() to dates, with NaT for -1."""
+    dates = np.asarray(dates, dtype='datetime64[ns]')
+    indices = np.asarray(indices)
+    out = np.full(indices.shape, np.datetime64('NaT'), dtype='datetime64[ns]')
+    found = indices >= 0
+    out[found] = dates[indices[found]]
+    return out
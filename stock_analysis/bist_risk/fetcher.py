@@ -0,0 +1,171 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+# Errors worth another attempt: TimeoutError, ConnectionError and requests' RequestException are all OSError.
+# Anything else (a bad symbol, no data) fails the same way on every try.
+TRANSIENT_ERRORS = (OSError,)
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing ``rate`` calls per second on average.
+
+    Up to ``capacity`` calls may be made back to back before callers start
+    waiting for tokens to refill.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+
+
+@dataclass
+class FetchResult:
+    """Outcome of fetch_all(): values, failures and per-symbol timings."""
+    data: dict = field(default_factory=dict)
+    failures: dict = field(default_factory=dict)
+    timings: dict = field(default_factory=dict)
+    attempts: dict = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def succeeded(self):
+        return list(self.data)
+
+    @property
+    def failed(self):
+        return list(self.failures)
+
+
+def call_with_timeout(func, args, timeout):
+    """Run ``func(*args)`` and raise TimeoutError if it takes longer than ``timeout``.
+
+    The call runs in a daemon thread so a hung request cannot hold a pool
+    worker forever; its eventual result is discarded. That thread keeps
+    running after the timeout, so ``func`` should have no side effects
+    (a download, not a download that also writes files).
+    """
+    if timeout is None:
+        return func(*args)
+
+    outcome = {}
+
+    def target():
+        try:
+            outcome['value'] = func(*args)
+        except BaseException as e:
+            outcome['error'] = e
+
+    worker = threading.Thread(target=target, daemon=True)
+    worker.start()
+    worker.join(timeout)
+    if worker.is_alive():
+        raise TimeoutError(f"{timeout:.1f} s içinde yanıt alınamadı")
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['value']
+
+
+def with_timeout(func, timeout):
+    """``func`` wrapped so that every call goes through call_with_timeout()."""
+    def call(*args):
+        return call_with_timeout(func, args, timeout)
+
+    return call
+
+
+def rate_limited(func, limiter):
+    """``func`` wrapped so that every call first takes a token from ``limiter``.
+
+    Wrap the request itself when one fetch may issue several of them.
+    """
+    def call(*args):
+        limiter.acquire()
+        return func(*args)
+
+    return call
+
+
+def _fetch_one(symbol, fetch, limiter, retries, backoff, max_backoff, timeout, sleep, retry_on):
+    """Fetch one symbol, retrying ``retry_on`` errors; returns (value, error, attempts, seconds)."""
+    started = time.perf_counter()
+    error = None
+    for attempt in range(retries + 1):
+        if attempt:
+            sleep(min(max_backoff, backoff * 2 ** (attempt - 1)))
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            value = call_with_timeout(fetch, (symbol,), timeout)
+            return value, None, attempt + 1, time.perf_counter() - started
+        except retry_on as e:
+            error = e
+        except Exception as e:
+            return None, e, attempt + 1, time.perf_counter() - started
+    return None, error, retries + 1, time.perf_counter() - started
+
+
+def fetch_all(symbols, fetch, workers=8, retries=2, backoff=0.5, max_backoff=8.0,
+              rate=None, burst=None, timeout=None, on_complete=None, sleep=time.sleep,
+              retry_on=TRANSIENT_ERRORS):
+    """Call ``fetch(symbol)`` for every symbol on a bounded thread pool.
+
+    A symbol failing with one of ``retry_on`` is retried up to ``retries``
+    times with exponential backoff (``backoff``, ``2 * backoff``, ... capped
+    at ``max_backoff`` seconds); other errors fail it at once.
+    ``rate``/``burst`` configure a shared token bucket limiting fetch calls
+    per second (see rate_limited() to limit the requests inside a fetch),
+    and ``timeout`` bounds every single attempt. ``on_complete`` is called
+    from the calling thread as ``on_complete(symbol, value, error)`` when a
+    symbol finishes.
+
+    Returns a FetchResult; exceptions never escape for individual symbols.
+    """
+    symbols = list(symbols)
+    limiter = TokenBucket(rate, burst) if rate else None
+    result = FetchResult()
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(symbols) or 1))) as pool:
+        futures = {
+            pool.submit(_fetch_one, symbol, fetch, limiter, retries, backoff, max_backoff, timeout, sleep,
+                        retry_on): symbol
+            for symbol in symbols
+        }
+        for future in as_completed(futures):
+            symbol = futures[future]
+            value, error, attempts, seconds = future.result()
+            result.timings[symbol] = seconds
+            result.attempts[symbol] = attempts
+            if error is None:
+                result.data[symbol] = value
+            else:
+                result.failures[symbol] = error
+            if on_complete is not None:
+                on_complete(symbol, value, error)
+
+    # Keep the caller's symbol order regardless of completion order
+    result.data = {symbol: result.data[symbol] for symbol in symbols if symbol in result.data}
+    result.elapsed = time.perf_counter() - started
+    return result
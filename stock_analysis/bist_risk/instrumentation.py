@@ -0,0 +1,349 @@
+"""Opt-in run profiling: nested stage timers, memory high-water marks and profiler hooks.
+
+Stages and their steps are wrapped in spans, with the ``span()`` context
+manager or the ``timed()`` decorator. A span costs one global lookup
+unless a RunProfile is active (see ``profiling()``), so they can sit on
+hot paths. An active profile records, per span path, the number of
+calls, wall and CPU time, the process RSS high-water mark and, with
+``memory=True``, the tracemalloc peak above what was live when the span
+started. Spans opened on worker threads (per-symbol downloads) nest
+under the span the main thread is in. The result is a JSON run profile.
+
+Hooks wrap matching spans in a profiler: CProfileHook writes a pstats
+file per span, SamplingHook a folded-stack file (flame graph input)
+from a stack sampler thread. Only the standard library is imported.
+"""
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+PROFILE_VERSION = 1
+PROFILE_DIR = 'profiles'
+
+# Default period of the sampling hook (seconds)
+SAMPLE_INTERVAL = 0.005
+
+# Profile that span() records into, set by profiling()
+_active = None
+_NO_SPAN = contextlib.nullcontext()
+
+
+def rss_peak_mb(children=False):
+    """Peak resident set size of this process (or of its finished child processes) in MB.
+
+    None where the platform has no ``resource`` module (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return usage.ru_maxrss / (2**20 if sys.platform == 'darwin' else 2**10)
+
+
+class _Node:
+    """Aggregated measurements of one span path."""
+    __slots__ = ('name', 'calls', 'wall', 'cpu', 'peak', 'rss', 'children')
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak = None
+        self.rss = None
+        self.children = {}
+
+    def child(self, name):
+        node = self.children.get(name)
+        if node is None:
+            node = self.children[name] = _Node(name)
+        return node
+
+    def to_dict(self):
+        entry = {'name': self.name, 'calls': self.calls, 'wall_s': round(self.wall, 6), 'cpu_s': round(self.cpu, 6)}
+        if self.peak is not None:
+            entry['peak_mb'] = round(self.peak / 2**20, 3)
+        if self.rss is not None:
+            entry['rss_peak_mb'] = round(self.rss, 1)
+        if self.children:
+            entry['spans'] = [child.to_dict() for child in self.children.values()]
+        return entry
+
+
+class _Frame:
+    """An open span: its node and, when tracing memory, the traced bytes at entry and the peak so far."""
+    __slots__ = ('node', 'base', 'peak')
+
+    def __init__(self, node):
+        self.node = node
+        self.base = self.peak = 0
+
+
+class RunProfile:
+    """Span tree of one run.
+
+    ``memory=True`` traces allocations with tracemalloc while the profile
+    is active (several times slower). ``hooks`` are callables taking a
+    span path ('all/compute') and returning a context manager to run the
+    span in, or None to leave it alone; they only see main-thread spans.
+    """
+
+    def __init__(self, memory=False, hooks=(), metadata=None):
+        self.memory = memory
+        self.hooks = list(hooks)
+        self.metadata = dict(metadata or {})
+        self.root = _Node('run')
+        self.started = None
+        self._clock = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._main_thread = None
+        self._main_stack = []
+
+    def start(self):
+        self._main_thread = threading.get_ident()
+        self._local.stack = self._main_stack
+        self.started = datetime.now()
+        self._clock = (time.perf_counter(), time.process_time())
+        if self.memory:
+            import tracemalloc
+            tracemalloc.start()
+
+    def stop(self):
+        self.root.calls += 1
+        self.root.wall += time.perf_counter() - self._clock[0]
+        self.root.cpu += time.process_time() - self._clock[1]
+        self.root.rss = rss_peak_mb()
+        if self.memory:
+            import tracemalloc
+            self.root.peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    @contextlib.contextmanager
+    def span(self, name):
+        """Record the enclosed block as ``name`` under the current span."""
+        main = threading.get_ident() == self._main_thread
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        # Worker threads start under the span the main thread is in
+        parents = stack or self._main_stack
+        parent = parents[-1].node if parents else self.root
+        with self._lock:
+            node = parent.child(name)
+        frame = _Frame(node)
+        tracing = self.memory and main
+        if tracing:
+            import tracemalloc
+            current, peak = tracemalloc.get_traced_memory()
+            # Resetting the peak for this span must not lose the enclosing spans' peaks
+            for outer in stack:
+                outer.peak = max(outer.peak, peak)
+            tracemalloc.reset_peak()
+            frame.base = frame.peak = current
+
+        with contextlib.ExitStack() as wrappers:
+            if main:
+                path = '/'.join([outer.node.name for outer in stack] + [name])
+                for hook in self.hooks:
+                    wrapper = hook(path)
+                    if wrapper is not None:
+                        wrappers.enter_context(wrapper)
+            cpu_clock = time.process_time if main else time.thread_time
+            stack.append(frame)
+            started, cpu_started = time.perf_counter(), cpu_clock()
+            try:
+                yield
+            finally:
+                wall, cpu = time.perf_counter() - started, cpu_clock() - cpu_started
+                stack.pop()
+                if tracing:
+                    peak = tracemalloc.get_traced_memory()[1]
+                    for outer in stack + [frame]:
+                        outer.peak = max(outer.peak, peak)
+                with self._lock:
+                    node.calls += 1
+                    node.wall += wall
+                    node.cpu += cpu
+                    if tracing:
+                        node.peak = max(node.peak or 0, frame.peak - frame.base)
+                    if main:
+                        node.rss = rss_peak_mb()
+
+    def to_dict(self):
+        """The run profile as JSON-serialisable data."""
+        return {
+            'version': PROFILE_VERSION,
+            'started': self.started.isoformat(timespec='seconds') if self.started else None,
+            **self.metadata,
+            'memory_tracing': self.memory,
+            'children_rss_peak_mb': rss_peak_mb(children=True),
+            **self.root.to_dict(),
+        }
+
+    def write(self, path):
+        """Save the run profile as JSON; the file is replaced atomically."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def summary_lines(self, depth=2):
+        """One line per span down to ``depth`` levels: indented name, calls, seconds and peaks."""
+        lines = []
+
+        def add(node, level):
+            if level > depth:
+                return
+            memory = f" {node.peak / 2**20:9.1f} MB" if node.peak is not None else ''
+            lines.append(f"{'  ' * (level - 1) + node.name:<36} {node.calls:>5} {node.wall:9.3f} s{memory}")
+            for child in node.children.values():
+                add(child, level + 1)
+
+        for child in self.root.children.values():
+            add(child, 1)
+        return lines
+
+
+@contextlib.contextmanager
+def profiling(profile):
+    """Make ``profile`` the one span() and timed() record into for the enclosed block."""
+    global _active
+    if _active is not None:
+        raise RuntimeError("Başka bir profil zaten etkin")
+    profile.start()
+    _active = profile
+    try:
+        yield profile
+    finally:
+        _active = None
+        profile.stop()
+
+
+def span(name):
+    """Context manager recording a span in the active profile; does nothing without one."""
+    profile = _active
+    return _NO_SPAN if profile is None else profile.span(name)
+
+
+def timed(name=None):
+    """Decorator recording each call as a span named ``name`` (default: the function name)."""
+    def decorate(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profile = _active
+            if profile is None:
+                return func(*args, **kwargs)
+            with profile.span(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _hook_file(directory, path, extension):
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, path.replace('/', '.') + extension)
+
+
+class _Hook:
+    """Base of the profiler hooks: which spans they wrap.
+
+    ``stages`` are span names or paths; None selects the top-level spans
+    (the CLI stages). A span inside one already being profiled is skipped.
+    """
+
+    def __init__(self, directory=PROFILE_DIR, stages=None):
+        self.directory = directory
+        self.stages = set(stages) if stages else None
+        self._running = False
+
+    def __call__(self, path):
+        if self._running:
+            return None
+        if self.stages is None:
+            selected = '/' not in path
+        else:
+            selected = path in self.stages or path.rsplit('/', 1)[-1] in self.stages
+        return self._wrap(path) if selected else None
+
+    @contextlib.contextmanager
+    def _wrap(self, path):
+        self._running = True
+        try:
+            with self.profile(path):
+                yield
+        finally:
+            self._running = False
+
+
+class CProfileHook(_Hook):
+    """Run the selected spans under cProfile; writes ``<directory>/<span path>.prof`` (pstats format)."""
+
+    @contextlib.contextmanager
+    def profile(self, path):
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(_hook_file(self.directory, path, '.prof'))
+
+
+class SamplingHook(_Hook):
+    """Sample the main thread's stack every ``interval`` seconds during the selected spans.
+
+    Writes ``<directory>/<span path>.folded``: one ``frame;frame;... count``
+    line per distinct stack, root first, as flame graph tools read it. Much
+    lower overhead than cProfile on hot numerical loops.
+    """
+
+    def __init__(self, directory=PROFILE_DIR, stages=None, interval=SAMPLE_INTERVAL):
+        super().__init__(directory, stages)
+        self.interval = interval
+
+    @contextlib.contextmanager
+    def profile(self, path):
+        target = threading.get_ident()
+        counts = {}
+        done = threading.Event()
+
+        def sample():
+            while not done.wait(self.interval):
+                frame = sys._current_frames().get(target)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                key = ';'.join(reversed(stack))
+                counts[key] = counts.get(key, 0) + 1
+
+        sampler = threading.Thread(target=sample, name='span-sampler', daemon=True)
+        sampler.start()
+        try:
+            yield
+        finally:
+            done.set()
+            sampler.join()
+            with open(_hook_file(self.directory, path, '.folded'), 'w', encoding='utf-8') as f:
+                for stack, count in sorted(counts.items(), key=lambda item: -item[1]):
+                    f.write(f"{stack} {count}\n")
+
+
+# --profile-hook choices
+PROFILER_HOOKS = {'cprofile': CProfileHook, 'sample': SamplingHook}
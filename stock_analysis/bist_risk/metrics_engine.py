@@ -0,0 +1,230 @@
+import numpy as np
+import pandas as pd
+
+from .drawdown import drawdown_stats, index_to_dates
+from .trading_calendar import TradingCalendar
+
+# Trading days per year used to annualise daily figures (see bars.periods_per_year for intraday bars)
+TRADING_DAYS = 252
+
+# A symbol needs more than this many returns to be analysed
+MIN_OBSERVATIONS = 20
+
+# Scalar metrics compute_universe_metrics() returns per symbol, in report order
+METRIC_KEYS = [
+    'mean_return', 'std_return', 'annual_return', 'annual_volatility', 'sharpe_ratio',
+    'skewness', 'kurtosis', 'var_95', 'var_99', 'max_drawdown',
+    'extreme_positive', 'extreme_negative', 'total_observations',
+    'drawdown_duration', 'time_to_recovery',
+]
+
+# Dates of each symbol's worst drawdown, returned when dates are supplied
+DRAWDOWN_DATE_KEYS = ['drawdown_peak_date', 'drawdown_trough_date', 'drawdown_recovery_date']
+
+# Price matrix bytes compute_universe_metrics() works on at once; wider
+# matrices (long intraday histories) are processed in column blocks so the
+# engine's temporaries do not grow with the number of symbols
+BLOCK_BYTES = 16 * 2**20
+
+
+def align_prices(data_dict, calendar=None, missing='gap'):
+    """Align every symbol's price column into one (dates x symbols) matrix.
+
+    Uses ``Adj Close`` when present, otherwise ``Close``. The rows are
+    ``calendar`` (default: the TradingCalendar of the symbols' bars) and
+    each column is gathered through the symbol's offset map; ``missing``
+    is the missing-bar policy (see trading_calendar). Returns ``(dates,
+    symbols, prices)`` with NaN where a symbol has no bar.
+    """
+    series = {}
+    for stock, data in data_dict.items():
+        if data is not None and not data.empty:
+            price_col = 'Adj Close' if 'Adj Close' in data.columns else 'Close'
+            series[stock] = data[price_col]
+
+    if not series:
+        return pd.DatetimeIndex([]), [], np.empty((0, 0))
+
+    if calendar is None:
+        calendar, offsets = TradingCalendar.with_offsets(price.index for price in series.values())
+    else:
+        offsets = [calendar.offsets(price.index) for price in series.values()]
+    prices = calendar.gather([price.to_numpy(dtype=np.float64) for price in series.values()], offsets, missing)
+    return calendar.dates, list(series), prices
+
+
+def forward_fill(matrix):
+    """Column-wise forward fill of NaNs (leading NaNs stay NaN)."""
+    rows = np.arange(matrix.shape[0])[:, None]
+    idx = np.where(np.isnan(matrix), 0, rows)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return matrix[idx, np.arange(matrix.shape[1])]
+
+
+def log_returns(prices):
+    """Log returns of each column against that column's previous valid price."""
+    returns = np.full(prices.shape, np.nan)
+    if len(prices) > 1:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns[1:] = np.log(prices[1:] / forward_fill(prices)[:-1])
+    return returns
+
+
+def nan_percentile(matrix, q):
+    """Column-wise linear-interpolated percentile ignoring NaN.
+
+    Matches ``np.percentile`` on each column's valid values without the
+    per-column loop ``np.nanpercentile`` falls back to.
+    """
+    n = np.sum(~np.isnan(matrix), axis=0)
+    ordered = np.sort(matrix, axis=0)  # NaNs sort to the end
+    pos = (q / 100.0) * np.maximum(n - 1, 0)
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.minimum(lo + 1, np.maximum(n - 1, 0))
+    low = np.take_along_axis(ordered, lo[None, :], axis=0)[0]
+    high = np.take_along_axis(ordered, hi[None, :], axis=0)[0]
+    return np.where(n > 0, low + (high - low) * (pos - lo), np.nan)
+
+
+def max_drawdown_matrix(prices, returns):
+    """Column-wise drawdown statistics over the rows where ``returns`` is valid."""
+    return drawdown_stats(np.where(np.isnan(returns), np.nan, prices))
+
+
+def column_chunks(n_cols, workers, chunk_size=None):
+    """Split ``n_cols`` columns into contiguous ``(lo, hi)`` chunks.
+
+    Every chunk has at least two columns: NumPy sums a single column with
+    pairwise summation but a wider matrix row by row, and keeping the same
+    order is what makes chunked results identical to the unchunked ones.
+    """
+    if chunk_size is None:
+        chunk_size = -(-n_cols // (workers * 4))
+    chunk_size = max(2, chunk_size)
+    bounds = list(range(0, n_cols, chunk_size)) + [n_cols]
+    if len(bounds) > 2 and bounds[-1] - bounds[-2] < 2:
+        bounds.pop(-2)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def compute_universe_metrics(prices, dates=None, periods_per_year=TRADING_DAYS, block_bytes=BLOCK_BYTES):
+    """Compute every per-symbol risk metric for a (bars x symbols) price matrix.
+
+    All metrics are computed in one pass of NaN-aware, axis-wise operations
+    and returned as arrays with one entry per column, together with the
+    ``returns`` matrix. Returns are annualised with ``periods_per_year``
+    bars per year. Passing the row ``dates`` adds the peak, trough and
+    recovery dates of each worst drawdown. Matrices larger than
+    ``block_bytes`` are processed a block of columns at a time, with the
+    same results.
+    """
+    n_rows, n_cols = prices.shape
+    block = max(2, block_bytes // max(n_rows * prices.itemsize, 1))
+    if n_cols <= block:
+        return _block_metrics(prices, dates, periods_per_year)
+
+    metrics = {}
+    for lo, hi in column_chunks(n_cols, 1, block):
+        chunk = _block_metrics(prices[:, lo:hi], dates, periods_per_year)
+        for key, values in chunk.items():
+            if key not in metrics:
+                metrics[key] = np.empty(values.shape[:-1] + (n_cols,), dtype=values.dtype)
+            metrics[key][..., lo:hi] = values
+    return metrics
+
+
+def _block_metrics(prices, dates, periods_per_year):
+    """compute_universe_metrics() on one block of columns."""
+    returns = log_returns(prices)
+    valid = ~np.isnan(returns)
+    n = valid.sum(axis=0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(valid, returns, 0.0).sum(axis=0) / n
+        dev = np.where(valid, returns - mean, 0.0)
+        dev2 = dev * dev
+        m2 = dev2.sum(axis=0) / n
+        m3 = (dev2 * dev).sum(axis=0) / n
+        m4 = (dev2 * dev2).sum(axis=0) / n
+        std = np.sqrt(m2)
+        z_scores = (returns - mean) / std
+        skewness = m3 / m2 ** 1.5
+        kurtosis = m4 / m2 ** 2 - 3.0
+
+    annual_return = mean * periods_per_year
+    annual_volatility = std * np.sqrt(periods_per_year)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, annual_return / annual_volatility, 0.0)
+
+    drawdown = max_drawdown_matrix(prices, returns)
+
+    metrics = {
+        'returns': returns,
+        'mean_return': mean,
+        'std_return': std,
+        'annual_return': annual_return,
+        'annual_volatility': annual_volatility,
+        'sharpe_ratio': sharpe,
+        'skewness': skewness,
+        'kurtosis': kurtosis,
+        'var_95': nan_percentile(returns, 5),
+        'var_99': nan_percentile(returns, 1),
+        'max_drawdown': drawdown['max_drawdown'],
+        'extreme_positive': (z_scores > 2).sum(axis=0),
+        'extreme_negative': (z_scores < -2).sum(axis=0),
+        'total_observations': n,
+        'drawdown_duration': drawdown['duration'],
+        'time_to_recovery': drawdown['time_to_recovery'],
+    }
+
+    if dates is not None:
+        metrics['drawdown_peak_date'] = index_to_dates(drawdown['peak'], dates)
+        metrics['drawdown_trough_date'] = index_to_dates(drawdown['trough'], dates)
+        metrics['drawdown_recovery_date'] = index_to_dates(drawdown['recovery'], dates)
+
+    return metrics
+
+
+def _pairwise_sums(matrix):
+    """Sums over the rows where both columns of each pair are valid.
+
+    Returns ``(n, sum_x, sum_xx, sum_xy)`` where ``[i, j]`` of each is taken
+    over the rows with both column i and j present (``sum_x`` and ``sum_xx``
+    are of column i). Columns are centred on their own mean first to keep
+    the one-pass sums accurate.
+    """
+    valid = ~np.isnan(matrix)
+    mask = valid.astype(np.float64)
+    with np.errstate(invalid='ignore'):
+        centred = np.where(valid, matrix - np.nanmean(matrix, axis=0), 0.0)
+    return mask.T @ mask, centred.T @ mask, (centred * centred).T @ mask, centred.T @ centred
+
+
+def nan_covariance(matrix, ddof=1):
+    """Covariance of every column pair over the rows where both are valid.
+
+    Same result as ``DataFrame.cov()`` (pairwise-complete observations, NaN
+    for pairs with ``ddof`` or fewer), computed with matrix products.
+    """
+    n, sum_x, _, sum_xy = _pairwise_sums(matrix)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = (sum_xy - sum_x * sum_x.T / n) / (n - ddof)
+    cov[n <= ddof] = np.nan
+    return cov
+
+
+def nan_correlation(matrix):
+    """Pearson correlation of every column pair over the rows where both are valid.
+
+    Same result as ``DataFrame.corr()`` (pairwise-complete observations,
+    NaN for pairs with fewer than two), computed with matrix products
+    instead of a loop over column pairs so it scales to thousands of
+    columns.
+    """
+    n, sum_x, sum_xx, sum_xy = _pairwise_sums(matrix)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sum_xy - sum_x * sum_x.T / n
+        var = sum_xx - sum_x * sum_x / n
+        corr = cov / np.sqrt(var * var.T)
+    corr[n < 2] = np.nan
+    return np.clip(corr, -1.0, 1.0, out=corr)
@@ -0,0 +1,82 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .metrics_engine import DRAWDOWN_DATE_KEYS, TRADING_DAYS, column_chunks, compute_universe_metrics
+
+# Matrices produced per column chunk and written back through shared memory
+SHARED_OUTPUTS = ('returns',)
+
+
+def _attach(name, shape):
+    """Open an existing shared memory block as a float64 matrix."""
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+
+
+def _compute_chunk(task):
+    """Worker: compute metrics for columns [lo, hi) of the shared price matrix."""
+    names, shape, lo, hi, dates, periods_per_year = task
+    blocks = []
+    try:
+        block, prices = _attach(names['prices'], shape)
+        blocks.append(block)
+        metrics = compute_universe_metrics(prices[:, lo:hi], dates, periods_per_year)
+        for key in SHARED_OUTPUTS:
+            block, out = _attach(names[key], shape)
+            blocks.append(block)
+            out[:, lo:hi] = metrics.pop(key)
+        return lo, hi, metrics
+    finally:
+        # Views into the buffers must be gone before the blocks can close
+        prices = out = None
+        for block in blocks:
+            block.close()
+
+
+def compute_universe_metrics_parallel(prices, dates=None, workers=None, chunk_size=None,
+                                      periods_per_year=TRADING_DAYS):
+    """compute_universe_metrics() fanned out over a process pool.
+
+    The price matrix is copied once into shared memory; workers read their
+    column chunk from it and write the returns back in place, so
+    only small per-column metric arrays are pickled. Column results do not
+    depend on the other columns, so the output is identical to the serial
+    engine regardless of worker count.
+    """
+    workers = workers or os.cpu_count() or 1
+    n_rows, n_cols = prices.shape
+    if workers <= 1 or n_cols < 4:
+        return compute_universe_metrics(prices, dates, periods_per_year)
+
+    nbytes = max(prices.nbytes, 1)
+    blocks = {key: shared_memory.SharedMemory(create=True, size=nbytes)
+              for key in ('prices',) + SHARED_OUTPUTS}
+    try:
+        views = {key: np.ndarray(prices.shape, dtype=np.float64, buffer=block.buf)
+                 for key, block in blocks.items()}
+        views['prices'][:] = prices
+        names = {key: block.name for key, block in blocks.items()}
+        dates_array = None if dates is None else np.asarray(dates, dtype='datetime64[ns]')
+        tasks = [(names, prices.shape, lo, hi, dates_array, periods_per_year)
+                 for lo, hi in column_chunks(n_cols, workers, chunk_size)]
+
+        metrics = {}
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for lo, hi, chunk in pool.map(_compute_chunk, tasks):
+                for key, values in chunk.items():
+                    if key not in metrics:
+                        dtype = 'datetime64[ns]' if key in DRAWDOWN_DATE_KEYS else values.dtype
+                        metrics[key] = np.empty(n_cols, dtype=dtype)
+                    metrics[key][lo:hi] = values
+
+        for key in SHARED_OUTPUTS:
+            metrics[key] = views[key].copy()
+        views = None
+        return metrics
+    finally:
+        for block in blocks.values():
+            block.close()
+            block.unlink()
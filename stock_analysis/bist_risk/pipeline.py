@@ -0,0 +1,653 @@
+import os
+from datetime import datetime, timedelta
+
+from .instrumentation import span, timed
+
+# Only the standard library is imported here: pandas, numpy, yfinance and
+# the engine modules are imported by the stage that needs them, so the CLI
+# starts quickly and stages that do not need them never load them.
+
+DEFAULT_START = '2020-01-01'
+
+# Seconds one yfinance download may take before it is retried
+DOWNLOAD_TIMEOUT = 60
+
+# yfinance requests per second across all fetch workers (also the burst allowed)
+DOWNLOAD_RATE = 4
+
+# Bar intervals (yfinance names) prices can be fetched and analysed at; '1d'
+# is daily, the rest are intraday bars of the Borsa Istanbul session (see bars)
+BAR_INTERVALS = ('1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h', '1d')
+DEFAULT_INTERVAL = '1d'
+
+# Missing-bar policies of the aligned price panel (see trading_calendar): a
+# bar a listed stock lacks is a gap the next return spans, or a carried price
+MISSING_BARS = ('gap', 'ffill')
+DEFAULT_MISSING_BARS = 'gap'
+
+REPORTS_DIR = 'reports'
+
+# Default risk score weights of create_risk_ranking (override with --risk-weights;
+# they must sum to 1 so scores stay in the [0, 1] category bins)
+RISK_WEIGHTS = {
+    'Annual_Volatility': 0.3,
+    'Kurtosis': 0.2,
+    'Extreme_Days': 0.2,
+    'Max_Drawdown': 0.2,
+    'VaR_95': 0.1,
+}
+
+# Percentile ranking used for the risk score: 'dense' (bist30_analysis.py)
+# or 'average' (stock_analysis.py)
+RANK_METHODS = ('dense', 'average')
+
+# VaR/Expected Shortfall methods of compute_tail_risk (see tail_risk);
+# 'conditional' is the normal method with the GARCH-family volatility forecast
+TAIL_METHODS = ('historical', 'normal', 'cornish-fisher', 'monte-carlo', 'conditional')
+TAIL_LEVELS = (95, 97.5, 99)
+
+# Correlation/covariance estimators selectable with --covariance: pairwise
+# Pearson correlation (the default) or one of the covariance module
+COVARIANCE_METHODS = ('pairwise', 'sample', 'ledoit-wolf', 'rolling', 'ewma')
+
+# Conditional volatility models of compute_conditional_volatility (see volatility_models)
+VOL_MODELS = ('garch', 'gjr', 'ewma')
+
+# Volatility behind the ranking's Annual_Volatility factor: the sample one or
+# the annualised next-day forecast of compute_conditional_volatility
+RANK_VOLATILITIES = ('historical', 'conditional')
+
+# Monte Carlo tail risk: simulated paths, paths per batch (bounds memory) and seed
+MC_PATHS = 100_000
+MC_CHUNK_SIZE = 10_000
+MC_SEED = 0
+
+# Parameters that change per-stock metric results (part of their cache key)
+METRIC_PARAMS = {'var_levels': [95, 99], 'z_threshold': 2, 'version': 3}
+
+
+def today():
+    return datetime.now().strftime('%Y-%m-%d')
+
+
+def ensure_output_dirs():
+    """Make sure the data, plots and reports directories exist."""
+    os.makedirs('data', exist_ok=True)
+    os.makedirs('plots', exist_ok=True)
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+
+
+def yf_download(stock, start, end, interval=DEFAULT_INTERVAL):
+    """Download ``interval`` bars (daily by default) for one symbol from Yahoo Finance."""
+    import yfinance as yf
+    from .data_loader import OHLCV_COLUMNS
+
+    # Ticker.history can be called from several threads, unlike yf.download
+    data = yf.Ticker(stock).history(start=start, end=end, interval=interval, auto_adjust=True)
+    if data.empty:
+        return data
+    # Intraday bars keep their Istanbul wall-clock times
+    data.index = data.index.tz_localize(None)
+    return data[OHLCV_COLUMNS]
+
+
+@timed()
+def fetch_prices(universe, start=DEFAULT_START, end=None, full_refresh=False, workers=8, store_dir=None,
+                 interval=DEFAULT_INTERVAL):
+    """Download or update price data for every stock in ``universe``.
+
+    Only trading days after the last date already saved under ``data/`` are
+    downloaded and appended; ``full_refresh=True`` re-downloads everything.
+    Symbols are fetched concurrently on ``workers`` threads with retries.
+    A failed download falls back to the saved CSV when one exists. With
+    ``store_dir`` the columnar PriceStore is rewritten from the synced data.
+    Intraday ``interval`` bars are kept under ``data/<interval>/``, starting
+    no earlier than Yahoo Finance serves them.
+    """
+    import functools
+
+    from .bars import MAX_HISTORY_DAYS
+    from .data_loader import interval_data_dir, load_cached_data
+    from .data_sync import sync_stock
+    from .fetcher import TokenBucket, fetch_all, rate_limited, with_timeout
+    from .price_store import PriceStore
+
+    end = end or today()
+    data_dir = interval_data_dir(interval)
+    # Only the download is timed out: the CSV is written by the worker that owns the symbol, never by a
+    # timed-out thread still running next to a retry. The rate limit is per request too, since one sync
+    # may download the head, the tail and a rebuilt history.
+    download = rate_limited(with_timeout(functools.partial(yf_download, interval=interval), DOWNLOAD_TIMEOUT),
+                            TokenBucket(DOWNLOAD_RATE, DOWNLOAD_RATE))
+    if interval in MAX_HISTORY_DAYS:
+        earliest = (datetime.now() - timedelta(days=MAX_HISTORY_DAYS[interval] - 1)).strftime('%Y-%m-%d')
+        if start < earliest:
+            print(f"Not: {interval} bar'ları yalnızca son {MAX_HISTORY_DAYS[interval]} gün için indirilebilir, "
+                  f"başlangıç {earliest} olarak alındı")
+            start = earliest
+    print(f"{len(universe)} hisse senedi indiriliyor... ({start} - {end}, {interval})")
+
+    all_data = {}
+    failed_downloads = []
+
+    def fetch(stock):
+        with span(stock):
+            data, status = sync_stock(stock, download, start, end, data_dir=data_dir, full_refresh=full_refresh)
+        if data.empty:
+            raise ValueError("veri bulunamadı")
+        return data, status
+
+    def report(stock, value, error):
+        name = universe[stock]['name']
+        if error is None:
+            print(f"✓ {name} güncel ({value[1]['rows_added']} yeni satır)")
+        else:
+            print(f"✗ {name} indirme hatası: {error}")
+
+    fetched = fetch_all(universe, fetch, workers=workers, retries=2, on_complete=report)
+    for stock, (data, _) in fetched.data.items():
+        all_data[stock] = data
+    failed_downloads = fetched.failed
+    slowest = max(fetched.timings, key=fetched.timings.get, default=None)
+    if slowest is not None:
+        print(f"İndirme süresi: {fetched.elapsed:.1f} s (en yavaş: {slowest}, {fetched.timings[slowest]:.1f} s)")
+
+    # Fall back to the last saved CSV for anything that could not be downloaded
+    if failed_downloads:
+        cached, _ = load_cached_data(failed_downloads, data_dir)
+        for stock, data in cached.items():
+            all_data[stock] = data
+            print(f"↺ {universe[stock]['name']} önbellekteki veriden yüklendi")
+        failed_downloads = [stock for stock in failed_downloads if stock not in cached]
+
+    if failed_downloads:
+        print(f"\nUyarı: {len(failed_downloads)} hisse senedi indirilemedi: {failed_downloads}")
+
+    if store_dir and all_data:
+        PriceStore.write(all_data, store_dir, interval=interval)
+
+    return all_data
+
+
+def select_range(all_data, start=None, end=None):
+    """Keep only the rows with ``start <= date <= end`` of every stock."""
+    return {stock: data.loc[start:end] for stock, data in all_data.items()}
+
+
+@timed()
+def load_prices(universe, start=DEFAULT_START, end=None, store_dir=None, interval=DEFAULT_INTERVAL,
+                resample_from=None):
+    """Load saved prices for ``universe`` without touching the network.
+
+    Reads the CSV files of ``interval`` bars (under ``data/``, intraday
+    ones under ``data/<interval>/``) or the columnar PriceStore in
+    ``store_dir``, keeping only rows with ``start <= date <= end``. With
+    ``resample_from`` the saved bars of that finer interval are read and
+    resampled to ``interval`` instead, a chunk at a time for CSV files.
+    Symbols without data are left out; see Universe.missing().
+    """
+    import functools
+
+    from .bars import check_resample, resample_csv
+    from .data_loader import interval_data_dir, load_cached_data, read_stock_csv
+    from .price_store import PriceStore
+
+    source = resample_from or interval
+    if resample_from:
+        check_resample(resample_from, interval)
+
+    if store_dir:
+        print(f"{len(universe)} hisse senedi veri deposundan yükleniyor ({store_dir}/)...")
+        store = PriceStore(store_dir)
+        if store.interval != source:
+            raise ValueError(f"{store_dir}/ {store.interval} bar'ları içeriyor, {source} bekleniyordu")
+        all_data = store.frames(universe, start=start, end=end)
+        if resample_from:
+            all_data = resample_prices(all_data, interval)
+        print(f"✓ {len(all_data)} hisse senedi veri deposundan yüklendi")
+        return all_data
+
+    data_dir = interval_data_dir(source)
+    reader = functools.partial(resample_csv, interval=interval) if resample_from else read_stock_csv
+    print(f"{len(universe)} hisse senedi önbellekten yükleniyor ({data_dir}/)...")
+    all_data, _ = load_cached_data(universe, data_dir, reader=reader)
+    all_data = select_range(all_data, start, end)
+    print(f"✓ {len(all_data)} hisse senedi önbellekten yüklendi")
+    return all_data
+
+
+@timed()
+def resample_prices(all_data, interval):
+    """Resample every stock's bars to the coarser ``interval`` (see bars.resample_bars)."""
+    from .bars import resample_bars
+
+    print(f"\nBar'lar {interval} aralığına dönüştürülüyor...")
+    return {stock: resample_bars(data, interval) for stock, data in all_data.items()}
+
+
+@timed()
+def build_calendar(all_data):
+    """Master TradingCalendar of the stocks' bars, shared by the stages that align them.
+
+    Prints how many bars listed stocks are missing (see trading_calendar for the policies).
+    """
+    from .trading_calendar import TradingCalendar
+
+    symbols = [stock for stock, data in all_data.items() if data is not None and not data.empty]
+    calendar, offsets = TradingCalendar.with_offsets(all_data[stock].index for stock in symbols)
+    coverage = calendar.coverage(symbols, offsets)
+    gaps = coverage[coverage['Missing_Bars'] > 0]
+    if len(gaps):
+        print(f"Not: {len(gaps)} hissede listelenme süresi içinde toplam {int(gaps['Missing_Bars'].sum())} "
+              f"eksik bar var (işlem takvimi: {len(calendar)} bar)")
+    return calendar
+
+
+@timed()
+def price_hashes(all_data):
+    """Content hash of each stock's prices; keys the cross-sectional stages."""
+    from .result_cache import hash_frame
+
+    return {stock: hash_frame(data) for stock, data in all_data.items()}
+
+
+def universe_hash(universe):
+    """Content hash of a universe's symbol -> (name, sector, sector path) mapping; keys the labelled outputs."""
+    from .result_cache import hash_value
+
+    return hash_value([[symbol, universe[symbol]['name'], universe[symbol]['sector'],
+                        list(universe[symbol].get('sector_path') or ())] for symbol in universe])
+
+
+@timed()
+def calculate_returns_and_metrics(data_dict, universe, cache=None, workers=1, interval=DEFAULT_INTERVAL,
+                                  calendar=None, missing_bars=DEFAULT_MISSING_BARS):
+    """Calculate returns and various risk metrics.
+
+    All symbols are aligned on ``calendar`` (default: the calendar of their
+    bars, see build_calendar) into one bars x symbols matrix, with
+    ``missing_bars`` the policy for the bars a listed stock lacks, and every
+    metric is computed for the whole universe at once (see metrics_engine),
+    with returns annualised for ``interval`` bars. Returns
+    ``{symbol: StockResult}``: the scalar metrics of each stock over one
+    shared returns matrix (see the results module). With a
+    ResultCache, stocks whose price data is unchanged are served from it and
+    only the rest are computed. Under 'ffill' a stock's metrics also depend
+    on the calendar, which is then part of the cache key. ``workers > 1``
+    splits the symbols across a process pool sharing the price matrix;
+    results are identical.
+    """
+    from .bars import periods_per_year
+    from .metrics_engine import MIN_OBSERVATIONS, align_prices, compute_universe_metrics
+    from .parallel_metrics import compute_universe_metrics_parallel
+    from .result_cache import MISSING, hash_frame, hash_value
+    from .results import results_from_metrics, share_returns
+    from .trading_calendar import TradingCalendar
+
+    print("\nGetiri ve risk metrikleri hesaplanıyor...")
+
+    keys = {}
+    cached = {}
+    if cache is not None and cache.enabled:
+        params = [METRIC_PARAMS, interval, missing_bars]
+        if missing_bars == 'ffill':
+            # Carried prices fill the bars other stocks traded on: the whole universe's calendar, not the
+            # calendar of the stocks left to compute, aligns them, and it is part of every key
+            if calendar is None:
+                calendar = TradingCalendar.from_frames(data_dict)
+            params.append(hash_value(calendar.dates.asi8))
+        with span('cache_lookup'):
+            for stock, data in data_dict.items():
+                if data is not None and not data.empty:
+                    # The symbol too: identical price frames of two tickers are two entries
+                    keys[stock] = cache.key('metrics', stock, hash_frame(data), *params)
+                    entry = cache.get(keys[stock])
+                    if entry is not MISSING:
+                        cached[stock] = entry
+        data_dict = {stock: data for stock, data in data_dict.items() if stock not in cached}
+        print(f"Önbellekten: {len(cached)} hisse, hesaplanacak: {len(data_dict)} hisse")
+
+    with span('align'):
+        dates, symbols, prices = align_prices(data_dict, calendar, missing_bars)
+    with span('engine'):
+        periods = periods_per_year(interval)
+        if workers > 1:
+            metrics = compute_universe_metrics_parallel(prices, dates, workers=workers, periods_per_year=periods)
+        else:
+            metrics = compute_universe_metrics(prices, dates, periods)
+
+    # Minimum data requirement; the kept stocks share the engine's returns matrix
+    with span('results'):
+        results = results_from_metrics(dates, symbols, metrics, universe,
+                                       metrics['total_observations'] > MIN_OBSERVATIONS)
+    del metrics, prices
+
+    if keys:
+        # Too-short histories are cached as None so they are not recomputed either
+        for stock in symbols:
+            cache.set(keys[stock], results.get(stock))
+        for stock, entry in cached.items():
+            if entry is not None:
+                # Names and sectors come from the current universe, not from the run that cached the entry
+                entry['name'], entry['sector'] = universe[stock]['name'], universe[stock]['sector']
+                results[stock] = entry
+        results = {stock: results[stock] for stock in keys if stock in results}
+        share_returns(results)
+
+    return results
+
+
+# Wealth paths calculate_max_drawdown() can measure: the prices themselves (compounded simple returns),
+# or 1 + log return compounded, as stock_analysis.py did before the bist_risk package
+DRAWDOWN_METHODS = ('simple', 'log')
+
+
+def calculate_max_drawdown(prices, method='simple'):
+    """Calculate maximum drawdown.
+
+    The pipeline uses ``method='simple'``; ``'log'`` reproduces the figures
+    of the original stock_analysis.py script.
+    """
+    import numpy as np
+    from .drawdown import drawdown_stats
+
+    if method not in DRAWDOWN_METHODS:
+        raise ValueError(f"Bilinmeyen düşüş yöntemi: {method} (seçenekler: {', '.join(DRAWDOWN_METHODS)})")
+    wealth = np.asarray(prices, dtype=np.float64)
+    if method == 'log':
+        # A bar after a missing price counts as a zero return
+        returns = np.log(wealth[1:] / wealth[:-1])
+        wealth = np.cumprod(np.r_[1.0, 1.0 + np.where(np.isnan(returns), 0.0, returns)])
+    return drawdown_stats(wealth)['max_drawdown'][0]
+
+
+@timed()
+def create_risk_ranking(results, method='dense', weights=RISK_WEIGHTS, volatility='historical',
+                        path=os.path.join(REPORTS_DIR, 'risk_ranking.csv')):
+    """Create risk ranking and categorization.
+
+    ``method`` is the percentile-rank method for the score components (see
+    RANK_METHODS) and ``weights`` the weight of each component. With
+    ``volatility='conditional'`` the volatility component is the GARCH-family
+    forecast of compute_conditional_volatility(), added as a
+    Conditional_Volatility column. The score is the one-date case of
+    risk_scoring.risk_scores(). The ranking is saved to ``path`` unless it
+    is None.
+    """
+    import numpy as np
+    import pandas as pd
+    from .risk_scoring import FACTOR_SIGNS, category_labels, check_weights, risk_categories, risk_scores
+
+    check_weights(weights)
+    print("\nRisk sıralaması oluşturuluyor...")
+
+    # Create DataFrame for analysis, one column at a time
+    symbols = list(results)
+
+    def column(key):
+        return [results[stock][key] for stock in symbols]
+
+    df = pd.DataFrame({
+        'Symbol': symbols,
+        'Name': column('name'),
+        'Sector': column('sector'),
+        'Annual_Return': column('annual_return'),
+        'Annual_Volatility': column('annual_volatility'),
+        'Sharpe_Ratio': column('sharpe_ratio'),
+        'Skewness': column('skewness'),
+        'Kurtosis': column('kurtosis'),
+        'VaR_95': column('var_95'),
+        'Max_Drawdown': column('max_drawdown'),
+        'Extreme_Days': [results[stock]['extreme_positive'] + results[stock]['extreme_negative']
+                         for stock in symbols],
+    })
+
+    if volatility == 'conditional':
+        df['Conditional_Volatility'] = column('conditional_annual_volatility')
+
+    # Handle NaN values and reset index
+    df = df.fillna(0).reset_index(drop=True)
+
+    # Higher volatility, higher kurtosis, more extreme days, deeper drawdown and VaR = higher risk
+    factors = df[list(FACTOR_SIGNS)].to_numpy(dtype=np.float64)
+    if volatility == 'conditional':
+        factors[:, list(FACTOR_SIGNS).index('Annual_Volatility')] = df['Conditional_Volatility']
+    df['Risk_Score'] = risk_scores(factors[None], weights, method)[0]
+    df['Risk_Category'] = category_labels(risk_categories(df['Risk_Score']))
+
+    # Sort by risk score
+    df = df.sort_values('Risk_Score')
+
+    # Save detailed results
+    if path:
+        df.to_csv(path, index=False)
+
+    return df
+
+
+@timed()
+def compute_risk_history(all_data, window, method='dense', weights=RISK_WEIGHTS, interval=DEFAULT_INTERVAL,
+                         calendar=None, missing_bars=DEFAULT_MISSING_BARS,
+                         path=os.path.join(REPORTS_DIR, 'risk_history.csv'),
+                         transitions_path=os.path.join(REPORTS_DIR, 'risk_transitions.csv')):
+    """Risk scores and categories of every bar over trailing ``window``-bar metrics, and category changes.
+
+    Every date is scored like create_risk_ranking() from the metrics of the
+    window ending on it, in one pass over the (dates x stocks x factors)
+    array. Stocks without a full window on a date are left out that day.
+    Prices are aligned on ``calendar`` with the ``missing_bars`` policy.
+    """
+    import numpy as np
+    import pandas as pd
+    from .bars import periods_per_year
+    from .metrics_engine import align_prices
+    from .risk_scoring import (category_labels, check_weights, factor_history, risk_categories, risk_scores,
+                               risk_transitions)
+
+    check_weights(weights)
+    print(f"\nRisk skoru geçmişi hesaplanıyor... (pencere: {window} bar, {interval})")
+    dates, symbols, prices = align_prices(all_data, calendar, missing_bars)
+    scores = risk_scores(factor_history(prices, window, periods_per_year=periods_per_year(interval)), weights, method)
+    codes = risk_categories(scores)
+
+    history = pd.DataFrame({
+        'Date': np.repeat(np.asarray(dates), len(symbols)),
+        'Symbol': np.tile(np.asarray(symbols, dtype=object), len(dates)),
+        'Risk_Score': scores.ravel(),
+        'Risk_Category': category_labels(codes),
+    }).dropna(subset=['Risk_Score'])
+    transitions = risk_transitions(dates, symbols, codes)
+    history.to_csv(path, index=False)
+    transitions.to_csv(transitions_path, index=False)
+    print(f"✓ {history['Date'].nunique()} bar skorlandı, {len(transitions)} kategori geçişi bulundu")
+    return history, transitions
+
+
+@timed()
+def rewritten_histories(state_path, symbols, interval=DEFAULT_INTERVAL):
+    """Symbols whose saved price history was rewritten after the state file at ``state_path`` was saved.
+
+    A rebuild after a corporate action, a backfill or a full refresh
+    changes bars the incremental state has already absorbed, so the state
+    of these symbols has to be rebuilt from the history. Empty without a
+    saved state.
+    """
+    if not state_path or not os.path.exists(state_path):
+        return []
+    from .data_loader import interval_data_dir
+    from .data_sync import rewritten_since
+
+    return rewritten_since(symbols, os.stat(state_path).st_mtime_ns, interval_data_dir(interval))
+
+
+def update_streaming_ranking(all_data, universe, state_path, method='dense', weights=RISK_WEIGHTS,
+                             interval=DEFAULT_INTERVAL):
+    """Apply only unseen bars to the saved streaming state and re-rank.
+
+    The per-symbol state in ``state_path`` is created on the first run and
+    resumed afterwards, so a daily update costs one bar per symbol. The
+    state belongs to one bar ``interval``. VaR and extreme-day counts that
+    outgrow the state's bounded tails are recomputed from ``all_data``.
+    Symbols whose saved history was rewritten since the last run start over
+    from ``all_data``.
+    """
+    from .bars import periods_per_year
+    from .streaming_metrics import TAIL_CAPACITY, StreamingRiskEngine
+
+    engine = StreamingRiskEngine.load(state_path, periods_per_year(interval))
+    rewritten = [stock for stock in rewritten_histories(state_path, all_data, interval) if stock in engine.states]
+    for stock in rewritten:
+        del engine.states[stock]
+    if rewritten:
+        print(f"Not: {len(rewritten)} hissenin fiyat geçmişi yeniden yazıldı, akış durumları baştan oluşturuluyor")
+    applied = engine.update_from_data(all_data)
+    engine.save(state_path)
+    print(f"\n✓ Akış durumu güncellendi: {applied} yeni bar ({state_path})")
+    results = engine.results(universe, all_data)
+    if engine.recomputed:
+        print(f"Not: {len(engine.recomputed)} hissenin VaR ve aşırı hareket sayıları durumun {TAIL_CAPACITY} "
+              f"getirilik kuyruklarını aştı, fiyat geçmişinden hesaplandı")
+    return create_risk_ranking(results, method=method, weights=weights)
+
+
+@timed()
+def compute_rolling_metrics(all_data, windows, interval=DEFAULT_INTERVAL, calendar=None,
+                            missing_bars=DEFAULT_MISSING_BARS, path=os.path.join(REPORTS_DIR, 'rolling_metrics.csv')):
+    """Rolling-window risk metrics for every stock over ``windows`` of ``interval`` bars, saved as a tidy CSV.
+
+    Prices are aligned on ``calendar`` with the ``missing_bars`` policy.
+    """
+    from .bars import periods_per_year
+    from .metrics_engine import align_prices
+    from .rolling_metrics import rolling_metrics
+
+    print(f"\nKayan pencere risk metrikleri hesaplanıyor... (pencereler: {windows})")
+    dates, symbols, prices = align_prices(all_data, calendar, missing_bars)
+    rolling_df = rolling_metrics(dates, symbols, prices, windows, periods_per_year=periods_per_year(interval))
+    rolling_df.to_csv(path, index=False)
+    return rolling_df
+
+
+@timed()
+def compute_conditional_volatility(results, model, workers=1, state_path=None, interval=DEFAULT_INTERVAL,
+                                   path=os.path.join(REPORTS_DIR, 'conditional_volatility.csv')):
+    """Fit a GARCH-family ``model`` to every stock's returns and forecast next-bar volatility.
+
+    The forecasts are added to ``results`` as ``conditional_volatility``
+    (one ``interval`` bar) and ``conditional_annual_volatility`` for the tail risk and
+    ranking stages, and the fits are saved as a CSV. With ``state_path``
+    the fits start from the parameters saved there by the previous run
+    (usually a few iterations), and the new parameters are saved back;
+    stocks whose saved history was rewritten since then start cold.
+    """
+    import time
+
+    import numpy as np
+    import pandas as pd
+    from .bars import periods_per_year
+    from .results import returns_frame
+    from .volatility_models import (MODELS, annualised_volatility, fit_volatility_models, load_warm_start,
+                                    save_warm_start)
+
+    print(f"\nKoşullu volatilite modeli uyarlanıyor... ({model})")
+    symbols = list(results)
+    returns = returns_frame(results, symbols)
+    start = load_warm_start(state_path, model, symbols) if state_path else None
+    if start is not None:
+        rewritten = set(rewritten_histories(state_path, symbols, interval))
+        start[[j for j, stock in enumerate(symbols) if stock in rewritten]] = np.nan
+
+    started = time.perf_counter()
+    fit = fit_volatility_models(model, returns.to_numpy(dtype=float), start=start, workers=workers)
+    seconds = time.perf_counter() - started
+
+    volatility = np.sqrt(fit['variance'])
+    annual = annualised_volatility(fit['variance'], periods_per_year(interval))
+    for j, stock in enumerate(symbols):
+        results[stock]['conditional_volatility'] = volatility[j]
+        results[stock]['conditional_annual_volatility'] = annual[j]
+
+    fit_df = pd.DataFrame({
+        'Symbol': symbols,
+        'Name': [results[stock]['name'] for stock in symbols],
+        'Model': model,
+        **{name.capitalize(): fit['params'][:, i] for i, name in enumerate(MODELS[model]['params'])},
+        'Omega': fit['omega'],
+        'Persistence': fit['persistence'],
+        'Log_Likelihood': fit['loglik'],
+        'Iterations': fit['iterations'],
+        'Converged': fit['converged'],
+        'Volatility': volatility,
+        'Annual_Volatility': annual,
+        'Historical_Volatility': [results[stock]['annual_volatility'] for stock in symbols],
+    })
+    if path:
+        fit_df.to_csv(path, index=False)
+    if state_path:
+        save_warm_start(state_path, model, symbols, fit['params'], returns.index.max().isoformat())
+
+    warm = 0 if start is None else int(np.sum(~np.isnan(start).any(axis=1)))
+    print(f"✓ {int(np.sum(~np.isnan(volatility)))} hisse {seconds:.1f} sn'de uyarlandı "
+          f"({warm} hisse önceki parametrelerden başladı, ortalama {fit['iterations'].mean():.1f} yineleme)")
+    return fit_df
+
+
+@timed()
+def compute_tail_risk(results, methods=TAIL_METHODS, levels=TAIL_LEVELS, paths=MC_PATHS, chunk_size=MC_CHUNK_SIZE,
+                      seed=MC_SEED, path=os.path.join(REPORTS_DIR, 'tail_risk.csv')):
+    """VaR and Expected Shortfall of every stock with each of ``methods``, saved as a tidy CSV.
+
+    The parametric methods reuse the moments in ``results`` ('conditional'
+    takes the next-bar volatility of compute_conditional_volatility()); Monte Carlo
+    simulates the whole universe jointly from the pairwise covariance of
+    returns and adds the equal-weight portfolio as an extra row.
+    """
+    import numpy as np
+    import pandas as pd
+    from .metrics_engine import nan_covariance
+    from .results import returns_frame
+    from .tail_risk import cornish_fisher_var_es, historical_var_es, monte_carlo_var_es, normal_var_es
+
+    print(f"\nKuyruk riski (VaR/ES) hesaplanıyor... (yöntemler: {', '.join(methods)}, düzeyler: {list(levels)})")
+    symbols = list(results)
+    names = [results[stock]['name'] for stock in symbols]
+    returns = returns_frame(results, symbols).to_numpy(dtype=float)
+
+    def moment(key):
+        return np.array([results[stock][key] for stock in symbols], dtype=np.float64)
+
+    estimates = {}
+    for method in methods:
+        if method == 'historical':
+            estimates[method] = historical_var_es(returns, levels)
+        elif method == 'normal':
+            estimates[method] = normal_var_es(moment('mean_return'), moment('std_return'), levels)
+        elif method == 'cornish-fisher':
+            estimates[method] = cornish_fisher_var_es(moment('mean_return'), moment('std_return'),
+                                                      moment('skewness'), moment('kurtosis'), levels)
+        elif method == 'conditional':
+            if any('conditional_volatility' not in results[stock] for stock in symbols):
+                raise ValueError("'conditional' yöntemi için önce koşullu volatilite hesaplanmalı (--vol-model)")
+            estimates[method] = normal_var_es(moment('mean_return'), moment('conditional_volatility'), levels)
+        elif method == 'monte-carlo':
+            print(f"Monte Carlo: {paths} senaryo x {len(symbols)} hisse ({chunk_size} senaryoluk gruplar)")
+            weights = np.full(len(symbols), 1.0 / len(symbols))
+            estimates[method] = monte_carlo_var_es(moment('mean_return'), nan_covariance(returns), levels, paths,
+                                                   chunk_size, seed=seed, weights=weights)
+        else:
+            raise ValueError(f"Bilinmeyen kuyruk riski yöntemi: {method} (seçenekler: {', '.join(TAIL_METHODS)})")
+
+    rows = []
+    for method, (var, es) in estimates.items():
+        labels = list(zip(symbols, names))
+        if var.shape[1] > len(symbols):
+            labels.append(('PORTFOLIO', 'Eşit Ağırlıklı Portföy'))
+        for i, level in enumerate(levels):
+            for j, (stock, name) in enumerate(labels):
+                rows.append({'Symbol': stock, 'Name': name, 'Method': method, 'Level': level,
+                             'VaR': var[i, j], 'ES': es[i, j]})
+
+    tail_df = pd.DataFrame(rows)
+    if path:
+        tail_df.to_csv(path, index=False)
+    return tail_df
@@ -0,0 +1,280 @@
+import json
+import os
+from dataclasses import dataclass, field
+
+from .instrumentation import span, timed
+
+PLOTS_DIR = 'plots'
+
+# --plots modes: no figures, fast low-resolution previews, or publication quality
+PLOT_MODES = ('none', 'draft', 'full')
+PLOT_DPI = {'draft': 72, 'full': 300}
+
+# Records the fingerprint (inputs and render settings) each figure was last rendered with
+MANIFEST_FILE = '.render_manifest.json'
+
+# Correlation heatmaps of larger universes are drawn without cell labels
+ANNOTATE_MAX_SYMBOLS = 30
+
+RISK_COLORS = {'Düşük Risk': 'green', 'Orta Risk': 'orange', 'Yüksek Risk': 'red'}
+
+
+def _pyplot():
+    """Import pyplot on the non-interactive Agg backend with the report style.
+
+    Kept out of module import (as are numpy and scipy below) so runs
+    without figures never load them.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # Set Turkish font support and style
+    plt.rcParams['font.family'] = 'DejaVu Sans'
+    plt.style.use('seaborn-v0_8')
+    sns.set_palette("husl")
+    return plt
+
+
+def draw_risk_dashboard(risk_df, label='BIST30', interval='1d'):
+    """Six-panel overview of risk scores, sectors and return distributions."""
+    plt = _pyplot()
+    fig, axes = plt.subplots(2, 3, figsize=(20, 12))
+    fig.suptitle(f'{label} Risk Analizi Dashboard', fontsize=20, fontweight='bold')
+
+    # Risk Score vs Return
+    scatter = axes[0, 0].scatter(risk_df['Risk_Score'], risk_df['Annual_Return']*100,
+                                 c=risk_df['Annual_Volatility']*100, s=100, alpha=0.7, cmap='viridis')
+    axes[0, 0].set_xlabel('Risk Skoru')
+    axes[0, 0].set_ylabel('Yıllık Getiri (%)')
+    axes[0, 0].set_title('Risk-Getiri İlişkisi')
+    plt.colorbar(scatter, ax=axes[0, 0], label='Yıllık Volatilite (%)')
+
+    # Volatility by Sector
+    sector_vol = risk_df.groupby('Sector')['Annual_Volatility'].mean().sort_values(ascending=False)
+    axes[0, 1].bar(range(len(sector_vol)), sector_vol*100)
+    axes[0, 1].set_xticks(range(len(sector_vol)))
+    axes[0, 1].set_xticklabels(sector_vol.index, rotation=45, ha='right')
+    axes[0, 1].set_ylabel('Ortalama Yıllık Volatilite (%)')
+    axes[0, 1].set_title('Sektörel Volatilite Karşılaştırması')
+
+    # Skewness vs Kurtosis
+    for category in risk_df['Risk_Category'].unique():
+        if category == category:  # not NaN
+            subset = risk_df[risk_df['Risk_Category'] == category]
+            axes[0, 2].scatter(subset['Skewness'], subset['Kurtosis'],
+                               label=category, alpha=0.7, s=80, color=RISK_COLORS.get(category, 'blue'))
+    axes[0, 2].set_xlabel('Çarpıklık (Skewness)')
+    axes[0, 2].set_ylabel('Basıklık (Kurtosis)')
+    axes[0, 2].set_title('Dağılım Özellikleri')
+    axes[0, 2].legend()
+    axes[0, 2].axhline(y=0, color='black', linestyle='--', alpha=0.5)
+    axes[0, 2].axvline(x=0, color='black', linestyle='--', alpha=0.5)
+
+    # Sharpe Ratio Ranking
+    top_sharpe = risk_df.nlargest(10, 'Sharpe_Ratio')
+    axes[1, 0].barh(range(len(top_sharpe)), top_sharpe['Sharpe_Ratio'])
+    axes[1, 0].set_yticks(range(len(top_sharpe)))
+    axes[1, 0].set_yticklabels(top_sharpe['Name'], fontsize=8)
+    axes[1, 0].set_xlabel('Sharpe Oranı')
+    axes[1, 0].set_title('En İyi Sharpe Oranları')
+
+    # Risk Distribution
+    risk_counts = risk_df['Risk_Category'].value_counts()
+    colors = [RISK_COLORS.get(cat, 'blue') for cat in risk_counts.index]
+    axes[1, 1].pie(risk_counts.values, labels=risk_counts.index, autopct='%1.1f%%', colors=colors)
+    axes[1, 1].set_title('Risk Kategorisi Dağılımı')
+
+    # Extreme Days vs Volatility
+    axes[1, 2].scatter(risk_df['Annual_Volatility']*100, risk_df['Extreme_Days'], alpha=0.7, s=80)
+    axes[1, 2].set_xlabel('Yıllık Volatilite (%)')
+    axes[1, 2].set_ylabel('Aşırı Hareket Günleri' if interval == '1d' else f"Aşırı Hareketli Bar'lar ({interval})")
+    axes[1, 2].set_title('Volatilite vs Aşırı Hareketler')
+    return fig
+
+
+def draw_sector_analysis(sector_summary, label='BIST30'):
+    """Sector averages of return, risk score, volatility and Sharpe ratio."""
+    plt = _pyplot()
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    fig.suptitle(f'{label} Sektörel Analiz', fontsize=18, fontweight='bold')
+
+    # Average return by sector
+    sector_summary['Annual_Return'].plot(kind='bar', ax=axes[0, 0], color='skyblue')
+    axes[0, 0].set_title('Sektörel Ortalama Yıllık Getiri')
+    axes[0, 0].set_ylabel('Yıllık Getiri')
+    axes[0, 0].tick_params(axis='x', rotation=45)
+
+    # Risk-Return by sector
+    axes[0, 1].scatter(sector_summary['Risk_Score'], sector_summary['Annual_Return'], s=200, alpha=0.7)
+    for i, sector in enumerate(sector_summary.index):
+        axes[0, 1].annotate(sector, (sector_summary['Risk_Score'].iloc[i], sector_summary['Annual_Return'].iloc[i]),
+                            xytext=(5, 5), textcoords='offset points', fontsize=8)
+    axes[0, 1].set_xlabel('Ortalama Risk Skoru')
+    axes[0, 1].set_ylabel('Ortalama Yıllık Getiri')
+    axes[0, 1].set_title('Sektörel Risk-Getiri Pozisyonu')
+
+    # Volatility comparison
+    sector_summary['Annual_Volatility'].plot(kind='bar', ax=axes[1, 0], color='lightcoral')
+    axes[1, 0].set_title('Sektörel Ortalama Volatilite')
+    axes[1, 0].set_ylabel('Yıllık Volatilite')
+    axes[1, 0].tick_params(axis='x', rotation=45)
+
+    # Sharpe ratio comparison
+    sector_summary['Sharpe_Ratio'].plot(kind='bar', ax=axes[1, 1], color='lightgreen')
+    axes[1, 1].set_title('Sektörel Ortalama Sharpe Oranı')
+    axes[1, 1].set_ylabel('Sharpe Oranı')
+    axes[1, 1].tick_params(axis='x', rotation=45)
+    return fig
+
+
+def draw_individual_distributions(distributions, interval='1d'):
+    """Return histograms against a fitted normal for up to six stocks.
+
+    ``distributions`` is a list of ``{'name', 'returns', 'skewness',
+    'kurtosis'}`` dicts; a ``None`` entry leaves its panel empty. The
+    returns (of ``interval`` bars) may contain NaN (dates without a
+    return), which are skipped.
+    """
+    import numpy as np
+    from scipy import stats
+    from .bars import bar_label
+
+    plt = _pyplot()
+    fig, axes = plt.subplots(2, 3, figsize=(18, 12))
+    fig.suptitle('Seçili Hisse Senetleri Dağılım Analizi', fontsize=16, fontweight='bold')
+
+    for i, item in enumerate(distributions):
+        if item is None:
+            continue
+        row, col = i // 3, i % 3
+        returns = np.asarray(item['returns'])
+        returns = returns[~np.isnan(returns)]
+
+        # Plot histogram with normal comparison
+        axes[row, col].hist(returns, bins=50, density=True, alpha=0.7, color='skyblue', edgecolor='black')
+
+        # Overlay normal distribution
+        mu, sigma = returns.mean(), returns.std()
+        x = np.linspace(returns.min(), returns.max(), 100)
+        normal_dist = stats.norm.pdf(x, mu, sigma)
+        axes[row, col].plot(x, normal_dist, 'r-', linewidth=2, label='Normal Dağılım')
+
+        axes[row, col].set_title(f"{item['name']}\nÇarpıklık: {item['skewness']:.3f}, "
+                                 f"Basıklık: {item['kurtosis']:.3f}")
+        axes[row, col].set_xlabel(f'{bar_label(interval)} Getiri')
+        axes[row, col].set_ylabel('Yoğunluk')
+        axes[row, col].legend()
+    return fig
+
+
+def draw_correlation_matrix(correlation_matrix, label='BIST30'):
+    """Lower-triangle heatmap of return correlations (annotated for small universes)."""
+    import numpy as np
+    import seaborn as sns
+
+    plt = _pyplot()
+    fig = plt.figure(figsize=(16, 14))
+    mask = np.triu(np.ones_like(correlation_matrix, dtype=bool))
+    sns.heatmap(correlation_matrix, mask=mask, annot=len(correlation_matrix) <= ANNOTATE_MAX_SYMBOLS, fmt='.2f',
+                center=0, cmap='coolwarm', square=True, cbar_kws={'label': 'Korelasyon'})
+    plt.title(f'{label} Hisse Senetleri Korelasyon Matrisi', fontsize=16, fontweight='bold')
+    return fig
+
+
+@dataclass
+class FigureSpec:
+    """Everything needed to render one figure file, without rendering it.
+
+    ``draw`` must be a module-level function so the spec can be pickled to a
+    worker process; it receives ``data`` as keyword arguments and returns
+    the figure.
+    """
+    path: str
+    draw: object
+    data: dict = field(default_factory=dict)
+
+    def input_hash(self, mode='full'):
+        """Hash of the drawing function, its data and the ``mode`` render settings.
+
+        Unchanged inputs rendered the same way give the same file, so a draft
+        PNG never stands in for a full-quality one (or the other way round).
+        """
+        from .result_cache import hash_value
+
+        return hash_value([f'{self.draw.__module__}.{self.draw.__qualname__}', self.data,
+                           [mode, PLOT_DPI[mode]]])
+
+
+def render_figure(spec, mode='full'):
+    """Draw ``spec`` and save it. Draft mode uses a low DPI and skips both layout passes."""
+    plt = _pyplot()
+    fig = spec.draw(**spec.data)
+    try:
+        if mode == 'draft':
+            fig.savefig(spec.path, dpi=PLOT_DPI['draft'])
+        else:
+            fig.tight_layout()
+            fig.savefig(spec.path, dpi=PLOT_DPI['full'], bbox_inches='tight')
+    finally:
+        plt.close(fig)
+    return spec.path
+
+
+def _render_task(task):
+    spec, mode = task
+    return render_figure(spec, mode)
+
+
+def _load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+@timed()
+def render_figures(specs, mode='full', workers=None, plots_dir=PLOTS_DIR):
+    """Render the figures whose inputs changed since their last render.
+
+    A figure is skipped when its file exists and the manifest in
+    ``plots_dir`` records the same input hash for ``mode``. The remaining figures are rendered in a process pool
+    (``workers`` defaults to one per figure, capped at the CPU count).
+    ``mode='none'`` renders nothing. Returns ``(rendered, skipped)`` paths.
+    """
+    if mode == 'none' or not specs:
+        return [], []
+
+    manifest_path = os.path.join(plots_dir, MANIFEST_FILE)
+    manifest = _load_manifest(manifest_path)
+
+    pending, skipped, hashes = [], [], {}
+    for spec in specs:
+        hashes[spec.path] = spec.input_hash(mode)
+        if os.path.exists(spec.path) and manifest.get(spec.path, {}).get('hash') == hashes[spec.path]:
+            skipped.append(spec.path)
+        else:
+            pending.append(spec)
+
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+    tasks = [(spec, mode) for spec in pending]
+    if workers <= 1:
+        rendered = []
+        for task in tasks:
+            with span(os.path.basename(task[0].path)):
+                rendered.append(_render_task(task))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rendered = list(pool.map(_render_task, tasks))
+
+    for path in rendered:
+        manifest[path] = {'hash': hashes[path], 'mode': mode}
+    if rendered:
+        tmp_path = f'{manifest_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, manifest_path)
+    return rendered, skipped
@@ -0,0 +1,99 @@
+import numpy as np
+
+from .metrics_engine import TRADING_DAYS
+from .tail_risk import normal_var_es
+
+
+def covariance_from_correlation(correlation, std):
+    """Covariance matrix ``D R D`` from a correlation matrix and per-column standard deviations."""
+    std = np.asarray(std, dtype=np.float64)
+    return np.nan_to_num(np.asarray(correlation, dtype=np.float64)) * np.outer(std, std)
+
+
+class PortfolioRisk:
+    """Volatility, VaR/ES and risk contributions of a weighted portfolio.
+
+    Works from a fixed one-bar (daily by default) covariance matrix and
+    keeps ``cov @ w`` and the portfolio variance, so the contributions are
+    O(n) to read and changing one weight is a rank-one update:
+    update_weight() is O(n), and volatility_if() answers "what if weight i
+    were x" in O(1) without changing the portfolio. ``periods_per_year``
+    is the number of bars annual_volatility scales by.
+    """
+
+    def __init__(self, cov, symbols, weights, mean=None, sectors=None, periods_per_year=TRADING_DAYS):
+        self.cov = np.asarray(cov, dtype=np.float64)
+        self.periods_per_year = periods_per_year
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.mean = np.zeros(len(self.symbols)) if mean is None else np.asarray(mean, dtype=np.float64)
+        self.sectors = list(sectors) if sectors is not None else None
+        self.set_weights(weights)
+
+    def set_weights(self, weights):
+        """Replace every weight (O(n^2))."""
+        self.weights = np.array(weights, dtype=np.float64)
+        self.cov_w = self.cov @ self.weights
+        self.variance = float(self.weights @ self.cov_w)
+
+    def update_weight(self, symbol, weight):
+        """Change one weight, updating the cached quantities in O(n)."""
+        i = self.index[symbol]
+        delta = weight - self.weights[i]
+        self.variance += 2 * delta * self.cov_w[i] + delta * delta * self.cov[i, i]
+        self.cov_w += delta * self.cov[:, i]
+        self.weights[i] = weight
+
+    def variance_if(self, symbol, weight):
+        """Portfolio variance if one weight were ``weight`` (O(1); the portfolio is unchanged)."""
+        i = self.index[symbol]
+        delta = weight - self.weights[i]
+        return self.variance + 2 * delta * self.cov_w[i] + delta * delta * self.cov[i, i]
+
+    def volatility_if(self, symbol, weight):
+        return np.sqrt(max(self.variance_if(symbol, weight), 0.0))
+
+    def volatilities_if(self, positions, weights):
+        """Vectorised volatility_if over arrays of column ``positions`` and new ``weights``."""
+        positions = np.asarray(positions)
+        delta = np.asarray(weights, dtype=np.float64) - self.weights[positions]
+        variance = self.variance + 2 * delta * self.cov_w[positions] + delta * delta * self.cov[positions, positions]
+        return np.sqrt(np.clip(variance, 0.0, None))
+
+    @property
+    def volatility(self):
+        """Portfolio volatility over one bar."""
+        return np.sqrt(max(self.variance, 0.0))
+
+    @property
+    def annual_volatility(self):
+        return self.volatility * np.sqrt(self.periods_per_year)
+
+    def marginal_contributions(self):
+        """d(volatility)/d(weight) of each position; NaN for a portfolio without volatility, where it is undefined."""
+        volatility = self.volatility
+        if volatility == 0:
+            return np.full(len(self.weights), np.nan)
+        return self.cov_w / volatility
+
+    def component_contributions(self):
+        """Each position's share of the volatility in volatility units; sums to the volatility (Euler)."""
+        if self.volatility == 0:
+            return np.zeros(len(self.weights))
+        return self.weights * self.marginal_contributions()
+
+    def sector_contributions(self):
+        """``{sector: (weight, component contribution)}`` summed over the positions of each sector."""
+        if self.sectors is None:
+            raise ValueError("Sektör bilgisi verilmedi")
+        components = self.component_contributions()
+        totals = {}
+        for sector, weight, component in zip(self.sectors, self.weights, components):
+            total_weight, total_component = totals.get(sector, (0.0, 0.0))
+            totals[sector] = (total_weight + weight, total_component + component)
+        return totals
+
+    def var_es(self, levels):
+        """One-bar parametric (normal) VaR and ES of the portfolio return at each level."""
+        var, es = normal_var_es(np.array([self.weights @ self.mean]), np.array([self.volatility]), levels)
+        return var[:, 0], es[:, 0]
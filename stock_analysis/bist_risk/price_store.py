@@ -0,0 +1,175 @@
+"""Columnar binary price store backed by memory-mapped NumPy arrays.
+
+Layout of a store directory::
+
+    meta.json          symbols, fields, bar interval, format version and generation
+    dates.<gen>.npy    datetime64[ns] row index shared by all symbols
+    Open.<gen>.npy ... one (dates x symbols) float64 matrix per field
+
+A rewrite saves the files of the next generation next to the current ones
+and then replaces meta.json, which names the generation to read, so the
+store switches over in one atomic step. Files of older generations are
+removed afterwards when possible; on Windows a file still memory-mapped
+by a reader cannot be, and is removed by a later write instead.
+
+Field matrices are saved in Fortran (column-major) order, so the history of
+one symbol is a contiguous block that can be read as a zero-copy view, and a
+date range only touches the pages of the rows it covers.
+"""
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+from .data_loader import DATA_DIR, OHLCV_COLUMNS, load_cached_data
+from .trading_calendar import TradingCalendar
+
+STORE_DIR = 'store'
+STORE_VERSION = 2
+# Version 1 stores hold a single set of files without a generation in their names
+READABLE_VERSIONS = (1, STORE_VERSION)
+
+META_FILE = 'meta.json'
+
+
+def _read_meta(path):
+    with open(os.path.join(path, META_FILE), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _file_name(name, generation):
+    return f'{name}.npy' if generation is None else f'{name}.{generation}.npy'
+
+
+class PriceStore:
+    """Read-only view over a store directory written by PriceStore.write()."""
+
+    def __init__(self, path=STORE_DIR):
+        self.path = path
+        meta = _read_meta(path)
+        if meta.get('version') not in READABLE_VERSIONS:
+            raise ValueError(f"Desteklenmeyen veri deposu sürümü: {meta.get('version')}")
+        self.symbols = meta['symbols']
+        self.fields = meta['fields']
+        # Stores written before intraday support hold daily bars
+        self.interval = meta.get('interval', '1d')
+        self.generation = meta.get('generation')
+        self._columns = {symbol: i for i, symbol in enumerate(self.symbols)}
+        # Every file of the generation is mapped up front (which reads only the headers), so a store
+        # opened before a rewrite keeps reading one consistent generation
+        self.dates = self._load('dates')
+        self._arrays = {name: self._load(name) for name in self.fields}
+
+    def _load(self, name):
+        return np.load(os.path.join(self.path, _file_name(name, self.generation)), mmap_mode='r')
+
+    @classmethod
+    def write(cls, data_dict, path=STORE_DIR, fields=OHLCV_COLUMNS, interval='1d'):
+        """Write a ``{symbol: DataFrame}`` mapping of ``interval`` bars as a store and open it."""
+        symbols = [symbol for symbol, data in data_dict.items() if data is not None and not data.empty]
+        calendar, offsets = TradingCalendar.with_offsets(data_dict[symbol].index for symbol in symbols)
+
+        # The new generation is written next to the current one and published by replacing meta.json;
+        # no file a reader may have mapped is overwritten or renamed
+        os.makedirs(path, exist_ok=True)
+        try:
+            generation = (_read_meta(path).get('generation') or 0) + 1
+        except (OSError, ValueError):
+            generation = 1
+        np.save(os.path.join(path, _file_name('dates', generation)), calendar.dates.values.astype('datetime64[ns]'))
+        for field in fields:
+            matrix = np.full((len(calendar), len(symbols)), np.nan, dtype=np.float64, order='F')
+            for j, (symbol, offset) in enumerate(zip(symbols, offsets)):
+                data = data_dict[symbol]
+                if field in data.columns:
+                    matrix[offset.rows, j] = data[field].to_numpy(dtype=np.float64)
+            np.save(os.path.join(path, _file_name(field, generation)), matrix)
+
+        meta_path = os.path.join(path, META_FILE)
+        tmp_path = f'{meta_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': STORE_VERSION, 'generation': generation, 'symbols': symbols,
+                       'fields': list(fields), 'interval': interval}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, meta_path)
+        _remove_stale_files(path, generation)
+        return cls(path)
+
+    @property
+    def calendar(self):
+        """The store's dates as a TradingCalendar (the master index its symbols were written on)."""
+        return TradingCalendar(self.dates)
+
+    def field(self, name):
+        """Memory-mapped (dates x symbols) matrix for one field."""
+        return self._arrays[name]
+
+    def row_slice(self, start=None, end=None):
+        """Row slice covering ``start <= date <= end`` (either bound optional).
+
+        An ``end`` without a time of day includes that whole day's intraday bars.
+        """
+        lo = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start)), 'left'))
+        if end is None:
+            hi = len(self.dates)
+        else:
+            end = pd.Timestamp(end)
+            if end == end.normalize():
+                hi = int(np.searchsorted(self.dates, np.datetime64(end + pd.Timedelta(days=1)), 'left'))
+            else:
+                hi = int(np.searchsorted(self.dates, np.datetime64(end), 'right'))
+        return slice(lo, hi)
+
+    def column(self, symbol, field='Close', start=None, end=None):
+        """Zero-copy view of one symbol's field over a date range."""
+        return self.field(field)[self.row_slice(start, end), self._columns[symbol]]
+
+    def matrix(self, field='Close', start=None, end=None):
+        """Zero-copy (dates x symbols) view of one field over a date range."""
+        return self.field(field)[self.row_slice(start, end)]
+
+    def frame(self, symbol, start=None, end=None):
+        """OHLCV DataFrame for one symbol, without dates before listing or after delisting."""
+        rows = self.row_slice(start, end)
+        j = self._columns[symbol]
+        data = pd.DataFrame({field: self.field(field)[rows, j] for field in self.fields},
+                            index=pd.DatetimeIndex(self.dates[rows], name='Date'))
+        return data[data['Close'].notna()] if 'Close' in data.columns else data.dropna(how='all')
+
+    def frames(self, symbols=None, start=None, end=None):
+        """``{symbol: DataFrame}`` mapping accepted by calculate_returns_and_metrics."""
+        symbols = self.symbols if symbols is None else [s for s in symbols if s in self._columns]
+        return {symbol: self.frame(symbol, start, end) for symbol in symbols}
+
+
+def _remove_stale_files(path, generation):
+    """Delete the array files of generations before ``generation``, skipping any still in use."""
+    current = f'.{generation}.npy'
+    for name in os.listdir(path):
+        if name.endswith('.npy') and not name.endswith(current):
+            try:
+                os.remove(os.path.join(path, name))
+            except OSError:
+                pass
+
+
+def migrate_csv_to_store(stocks, data_dir=DATA_DIR, store_dir=STORE_DIR):
+    """One-shot migration of the ``*_IS.csv`` files into a PriceStore."""
+    all_data, missing = load_cached_data(stocks, data_dir)
+    if missing:
+        print(f"Uyarı: {len(missing)} hisse senedi için CSV bulunamadı: {missing}")
+    store = PriceStore.write(all_data, store_dir)
+    print(f"✓ {len(store.symbols)} hisse, {len(store.dates)} gün {store_dir}/ klasörüne yazıldı")
+    return store
+
+
+if __name__ == "__main__":
+    # python -m bist_risk.price_store [data_dir] [store_dir]
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else DATA_DIR
+    store_dir = sys.argv[2] if len(sys.argv) > 2 else STORE_DIR
+    symbols = sorted(
+        name[:-len('.csv')].replace('_', '.')
+        for name in os.listdir(data_dir)
+        if name.endswith('_IS.csv')
+    )
+    migrate_csv_to_store(symbols, data_dir, store_dir)
@@ -0,0 +1,382 @@
+"""Summary report writer: Markdown, HTML and JSON from one structured results model.
+
+The model is a list of ReportSection records, each holding JSON-like data
+(the ranking table as a DataFrame). Every format has a template per
+section, a generator of text lines, so nothing is built in memory as one
+string and large universes are streamed to disk line by line.
+
+Each section is rendered into a fragment file under ``.report_sections/``
+next to the reports, and the manifest records the input hash it was
+rendered from. On the next run only the sections whose data changed are
+rendered again; every report file is then re-assembled by streaming its
+fragments in order, so the output is the same as a full render.
+"""
+import html
+import json
+import math
+import os
+from dataclasses import dataclass, field
+
+from .instrumentation import span, timed
+
+# Output formats of write_report(), by file extension, and those written by default
+REPORT_FORMATS = ('md', 'html', 'json')
+DEFAULT_FORMATS = ('md', 'json')
+
+# Part of every section hash: bump when a template changes
+REPORT_VERSION = 1
+
+SECTIONS_DIR = '.report_sections'
+MANIFEST_FILE = '.report_manifest.json'
+
+HTML_STYLE = ("body{font-family:'DejaVu Sans',sans-serif;max-width:960px;margin:2em auto;line-height:1.5}"
+              "table{border-collapse:collapse}th,td{border:1px solid #ccc;padding:2px 6px;text-align:right}"
+              "th:nth-child(-n+3),td:nth-child(-n+3){text-align:left}")
+
+# Risk score factors as the methodology lists them
+FACTOR_LABELS = {
+    'Annual_Volatility': 'Yıllık Volatilite',
+    'Kurtosis': 'Basıklık/Kurtosis',
+    'Extreme_Days': 'Aşırı Hareket Günleri',
+    'Max_Drawdown': 'Maksimum Düşüş',
+    'VaR_95': 'Value at Risk %95',
+}
+
+STATISTICS = [
+    ('Z-Skor', 'Standardize edilmiş getiri (|Z| > 2 aşırı hareket)'),
+    ('Çarpıklık', 'Dağılımın asimetrisi (+ sağa çarpık, - sola çarpık)'),
+    ('Basıklık', 'Dağılımın kuyruk kalınlığı (yüksek = daha fazla aşırı değer)'),
+    ('Sharpe Oranı', 'Risk başına getiri (yüksek = daha iyi)'),
+    ('VaR %95', '%95 güven aralığında maksimum beklenen kayıp'),
+]
+
+
+@dataclass
+class ReportSection:
+    """One section of the results model: a name and its JSON-like ``data``."""
+    name: str
+    data: dict = field(default_factory=dict)
+
+    def input_hash(self):
+        """Hash of the section data; an unchanged hash renders the same fragments."""
+        from .result_cache import hash_value
+
+        return hash_value([REPORT_VERSION, self.name, self.data])
+
+
+def json_value(value):
+    """``value`` as JSON data: NaN and infinities become null, timestamps ISO strings, containers recursively."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {key: json_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_value(item) for item in value]
+    return value
+
+
+def _column_values(series):
+    """A column as a list of JSON values, converting element by element only where needed."""
+    values = series.tolist()
+    if series.dtype.kind == 'f':
+        if not series.isna().any() and not series.abs().eq(math.inf).any():
+            return values
+    elif series.dtype.kind in 'iub':
+        return values
+    return [json_value(value) for value in values]
+
+
+def _rows(frame):
+    """``frame`` rows as dicts of JSON values, one at a time and without iterrows()."""
+    columns = list(frame.columns)
+    for values in zip(*(_column_values(frame[col]) for col in columns)):
+        yield dict(zip(columns, values))
+
+
+# Markdown templates
+
+def _md_header(data):
+    yield f"# {data['label']} Risk Analizi Raporu"
+    yield f"**Analiz Tarihi:** {data['generated']}"
+    yield f"**Veri Aralığı:** {data['start']} - {data['end']}"
+    if data['interval'] != '1d':
+        yield f"**Bar Aralığı:** {data['interval']} (yıllıklaştırma: yılda {data['periods_per_year']} bar)"
+    yield f"**Analiz Edilen Hisse Sayısı:** {data['stocks']}"
+    yield ""
+
+
+def _md_summary(data):
+    yield "## Yönetici Özeti"
+    yield f"- **Ortalama Yıllık Getiri:** {data['mean_annual_return'] * 100:.2f}%"
+    yield f"- **Ortalama Yıllık Volatilite:** {data['mean_annual_volatility'] * 100:.2f}%"
+    yield f"- **Ortalama Sharpe Oranı:** {data['mean_sharpe_ratio']:.3f}"
+    yield ""
+
+
+def _md_categories(data):
+    yield "## Risk Kategorileri"
+    for entry in data['categories']:
+        yield f"- **{entry['category']}:** {entry['count']} hisse ({entry['percent']:.1f}%)"
+    yield ""
+
+
+def _md_performance(data):
+    yield "## En İyi Performans"
+    yield "### En Yüksek Getiri"
+    for entry in data['annual_return']:
+        yield f"- **{entry['name']}:** {entry['value'] * 100:.2f}% ({entry['category']})"
+    yield ""
+    yield "### En Yüksek Sharpe Oranı"
+    for entry in data['sharpe_ratio']:
+        yield f"- **{entry['name']}:** {entry['value']:.3f} ({entry['category']})"
+    yield ""
+
+
+def _md_sectors(data):
+    best = data['best_sector']
+    yield "## Sektörel Performans"
+    yield f"**En İyi Sektör (Sharpe Oranı):** {best['sector']}"
+    yield f"- Ortalama Getiri: {best['annual_return'] * 100:.2f}%"
+    yield f"- Ortalama Volatilite: {best['annual_volatility'] * 100:.2f}%"
+    yield f"- Ortalama Sharpe: {best['sharpe_ratio']:.3f}"
+    yield ""
+
+
+def _md_warnings(data):
+    yield "## Risk Uyarıları"
+    if data['high_risk']:
+        yield "**Yüksek Risk Kategorisindeki Hisseler:**"
+        for entry in data['high_risk']:
+            yield f"- {entry['name']}"
+    yield ""
+
+
+def _md_methodology(data):
+    yield "## Metodoloji"
+    yield "### Risk Skoru Hesaplama"
+    yield "Risk skoru aşağıdaki faktörlerin ağırlıklı ortalamasıdır:"
+    for entry in data['factors']:
+        yield f"- {entry['label']} ({entry['weight'] * 100:g}%)"
+    yield ""
+    yield "### İstatistiksel Ölçümler"
+    for name, text in STATISTICS:
+        yield f"- **{name}:** {text}"
+
+
+MARKDOWN = {
+    'header': _md_header,
+    'summary': _md_summary,
+    'categories': _md_categories,
+    'performance': _md_performance,
+    'sectors': _md_sectors,
+    'warnings': _md_warnings,
+    'methodology': _md_methodology,
+}
+
+
+# HTML templates (the Markdown sections plus the full ranking table)
+
+def _html_list(items):
+    yield "<ul>"
+    for item in items:
+        yield f"<li>{item}</li>"
+    yield "</ul>"
+
+
+def _html_header(data):
+    label = html.escape(data['label'])
+    yield "<!DOCTYPE html>"
+    yield '<html lang="tr">'
+    yield f'<head><meta charset="utf-8"><title>{label} Risk Analizi Raporu</title><style>{HTML_STYLE}</style></head>'
+    yield "<body>"
+    yield f"<h1>{label} Risk Analizi Raporu</h1>"
+    yield "<p>"
+    yield f"<strong>Analiz Tarihi:</strong> {html.escape(data['generated'])}<br>"
+    yield f"<strong>Veri Aralığı:</strong> {html.escape(str(data['start']))} - {html.escape(str(data['end']))}<br>"
+    if data['interval'] != '1d':
+        yield (f"<strong>Bar Aralığı:</strong> {html.escape(data['interval'])} "
+               f"(yıllıklaştırma: yılda {data['periods_per_year']} bar)<br>")
+    yield f"<strong>Analiz Edilen Hisse Sayısı:</strong> {data['stocks']}"
+    yield "</p>"
+
+
+def _html_summary(data):
+    yield "<h2>Yönetici Özeti</h2>"
+    yield from _html_list([
+        f"<strong>Ortalama Yıllık Getiri:</strong> {data['mean_annual_return'] * 100:.2f}%",
+        f"<strong>Ortalama Yıllık Volatilite:</strong> {data['mean_annual_volatility'] * 100:.2f}%",
+        f"<strong>Ortalama Sharpe Oranı:</strong> {data['mean_sharpe_ratio']:.3f}",
+    ])
+
+
+def _html_categories(data):
+    yield "<h2>Risk Kategorileri</h2>"
+    yield from _html_list(f"<strong>{html.escape(entry['category'])}:</strong> {entry['count']} hisse "
+                          f"({entry['percent']:.1f}%)" for entry in data['categories'])
+
+
+def _html_performance(data):
+    yield "<h2>En İyi Performans</h2>"
+    yield "<h3>En Yüksek Getiri</h3>"
+    yield from _html_list(f"<strong>{html.escape(entry['name'])}:</strong> {entry['value'] * 100:.2f}% "
+                          f"({html.escape(entry['category'])})" for entry in data['annual_return'])
+    yield "<h3>En Yüksek Sharpe Oranı</h3>"
+    yield from _html_list(f"<strong>{html.escape(entry['name'])}:</strong> {entry['value']:.3f} "
+                          f"({html.escape(entry['category'])})" for entry in data['sharpe_ratio'])
+
+
+def _html_sectors(data):
+    best = data['best_sector']
+    yield "<h2>Sektörel Performans</h2>"
+    yield f"<p><strong>En İyi Sektör (Sharpe Oranı):</strong> {html.escape(best['sector'])}</p>"
+    yield from _html_list([
+        f"Ortalama Getiri: {best['annual_return'] * 100:.2f}%",
+        f"Ortalama Volatilite: {best['annual_volatility'] * 100:.2f}%",
+        f"Ortalama Sharpe: {best['sharpe_ratio']:.3f}",
+    ])
+
+
+def _html_warnings(data):
+    yield "<h2>Risk Uyarıları</h2>"
+    if data['high_risk']:
+        yield "<p><strong>Yüksek Risk Kategorisindeki Hisseler:</strong></p>"
+        yield from _html_list(html.escape(entry['name']) for entry in data['high_risk'])
+
+
+def _html_ranking(data):
+    yield "<h2>Risk Sıralaması</h2>"
+    frame = data['ranking']
+    yield "<table>"
+    yield "<tr>" + ''.join(f"<th>{html.escape(col)}</th>" for col in frame.columns) + "</tr>"
+    for row in _rows(frame):
+        cells = (f"{value:.4f}" if isinstance(value, float) else '' if value is None else html.escape(str(value))
+                 for value in row.values())
+        yield "<tr>" + ''.join(f"<td>{cell}</td>" for cell in cells) + "</tr>"
+    yield "</table>"
+
+
+def _html_methodology(data):
+    yield "<h2>Metodoloji</h2>"
+    yield "<h3>Risk Skoru Hesaplama</h3>"
+    yield "<p>Risk skoru aşağıdaki faktörlerin ağırlıklı ortalamasıdır:</p>"
+    yield from _html_list(f"{html.escape(entry['label'])} ({entry['weight'] * 100:g}%)" for entry in data['factors'])
+    yield "<h3>İstatistiksel Ölçümler</h3>"
+    yield from _html_list(f"<strong>{name}:</strong> {html.escape(text)}" for name, text in STATISTICS)
+
+
+HTML = {
+    'header': _html_header,
+    'summary': _html_summary,
+    'categories': _html_categories,
+    'performance': _html_performance,
+    'sectors': _html_sectors,
+    'warnings': _html_warnings,
+    'ranking': _html_ranking,
+    'methodology': _html_methodology,
+}
+
+
+# JSON: one member per section; the ranking is an array written a row per line
+
+def _json_section(name):
+    def render(data):
+        key = json.dumps(name)
+        if name == 'ranking':
+            yield f"{key}: ["
+            rows = _rows(data['ranking'])
+            for i, row in enumerate(rows):
+                yield ("" if i == 0 else ",") + json.dumps(row, ensure_ascii=False)
+            yield "]"
+        else:
+            yield f"{key}: {json.dumps(json_value(data), ensure_ascii=False)}"
+    return render
+
+
+# Per format: section templates, text before the first section, between sections and after the last
+TEMPLATES = {
+    'md': (MARKDOWN, '', '\n', ''),
+    'html': (HTML, '', '\n', '\n</body>\n</html>\n'),
+    'json': ({name: _json_section(name) for name in list(MARKDOWN) + ['ranking']},
+             f'{{\n"version": {REPORT_VERSION},\n', ',\n', '\n}\n'),
+}
+
+
+def _load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_lines(path, lines):
+    """Write ``lines`` joined by newlines (none after the last) as they are generated."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for i, line in enumerate(lines):
+            if i:
+                f.write('\n')
+            f.write(line)
+    os.replace(tmp_path, path)
+
+
+@timed()
+def write_report(sections, path, formats=DEFAULT_FORMATS):
+    """Write the ``sections`` model as ``path`` with each format's extension (summary_report.md, .json ...).
+
+    Only sections whose input hash differs from the manifest (or whose
+    fragment is missing) are rendered; the others reuse their fragment.
+    Returns ``(rendered, reused)`` lists of section names.
+    """
+    unknown = [fmt for fmt in formats if fmt not in TEMPLATES]
+    if unknown:
+        raise ValueError(f"Bilinmeyen rapor biçimi: {', '.join(unknown)} (seçenekler: {', '.join(REPORT_FORMATS)})")
+
+    directory = os.path.dirname(path) or '.'
+    base = os.path.splitext(os.path.basename(path))[0]
+    fragments_dir = os.path.join(directory, SECTIONS_DIR)
+    os.makedirs(fragments_dir, exist_ok=True)
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    manifest = _load_manifest(manifest_path)
+
+    rendered, reused = set(), set()
+    for fmt in formats:
+        templates, before, between, after = TEMPLATES[fmt]
+        fragments = []
+        for section in sections:
+            template = templates.get(section.name)
+            if template is None:
+                continue
+            name = f"{base}.{section.name}.{fmt}"
+            fragment = os.path.join(fragments_dir, name)
+            digest = section.input_hash()
+            if os.path.exists(fragment) and manifest.get(name) == digest:
+                reused.add(section.name)
+            else:
+                with span(f"{section.name}.{fmt}"):
+                    _write_lines(fragment, template(section.data))
+                manifest[name] = digest
+                rendered.add(section.name)
+            fragments.append(fragment)
+
+        # Assemble the report by streaming its fragments; replaced atomically
+        output = os.path.join(directory, f"{base}.{fmt}")
+        tmp_path = f"{output}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as out:
+            out.write(before)
+            for i, fragment in enumerate(fragments):
+                if i:
+                    out.write(between)
+                with open(fragment, 'r', encoding='utf-8') as f:
+                    while chunk := f.read(1 << 16):
+                        out.write(chunk)
+            out.write(after)
+        os.replace(tmp_path, output)
+
+    tmp_path = f'{manifest_path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+    return [s.name for s in sections if s.name in rendered], [s.name for s in sections if s.name in reused - rendered]
@@ -0,0 +1,313 @@
+import math
+import os
+from datetime import datetime
+
+from .instrumentation import timed
+from .pipeline import REPORTS_DIR
+
+# Stocks shown in the individual distributions figure when in the universe
+DISTRIBUTION_STOCKS = ['AKBNK.IS', 'GARAN.IS', 'THYAO.IS', 'EREGL.IS', 'BIMAS.IS', 'SISE.IS']
+
+
+@timed()
+def create_sector_summary(risk_df, path=os.path.join(REPORTS_DIR, 'sector_summary.csv')):
+    """Average return, volatility, Sharpe ratio and risk score per sector (saved unless ``path`` is None)."""
+    sector_summary = risk_df.groupby('Sector').agg({
+        'Annual_Return': 'mean',
+        'Annual_Volatility': 'mean',
+        'Sharpe_Ratio': 'mean',
+        'Risk_Score': 'mean'
+    }).round(4)
+
+    # Save sector summary
+    if path:
+        sector_summary.to_csv(path)
+    return sector_summary
+
+
+@timed()
+def estimate_covariance(results, method, window=None, decay=None, state_path=None, rewritten=()):
+    """Daily return covariance of the ``results`` stocks with a covariance estimator.
+
+    ``method`` is one of the estimators in the covariance module. With
+    ``state_path`` the estimator is resumed from that file and saved back,
+    so only the days after its last update are processed. The saved
+    state mixes every pair of symbols, so it is rebuilt from the returns
+    when one of its symbols is in ``rewritten`` (histories changed since
+    it was saved). Returns a DataFrame indexed by symbol.
+    """
+    from .covariance import DEFAULT_DECAY, DEFAULT_WINDOW, load_estimator, make_estimator
+    from .results import returns_frame
+
+    print(f"\nKovaryans matrisi tahmin ediliyor ({method})...")
+    estimator = make_estimator(method, window=window or DEFAULT_WINDOW, decay=decay or DEFAULT_DECAY)
+    if state_path and os.path.exists(state_path):
+        saved = load_estimator(state_path)
+        if (saved.kind, saved.params()) != (estimator.kind, estimator.params()):
+            raise ValueError(f"{state_path} farklı bir tahminciye ait ({saved.kind}, {saved.params()})")
+        stale = [symbol for symbol in rewritten if symbol in saved.index]
+        if stale:
+            print(f"Not: {len(stale)} hissenin fiyat geçmişi yeniden yazıldı, kovaryans durumu baştan oluşturuluyor")
+        else:
+            estimator = saved
+
+    returns_df = returns_frame(results)
+    applied = estimator.update(returns_df.index, list(returns_df.columns), returns_df.to_numpy(dtype=float))
+    if state_path:
+        estimator.save(state_path)
+        print(f"✓ Kovaryans durumu güncellendi: {applied} yeni gün ({state_path})")
+    return estimator.covariance_frame(list(results))
+
+
+def by_name(matrix, results):
+    """A symbol-indexed square matrix relabelled with the stocks' display names."""
+    names = {stock: results[stock]['name'] for stock in matrix.index}
+    return matrix.rename(index=names, columns=names)
+
+
+@timed()
+def create_correlation_matrix(results, path=os.path.join(REPORTS_DIR, 'correlation_matrix.csv'), covariance=None):
+    """Create correlation matrix of returns (saved unless ``path`` is None).
+
+    Pairwise Pearson correlations by default; given a ``covariance``
+    estimate (see estimate_covariance) its correlations are used instead.
+    The matrix is indexed by symbol, since display names need not be
+    unique; the saved CSV shows the names (see by_name()).
+    """
+    import pandas as pd
+    from .metrics_engine import nan_correlation
+    from .results import returns_frame
+
+    print("\nKorelasyon matrisi oluşturuluyor...")
+
+    symbols = list(results)
+    if covariance is not None:
+        from .covariance import correlation_from_covariance
+
+        correlation = correlation_from_covariance(covariance.loc[symbols, symbols].to_numpy())
+        correlation_matrix = pd.DataFrame(correlation, index=symbols, columns=symbols)
+    else:
+        # Pairwise correlations straight from the shared returns matrix
+        returns = returns_frame(results).to_numpy(dtype=float)
+        correlation_matrix = pd.DataFrame(nan_correlation(returns), index=symbols, columns=symbols)
+
+    # Save correlation matrix
+    if path:
+        by_name(correlation_matrix, results).to_csv(path)
+
+    return correlation_matrix
+
+
+def read_weights(path):
+    """``{symbol: weight}`` from a CSV file with ``symbol`` and ``weight`` columns."""
+    import pandas as pd
+
+    weights = pd.read_csv(path)
+    if not {'symbol', 'weight'} <= set(weights.columns):
+        raise ValueError(f"{path}: 'symbol' ve 'weight' sütunları gerekli")
+    return dict(zip(weights['symbol'].astype(str).str.strip(), weights['weight'].astype(float)))
+
+
+@timed()
+def create_portfolio_report(results, correlation_matrix, weights=None, levels=(95, 99),
+                            path=os.path.join(REPORTS_DIR, 'portfolio_risk.csv'),
+                            sector_path=os.path.join(REPORTS_DIR, 'portfolio_sectors.csv'), covariance=None,
+                            interval='1d'):
+    """Volatility, VaR/ES and risk contributions of a portfolio of ``results`` stocks.
+
+    The covariance model is ``covariance`` when given (see
+    estimate_covariance), otherwise the symbol-indexed correlation matrix
+    of create_correlation_matrix() rescaled by each stock's volatility.
+    ``weights`` maps symbols to weights (default: equal weight); stocks
+    without a weight are held at zero. Per-stock and per-sector
+    contributions are saved to ``path`` and ``sector_path`` unless None.
+    VaR and ES are over one ``interval`` bar.
+    """
+    import pandas as pd
+    from .bars import bar_label, periods_per_year
+    from .portfolio_risk import PortfolioRisk, covariance_from_correlation
+
+    print("\nPortföy riski hesaplanıyor...")
+
+    symbols = list(results)
+    if weights is None:
+        weights = {stock: 1.0 / len(symbols) for stock in symbols}
+    unknown = [stock for stock in weights if stock not in results]
+    if unknown:
+        raise ValueError(f"Ağırlık verilen hisselerin metrikleri yok: {', '.join(unknown)}")
+
+    names = [results[stock]['name'] for stock in symbols]
+    if covariance is not None:
+        cov = covariance.loc[symbols, symbols].to_numpy()
+    else:
+        std = [results[stock]['std_return'] for stock in symbols]
+        cov = covariance_from_correlation(correlation_matrix.loc[symbols, symbols].to_numpy(), std)
+    portfolio = PortfolioRisk(cov, symbols,
+                              [weights.get(stock, 0.0) for stock in symbols],
+                              mean=[results[stock]['mean_return'] for stock in symbols],
+                              sectors=[results[stock]['sector'] for stock in symbols],
+                              periods_per_year=periods_per_year(interval))
+
+    # Contributions are annualised like Annual_Volatility
+    annual = math.sqrt(portfolio.periods_per_year)
+    contributions = pd.DataFrame({
+        'Symbol': symbols,
+        'Name': names,
+        'Sector': portfolio.sectors,
+        'Weight': portfolio.weights,
+        'Marginal_Risk': portfolio.marginal_contributions() * annual,
+        'Risk_Contribution': portfolio.component_contributions() * annual,
+    })
+    contributions['Risk_Share'] = contributions['Risk_Contribution'] / portfolio.annual_volatility
+    contributions = contributions[contributions['Weight'] != 0]
+
+    sectors = pd.DataFrame(
+        [(sector, weight, component * annual)
+         for sector, (weight, component) in portfolio.sector_contributions().items() if weight != 0],
+        columns=['Sector', 'Weight', 'Risk_Contribution'])
+    sectors['Risk_Share'] = sectors['Risk_Contribution'] / portfolio.annual_volatility
+    sectors = sectors.sort_values('Risk_Contribution', ascending=False)
+
+    var, es = portfolio.var_es(levels)
+    print(f"Portföy yıllık volatilitesi: {portfolio.annual_volatility * 100:.2f}%")
+    for level, level_var, level_es in zip(levels, var, es):
+        print(f"{bar_label(interval)} VaR %{level:g}: {level_var * 100:.2f}%, ES: {level_es * 100:.2f}%")
+
+    if path:
+        contributions.to_csv(path, index=False)
+    if sector_path:
+        sectors.to_csv(sector_path, index=False)
+    return portfolio
+
+
+@timed()
+def figure_specs(results, risk_df, sector_summary, correlation_matrix, label='BIST30', interval='1d'):
+    """Describe every figure (output path, drawing function, data) without drawing it."""
+    from .plotting import (PLOTS_DIR, FigureSpec, draw_correlation_matrix, draw_individual_distributions,
+                           draw_risk_dashboard, draw_sector_analysis)
+
+    # Individual Stock Distributions (top 6 by market interest; other
+    # universes fill the panels with their first stocks)
+    selected_stocks = [stock for stock in DISTRIBUTION_STOCKS if stock in results]
+    selected_stocks += [stock for stock in results if stock not in selected_stocks][:6 - len(selected_stocks)]
+    distributions = [
+        {
+            'name': results[stock]['name'],
+            'returns': results[stock].returns_column,
+            'skewness': results[stock]['skewness'],
+            'kurtosis': results[stock]['kurtosis'],
+        }
+        for stock in selected_stocks
+    ]
+
+    return [
+        FigureSpec(os.path.join(PLOTS_DIR, 'risk_dashboard.png'), draw_risk_dashboard,
+                   {'risk_df': risk_df, 'label': label, 'interval': interval}),
+        FigureSpec(os.path.join(PLOTS_DIR, 'sector_analysis.png'), draw_sector_analysis,
+                   {'sector_summary': sector_summary, 'label': label}),
+        FigureSpec(os.path.join(PLOTS_DIR, 'individual_distributions.png'), draw_individual_distributions,
+                   {'distributions': distributions, 'interval': interval}),
+        FigureSpec(os.path.join(PLOTS_DIR, 'correlation_matrix.png'), draw_correlation_matrix,
+                   {'correlation_matrix': by_name(correlation_matrix, results), 'label': label}),
+    ]
+
+
+@timed()
+def plot_comprehensive_analysis(results, risk_df, sector_summary, correlation_matrix, mode='full', label='BIST30',
+                                interval='1d'):
+    """Render the visualization plots in parallel, skipping figures whose inputs are unchanged."""
+    if mode == 'none':
+        return
+    from .plotting import render_figures
+
+    print("\nKapsamlı görselleştirmeler oluşturuluyor...")
+
+    specs = figure_specs(results, risk_df, sector_summary, correlation_matrix, label=label, interval=interval)
+    rendered, skipped = render_figures(specs, mode=mode)
+    print(f"✓ {len(rendered)} grafik çizildi, {len(skipped)} grafik değişmediği için atlandı")
+
+
+@timed()
+def report_sections(results, risk_df, start, end, label='BIST30', interval='1d', weights=None):
+    """The summary report's results model: one ReportSection per section, without rendering it.
+
+    ``weights`` are the risk score weights the ranking was made with
+    (default: pipeline.RISK_WEIGHTS), listed in the methodology.
+    """
+    import pandas as pd
+    from .bars import bar_label, periods_per_year
+    from .pipeline import RISK_WEIGHTS
+    from .report_writer import FACTOR_LABELS, ReportSection
+
+    weights = RISK_WEIGHTS if weights is None else weights
+    extreme_label = (FACTOR_LABELS['Extreme_Days'] if interval == '1d'
+                     else f"Aşırı Hareketli {bar_label(interval)} Bar'lar")
+
+    def top(column):
+        best = risk_df.nlargest(5, column)
+        return [{'symbol': symbol, 'name': name, 'value': float(value), 'category': category}
+                for symbol, name, value, category in zip(best['Symbol'], best['Name'], best[column],
+                                                         best['Risk_Category'])]
+
+    risk_counts = risk_df['Risk_Category'].value_counts()
+    sector_summary = risk_df.groupby('Sector').agg({
+        'Annual_Return': 'mean',
+        'Annual_Volatility': 'mean',
+        'Sharpe_Ratio': 'mean'
+    }).round(4)
+    best_sector = sector_summary['Sharpe_Ratio'].idxmax()
+    high_risk = risk_df[risk_df['Risk_Category'] == 'Yüksek Risk']
+
+    return [
+        ReportSection('header', {
+            'label': label,
+            'generated': datetime.now().strftime('%Y-%m-%d %H:%M'),
+            'start': start,
+            'end': end,
+            'interval': interval,
+            'periods_per_year': periods_per_year(interval),
+            'stocks': len(results),
+        }),
+        ReportSection('summary', {
+            'mean_annual_return': float(risk_df['Annual_Return'].mean()),
+            'mean_annual_volatility': float(risk_df['Annual_Volatility'].mean()),
+            'mean_sharpe_ratio': float(risk_df['Sharpe_Ratio'].mean()),
+        }),
+        ReportSection('categories', {'categories': [
+            {'category': category, 'count': int(count), 'percent': count / len(risk_df) * 100}
+            for category, count in risk_counts.items() if pd.notna(category)
+        ]}),
+        ReportSection('performance', {'annual_return': top('Annual_Return'), 'sharpe_ratio': top('Sharpe_Ratio')}),
+        ReportSection('sectors', {'best_sector': {
+            'sector': best_sector,
+            **{key: float(sector_summary.loc[best_sector, column]) for key, column in
+               [('annual_return', 'Annual_Return'), ('annual_volatility', 'Annual_Volatility'),
+                ('sharpe_ratio', 'Sharpe_Ratio')]},
+        }}),
+        ReportSection('warnings', {'high_risk': [{'symbol': symbol, 'name': name}
+                                                 for symbol, name in zip(high_risk['Symbol'], high_risk['Name'])]}),
+        ReportSection('ranking', {'ranking': risk_df}),
+        ReportSection('methodology', {'factors': [
+            {'factor': factor, 'label': extreme_label if factor == 'Extreme_Days' else FACTOR_LABELS[factor],
+             'weight': weight}
+            for factor, weight in weights.items()
+        ]}),
+    ]
+
+
+@timed()
+def generate_summary_report(results, risk_df, start, end, path=os.path.join(REPORTS_DIR, 'summary_report.md'),
+                            label='BIST30', interval='1d', weights=None, formats=None):
+    """Generate comprehensive summary report for the ``start`` - ``end`` data range of universe ``label``.
+
+    Written as ``path`` in each of ``formats`` (see report_writer), only
+    re-rendering the sections whose inputs changed since the last run.
+    ``formats`` defaults to report_writer.DEFAULT_FORMATS (Markdown and JSON).
+    """
+    from .report_writer import DEFAULT_FORMATS, write_report
+
+    print("\nÖzet rapor oluşturuluyor...")
+
+    sections = report_sections(results, risk_df, start, end, label=label, interval=interval, weights=weights)
+    rendered, reused = write_report(sections, path, formats or DEFAULT_FORMATS)
+    print(f"✓ {len(rendered)} rapor bölümü oluşturuldu, {len(reused)} bölüm değişmediği için yeniden kullanıldı")
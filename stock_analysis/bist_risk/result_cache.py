@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = 'cache'
+
+# Default size limit for the on-disk cache (bytes)
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+# Which entry wrote each output file of memoize(), and the file's size and mtime then
+OUTPUTS_FILE = 'outputs.json'
+
+MISSING = object()
+
+
+def hash_frame(data):
+    """Content hash of a DataFrame: index, column names and values."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(col) for col in data.columns]).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def hash_value(value):
+    """Content hash of frames, series, arrays and JSON-like containers of them."""
+    if isinstance(value, pd.DataFrame):
+        return hash_frame(value)
+    if isinstance(value, pd.Series):
+        return hash_frame(value.to_frame())
+    if isinstance(value, np.ndarray):
+        digest = hashlib.sha256(str((value.dtype, value.shape)).encode('utf-8'))
+        digest.update(np.ascontiguousarray(value).tobytes())
+        return digest.hexdigest()
+    if isinstance(value, dict):
+        value = {str(k): hash_value(v) for k, v in value.items()}
+    elif isinstance(value, (list, tuple)):
+        value = [hash_value(v) for v in value]
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """Content-addressed, size-bounded LRU cache of pickled results on disk.
+
+    Keys are built with key() from hashes of the inputs plus the analysis
+    parameters, so a changed input simply misses. When the directory grows
+    beyond ``max_bytes`` the least recently used entries are deleted. With
+    ``directory=None`` the cache is disabled: nothing is stored and every
+    lookup misses.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = {}
+        self._outputs = {}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            for entry in os.scandir(directory):
+                if entry.name.endswith('.pkl'):
+                    stat = entry.stat()
+                    self._entries[entry.name[:-len('.pkl')]] = [stat.st_size, stat.st_mtime]
+            try:
+                with open(os.path.join(directory, OUTPUTS_FILE), 'r', encoding='utf-8') as f:
+                    self._outputs = json.load(f)
+            except (OSError, ValueError):
+                pass
+
+    @property
+    def enabled(self):
+        return bool(self.directory)
+
+    @staticmethod
+    def key(*parts):
+        """Stable hex key for any JSON-serialisable combination of parts."""
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.pkl')
+
+    def get(self, key, default=MISSING):
+        """Return the cached value for ``key`` or ``default``, counting hits/misses."""
+        if not self.enabled or key not in self._entries:
+            self.misses += 1
+            return default
+        try:
+            with open(self._path(key), 'rb') as f:
+                value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            self._entries.pop(key, None)
+            self.misses += 1
+            return default
+
+        # Touch the file so eviction sees it as recently used, and move the entry last: file times are
+        # coarse, and eviction breaks ties between equal times in this order
+        os.utime(self._path(key))
+        self._entries[key] = [self._entries.pop(key)[0], os.path.getmtime(self._path(key))]
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        """Store ``value`` under ``key`` and evict old entries if over budget."""
+        if not self.enabled:
+            return
+        path = self._path(key)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self._entries.pop(key, None)
+        self._entries[key] = [os.path.getsize(path), os.path.getmtime(path)]
+        self._evict()
+
+    def _evict(self):
+        total = sum(size for size, _ in self._entries.values())
+        for key in sorted(self._entries, key=lambda k: self._entries[k][1]):
+            if total <= self.max_bytes:
+                break
+            total -= self._entries.pop(key)[0]
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            self.evictions += 1
+
+    def memoize(self, key, func, outputs=()):
+        """Return the cached result of ``func()``, computing it on a miss.
+
+        ``outputs`` lists files ``func`` writes; a hit only counts if they
+        are all still the files this entry wrote (not removed, and not since
+        rewritten by a run with other inputs), otherwise ``func`` runs again
+        to recreate them.
+        """
+        value = self.get(key)
+        if value is not MISSING and all(self._output_written(key, path) for path in outputs):
+            return value
+        if value is not MISSING:
+            # Entry was found but its files are gone or stale: count it as a miss
+            self.hits -= 1
+            self.misses += 1
+        value = func()
+        self.set(key, value)
+        self._record_outputs(key, outputs)
+        return value
+
+    @staticmethod
+    def _fingerprint(path):
+        stat = os.stat(path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _output_written(self, key, path):
+        """True if ``path`` is unchanged since the entry ``key`` wrote it."""
+        try:
+            fingerprint = self._fingerprint(path)
+        except OSError:
+            return False
+        return self._outputs.get(os.path.abspath(path)) == [key] + fingerprint
+
+    def _record_outputs(self, key, outputs):
+        if not self.enabled or not outputs:
+            return
+        for path in outputs:
+            if os.path.exists(path):
+                self._outputs[os.path.abspath(path)] = [key] + self._fingerprint(path)
+        path = os.path.join(self.directory, OUTPUTS_FILE)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._outputs, f)
+        os.replace(tmp_path, path)
+
+    def stats(self):
+        """Hit/miss/eviction counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self._entries),
+            'bytes': sum(size for size, _ in self._entries.values()),
+        }
@@ -0,0 +1,190 @@
+"""Compact per-stock results: slotted metric records over one shared returns matrix.
+
+calculate_returns_and_metrics() returns ``{symbol: StockResult}``. A record
+holds the stock's scalar metrics and a column index into a ReturnsPanel,
+the (dates x stocks) log-return matrix the metrics engine produced, so
+no per-stock price or return frames are kept. Stages that need returns
+read them through returns_frame(), which is a view of the panel when
+they ask for its stocks in order.
+
+Records support ``result['key']`` access as the plain dicts they replace
+(and the streaming engine still returns) do. A record pickled on its
+own (per-stock cache entries, artifacts) carries just its own valid
+returns; share_returns() gathers such records back into one panel.
+"""
+import numpy as np
+import pandas as pd
+
+from .metrics_engine import DRAWDOWN_DATE_KEYS, METRIC_KEYS
+from .trading_calendar import TradingCalendar
+
+# Added to the records by later stages (compute_conditional_volatility)
+MODEL_KEYS = ['conditional_volatility', 'conditional_annual_volatility']
+
+# Keys readable as result['key']
+RESULT_KEYS = ['name', 'sector'] + METRIC_KEYS + DRAWDOWN_DATE_KEYS + MODEL_KEYS
+
+
+class ReturnsPanel:
+    """Log returns of several stocks as one (dates x stocks) float64 matrix, NaN where a stock has none.
+
+    Rows where no stock has a return are left out, as the date union of
+    the per-stock series would; leading and trailing ones are sliced off
+    without copying the matrix.
+    """
+
+    __slots__ = ('dates', 'symbols', 'values')
+
+    def __init__(self, dates, symbols, values):
+        dates = pd.DatetimeIndex(dates)
+        values = np.asarray(values, dtype=np.float64)
+        filled = ~np.isnan(values).all(axis=1) if values.shape[1] else np.zeros(len(values), dtype=bool)
+        rows = np.flatnonzero(filled)
+        if len(rows) == 0:
+            dates, values = dates[:0], values[:0]
+        elif len(rows) == rows[-1] - rows[0] + 1:
+            dates, values = dates[rows[0]:rows[-1] + 1], values[rows[0]:rows[-1] + 1]
+        else:
+            dates, values = dates[filled], values[filled]
+        self.dates = dates
+        self.symbols = list(symbols)
+        self.values = values
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.dates.nbytes
+
+
+class StockResult:
+    """Scalar metrics of one stock and its column of a shared ReturnsPanel."""
+
+    __slots__ = ['symbol', 'panel', 'column'] + RESULT_KEYS
+
+    def __init__(self, symbol, panel, column, **values):
+        self.symbol = symbol
+        self.panel = panel
+        self.column = column
+        for key, value in values.items():
+            self[key] = value
+
+    def __getitem__(self, key):
+        if key not in RESULT_KEYS:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        if key not in RESULT_KEYS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in RESULT_KEYS and hasattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in RESULT_KEYS else default
+
+    def keys(self):
+        return [key for key in RESULT_KEYS if hasattr(self, key)]
+
+    def __repr__(self):
+        return f"StockResult({self.symbol!r}, {len(self.keys())} metrik)"
+
+    @property
+    def returns_column(self):
+        """This stock's column of the panel: a (strided) view, NaN on dates without a return."""
+        return self.panel.values[:, self.column]
+
+    @property
+    def returns(self):
+        """Valid returns as a date-indexed Series (a copy)."""
+        column = self.returns_column
+        valid = ~np.isnan(column)
+        return pd.Series(column[valid], index=self.panel.dates[valid], name='Returns')
+
+    def __getstate__(self):
+        # Pickled alone, a record carries only its own valid returns, not the whole panel
+        state = {key: getattr(self, key) for key in RESULT_KEYS if hasattr(self, key)}
+        returns = self.returns
+        state['symbol'] = self.symbol
+        state['returns'] = (returns.index.to_numpy(), returns.to_numpy())
+        return state
+
+    def __setstate__(self, state):
+        state = dict(state)
+        dates, values = state.pop('returns')
+        self.symbol = state.pop('symbol')
+        self.panel = ReturnsPanel(dates, [self.symbol], values[:, None])
+        self.column = 0
+        for key, value in state.items():
+            setattr(self, key, value)
+
+
+def results_from_metrics(dates, symbols, metrics, universe, keep):
+    """``{symbol: StockResult}`` for the ``keep`` columns of a compute_universe_metrics() output.
+
+    The records share one panel built from the engine's returns matrix;
+    it is a view unless some columns are dropped.
+    """
+    columns = np.flatnonzero(keep)
+    returns = metrics['returns']
+    if len(columns) < returns.shape[1]:
+        returns = returns[:, columns]
+    kept = [symbols[j] for j in columns]
+    panel = ReturnsPanel(dates, kept, returns)
+    keys = METRIC_KEYS + [key for key in DRAWDOWN_DATE_KEYS if key in metrics]
+    return {
+        stock: StockResult(stock, panel, i, name=universe[stock]['name'], sector=universe[stock]['sector'],
+                           **{key: metrics[key][j] for key in keys})
+        for i, (stock, j) in enumerate(zip(kept, columns))
+    }
+
+
+def _gathered_panel(records):
+    """ReturnsPanel of the records' valid returns, aligned on the calendar of their dates."""
+    returns = [record.returns for record in records]
+    calendar, offsets = TradingCalendar.with_offsets(series.index for series in returns)
+    values = calendar.gather([series.to_numpy() for series in returns], offsets)
+    return ReturnsPanel(calendar.dates, [record.symbol for record in records], values)
+
+
+def share_returns(results):
+    """Rebuild the records of ``results`` over one panel if they do not already share one, in place.
+
+    Used after records come from separate sources (cache entries, a
+    loaded artifact). The panel's columns follow the order of ``results``.
+    """
+    records = list(results.values())
+    if not records:
+        return
+    panel = records[0].panel
+    if all(record.panel is panel and record.column == j for j, record in enumerate(records)) \
+            and len(panel.symbols) == len(records):
+        return
+    panel = _gathered_panel(records)
+    for j, record in enumerate(records):
+        record.panel, record.column = panel, j
+
+
+def returns_frame(results, symbols=None):
+    """Returns of ``symbols`` (default: all of ``results``) as a (dates x symbols) DataFrame.
+
+    When the records share a panel and ``symbols`` are its columns in
+    order, the frame is a view of the panel; otherwise the columns are
+    gathered, dropping dates on which none of them has a return.
+    """
+    symbols = list(results) if symbols is None else list(symbols)
+    records = [results[stock] for stock in symbols]
+    if not records:
+        return pd.DataFrame()
+    panel = records[0].panel
+    if all(record.panel is panel for record in records):
+        columns = [record.column for record in records]
+        if columns == list(range(len(panel.symbols))):
+            return pd.DataFrame(panel.values, index=panel.dates, columns=symbols, copy=False)
+        subset = ReturnsPanel(panel.dates, symbols, panel.values[:, columns])
+        return pd.DataFrame(subset.values, index=subset.dates, columns=symbols, copy=False)
+    panel = _gathered_panel(records)
+    return pd.DataFrame(panel.values, index=panel.dates, columns=symbols, copy=False)
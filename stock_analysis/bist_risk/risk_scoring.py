@@ -0,0 +1,191 @@
+"""Cross-sectional risk scores over a (dates x tickers x factors) array.
+
+Each factor is ranked across the tickers of every date at once (NaN-aware
+percentile ranks with the same values as pandas ``rank(pct=True)``), the
+ranks are combined with the factor weights and the score is bucketed
+into the risk categories. A single snapshot is the one-date case, so the
+current ranking and its history come from the same code.
+"""
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .metrics_engine import TRADING_DAYS, log_returns
+from .rolling_metrics import rolling_drawdown, rolling_moments, rolling_quantile
+
+# Score factors in weight order: +1 when a higher value means more risk,
+# -1 when a lower one does (drawdowns and VaR are negative returns)
+FACTOR_SIGNS = {
+    'Annual_Volatility': 1,
+    'Kurtosis': 1,
+    'Extreme_Days': 1,
+    'Max_Drawdown': -1,
+    'VaR_95': -1,
+}
+
+# Score buckets: right-closed intervals, with a score of exactly 0 in the first
+RISK_BINS = (0, 0.33, 0.66, 1)
+RISK_CATEGORIES = ('Düşük Risk', 'Orta Risk', 'Yüksek Risk')
+
+# Dates ranked per block in risk_scores (bounds the argsort temporaries)
+SCORE_CHUNK_DATES = 256
+
+
+def check_weights(weights):
+    """Validate ``{factor: weight}``; the weights must be non-negative and sum to 1."""
+    unknown = set(weights) - set(FACTOR_SIGNS)
+    if unknown:
+        raise ValueError(f"Bilinmeyen risk faktörü: {', '.join(sorted(unknown))}")
+    if any(weight < 0 for weight in weights.values()):
+        raise ValueError("Risk ağırlıkları negatif olamaz")
+    total = sum(weights.values())
+    if abs(total - 1) > 1e-9:
+        raise ValueError(f"Risk ağırlıklarının toplamı 1 olmalı (şu an {total:g})")
+
+
+def percentile_ranks(values, method='dense'):
+    """Percentile rank of each value along the last axis, ignoring NaN.
+
+    ``method`` is 'dense' (rank among the distinct values, divided by
+    their number) or 'average' (ties share their mean rank, divided by
+    the number of valid values), as in pandas. NaNs stay NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    order = np.argsort(values, axis=-1, kind='stable')  # NaNs sort to the end
+    ordered = np.take_along_axis(values, order, axis=-1)
+    valid = ~np.isnan(ordered)
+
+    # True where a run of equal values begins (NaN != NaN, but NaNs are masked)
+    starts = np.ones(values.shape, dtype=bool)
+    starts[..., 1:] = ordered[..., 1:] != ordered[..., :-1]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if method == 'dense':
+            rank = np.cumsum(starts & valid, axis=-1)
+            pct = rank / rank[..., -1:]
+        elif method == 'average':
+            n = values.shape[-1]
+            position = np.broadcast_to(np.arange(n), values.shape)
+            ends = np.ones(values.shape, dtype=bool)
+            ends[..., :-1] = starts[..., 1:]
+            first = np.maximum.accumulate(np.where(starts, position, 0), axis=-1)
+            last = np.minimum.accumulate(np.where(ends, position, n)[..., ::-1], axis=-1)[..., ::-1]
+            pct = ((first + last) / 2 + 1) / valid.sum(axis=-1, keepdims=True)
+        else:
+            raise ValueError(f"Bilinmeyen sıralama yöntemi: {method}")
+
+    out = np.empty(values.shape)
+    np.put_along_axis(out, order, np.where(valid, pct, np.nan), axis=-1)
+    return out
+
+
+def risk_scores(factors, weights, method='dense'):
+    """Weighted percentile-rank scores of a (dates x tickers x factors) array.
+
+    The factors are in FACTOR_SIGNS order and ``weights`` maps each to its
+    weight. Every date is ranked independently across tickers; a ticker
+    with any factor missing on a date has no score (NaN) that day.
+    Returns a (dates x tickers) array.
+    """
+    factors = np.asarray(factors, dtype=np.float64)
+    signs = np.array(list(FACTOR_SIGNS.values()), dtype=np.float64)
+    factor_weights = [weights[name] for name in FACTOR_SIGNS]
+    scores = np.full(factors.shape[:2], np.nan)
+    missing = np.isnan(factors).any(axis=2)
+
+    for start in range(0, len(factors), SCORE_CHUNK_DATES):
+        block = factors[start:start + SCORE_CHUNK_DATES] * signs
+        block[missing[start:start + SCORE_CHUNK_DATES]] = np.nan
+        # (factors x dates x tickers), ranked across tickers
+        ranks = percentile_ranks(np.moveaxis(block, 2, 0), method)
+        # Summed factor by factor, in a fixed order, so results are reproducible
+        score = ranks[0] * factor_weights[0]
+        for rank, weight in zip(ranks[1:], factor_weights[1:]):
+            score = score + rank * weight
+        scores[start:start + SCORE_CHUNK_DATES] = score
+    return scores
+
+
+def risk_categories(scores, bins=RISK_BINS):
+    """Category code of each score: i for ``bins[i] < score <= bins[i + 1]``, -1 outside or NaN.
+
+    Unlike ``pd.cut`` with the default ``include_lowest=False``, a score
+    equal to the lowest bin edge falls in the first category.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    codes = np.searchsorted(bins, scores, side='left') - 1
+    codes[scores == bins[0]] = 0
+    codes[(codes < 0) | (codes >= len(bins) - 1) | np.isnan(scores)] = -1
+    return codes
+
+
+def category_labels(codes):
+    """Ordered categorical of risk category labels from risk_categories() codes (-1 becomes NaN)."""
+    return pd.Categorical.from_codes(np.asarray(codes).ravel(), categories=list(RISK_CATEGORIES), ordered=True)
+
+
+def risk_transitions(dates, symbols, codes):
+    """Category changes of each ticker as a DataFrame (Date, Symbol, From, To).
+
+    A change is measured against the ticker's last known category, so days
+    without a score do not hide or invent transitions.
+    """
+    codes = np.asarray(codes)
+    # Row of each ticker's last scored day so far, carried over unscored days
+    last = np.where(codes >= 0, np.arange(len(codes))[:, None], 0)
+    np.maximum.accumulate(last, axis=0, out=last)
+    carried = codes[last, np.arange(codes.shape[1])]
+    previous = np.full(codes.shape, -1)
+    previous[1:] = carried[:-1]
+
+    rows, cols = np.nonzero((codes >= 0) & (previous >= 0) & (codes != previous))
+    labels = np.array(RISK_CATEGORIES, dtype=object)
+    return pd.DataFrame({
+        'Date': np.asarray(dates)[rows],
+        'Symbol': np.asarray(symbols, dtype=object)[cols],
+        'From': labels[previous[rows, cols]],
+        'To': labels[codes[rows, cols]],
+    })
+
+
+def rolling_extreme_days(returns, mean, std, window, z_threshold=2):
+    """Days in each trailing ``window`` whose |z-score| exceeds ``z_threshold``.
+
+    ``mean`` and ``std`` are the rolling moments of the same windows (see
+    rolling_moments), so each window's z-scores use its own moments as the
+    full-history count does and no value looks ahead of its date. NaN
+    until a column has a full window.
+    """
+    out = np.full(returns.shape[::-1], np.nan)
+    if len(returns) < window:
+        return out.T
+
+    # One column at a time over contiguous (windows x window) views
+    columns = np.ascontiguousarray(returns.T)
+    for j, windows in enumerate(sliding_window_view(columns, window, axis=1)):
+        center = mean[window - 1:, j, None]
+        band = z_threshold * std[window - 1:, j, None]
+        out[j, window - 1:] = np.count_nonzero(np.abs(windows - center) > band, axis=1)
+    out = out.T
+    out[np.isnan(std)] = np.nan
+    return out
+
+
+def factor_history(prices, window, z_threshold=2, periods_per_year=TRADING_DAYS):
+    """Trailing-``window`` risk factors of a (bars x tickers) price matrix.
+
+    Returns a (bars x tickers x factors) array in FACTOR_SIGNS order, NaN
+    until a ticker has a full window. Each factor is defined as in
+    compute_universe_metrics() over the window ending on each bar, except
+    the drawdown, which is the rolling max_drawdown of rolling_metrics.
+    Extreme_Days counts bars, whatever their interval.
+    """
+    returns = log_returns(prices)
+    moments = rolling_moments(returns, window)
+    return np.stack([
+        moments['std'] * np.sqrt(periods_per_year),
+        moments['kurtosis'],
+        rolling_extreme_days(returns, moments['mean'], moments['std'], window, z_threshold),
+        rolling_drawdown(prices, window)[1],
+        rolling_quantile(returns, window, 5),
+    ], axis=2)
@@ -0,0 +1,212 @@
+import numpy as np
+import pandas as pd
+
+from .metrics_engine import TRADING_DAYS, log_returns
+
+DEFAULT_WINDOWS = (20, 60, 252)
+
+ROLLING_COLUMNS = ['volatility', 'sharpe_ratio', 'skewness', 'kurtosis', 'var_95', 'drawdown', 'max_drawdown']
+
+
+def _window_sums(values, window):
+    """Sum of each trailing ``window`` rows per column via prefix sums (O(1) per step)."""
+    prefix = np.zeros((values.shape[0] + 1, values.shape[1]))
+    np.cumsum(values, axis=0, out=prefix[1:])
+    return prefix[window:] - prefix[:-window]
+
+
+def rolling_moments(returns, window, min_periods=None):
+    """Rolling mean, std, skewness and kurtosis of each column.
+
+    Power sums of the returns are kept as prefix sums, so every window costs
+    a constant number of array operations regardless of its length. Returns
+    are centred on their column mean first to keep the raw-moment formulas
+    numerically stable. NaNs are skipped; windows with fewer than
+    ``min_periods`` (default ``window``) observations are NaN.
+    """
+    min_periods = window if min_periods is None else min_periods
+    n_rows, n_cols = returns.shape
+    out = {key: np.full((n_rows, n_cols), np.nan) for key in ('mean', 'std', 'skewness', 'kurtosis')}
+    if n_rows < window:
+        return out
+
+    valid = ~np.isnan(returns)
+    with np.errstate(invalid='ignore'):
+        shift = np.nanmean(returns, axis=0)
+    x = np.where(valid, returns - np.nan_to_num(shift), 0.0)
+    x2 = x * x
+
+    n = _window_sums(valid.astype(np.float64), window)
+    s1 = _window_sums(x, window)
+    s2 = _window_sums(x2, window)
+    s3 = _window_sums(x2 * x, window)
+    s4 = _window_sums(x2 * x2, window)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mu = s1 / n
+        m2 = np.maximum(s2 / n - mu ** 2, 0.0)
+        m3 = s3 / n - 3 * mu * s2 / n + 2 * mu ** 3
+        m4 = s4 / n - 4 * mu * s3 / n + 6 * mu ** 2 * s2 / n - 3 * mu ** 4
+        enough = n >= max(min_periods, 1)
+        out['mean'][window - 1:] = np.where(enough, mu + shift, np.nan)
+        out['std'][window - 1:] = np.where(enough, np.sqrt(m2), np.nan)
+        out['skewness'][window - 1:] = np.where(enough, m3 / m2 ** 1.5, np.nan)
+        out['kurtosis'][window - 1:] = np.where(enough, m4 / m2 ** 2 - 3.0, np.nan)
+    return out
+
+
+def rolling_quantile(returns, window, q, min_periods=None):
+    """Rolling linear-interpolated percentile ``q`` of each column.
+
+    Runs on pandas' compiled rolling quantile (a skiplist updated as the
+    window moves). benchmarks/bench_rolling_quantile.py measures it about
+    4x faster than a Python sorted-list window, and faster than a
+    sliding-window np.partition, whose cost grows with the window, from
+    60-bar windows up. NaNs are skipped; only full-length windows with at
+    least ``min_periods`` (default ``window``) observations get a value.
+    """
+    min_periods = window if min_periods is None else min_periods
+    quantiles = pd.DataFrame(returns).rolling(window, min_periods=max(min_periods, 1)).quantile(
+        q / 100.0, interpolation='linear').to_numpy()
+    out = np.full(returns.shape, np.nan)
+    out[window - 1:] = quantiles[window - 1:]
+    return out
+
+
+def rolling_max(values, window):
+    """Rolling maximum over ``window`` rows, ignoring NaN (van Herk/Gil-Werman).
+
+    Uses block prefix and suffix maxima, so the cost per row is constant for
+    any window length and the work is vectorised across columns.
+    """
+    n_rows, n_cols = values.shape
+    out = np.full((n_rows, n_cols), np.nan)
+    if n_rows == 0:
+        return out
+
+    n_blocks = -(-n_rows // window)
+    padded = np.full((n_blocks * window, n_cols), -np.inf)
+    padded[:n_rows] = np.where(np.isnan(values), -np.inf, values)
+    blocks = padded.reshape(n_blocks, window, n_cols)
+    prefix = np.maximum.accumulate(blocks, axis=1).reshape(-1, n_cols)
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(-1, n_cols)
+
+    # Window [t - window + 1, t] = suffix of its first block + prefix of its last block
+    starts = np.arange(window - 1, n_rows) - window + 1
+    result = np.maximum(suffix[starts], prefix[starts + window - 1])
+    out[window - 1:] = np.where(np.isneginf(result), np.nan, result)
+
+    # Partial windows at the start use the running maximum so far
+    head = np.maximum.accumulate(padded[:window - 1], axis=0)
+    out[:window - 1] = np.where(np.isneginf(head), np.nan, head)
+    return out
+
+
+def _blocks(values, window, fill):
+    """``values`` padded with ``fill`` to whole blocks of ``window`` rows: (blocks x window x columns)."""
+    n_rows, n_cols = values.shape
+    n_blocks = -(-n_rows // window)
+    padded = np.full((n_blocks * window, n_cols), fill)
+    padded[:n_rows] = values
+    return padded.reshape(n_blocks, window, n_cols)
+
+
+def rolling_max_drawdown(prices, window):
+    """Worst drawdown inside each trailing ``window``-bar window, peak and trough both in it.
+
+    The same value as drawdown_stats() on every window, i.e. the running
+    peak restarts at the first bar of the window, without a scan per
+    window: the worst fall of a window is the smallest ``p_j / p_i`` with
+    ``i <= j``, so as in rolling_max() each window splits into the suffix
+    of one block and the prefix of the next, and its value is the worst of
+    the falls inside the suffix (a reversed scan per block), inside the
+    prefix (a forward scan) and from a suffix peak to a prefix trough.
+    NaN bars are skipped; windows with no price and the first
+    ``window - 1`` rows are NaN.
+    """
+    n_rows, n_cols = prices.shape
+    out = np.full((n_rows, n_cols), np.nan)
+    if n_rows < window:
+        return out
+
+    valid = ~np.isnan(prices)
+    lows = _blocks(np.where(valid, prices, np.inf), window, np.inf)
+    highs = _blocks(np.where(valid, prices, -np.inf), window, -np.inf)
+    ok = _blocks(valid, window, False)
+    reverse = (slice(None), slice(None, None, -1))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Suffix from each row to its block end: worst fall from a peak at or after the row
+        later_low = np.minimum.accumulate(lows[reverse], axis=1)[reverse]
+        suffix_fall = np.minimum.accumulate(np.where(ok, later_low / highs, np.inf)[reverse], axis=1)[reverse]
+        # Prefix from the block start to each row: worst fall to a trough at or before the row
+        peak = np.maximum.accumulate(highs, axis=1)
+        prefix_fall = np.minimum.accumulate(np.where(ok, lows / peak, np.inf), axis=1)
+        suffix_high = np.maximum.accumulate(highs[reverse], axis=1)[reverse].reshape(-1, n_cols)
+        prefix_low = np.minimum.accumulate(lows, axis=1).reshape(-1, n_cols)
+        suffix_fall = suffix_fall.reshape(-1, n_cols)
+        prefix_fall = prefix_fall.reshape(-1, n_cols)
+
+        ends = np.arange(window - 1, n_rows)
+        starts = ends - window + 1
+        # A window starting on a block boundary is that block: its suffix already covers it
+        split = (starts % window != 0)[:, None]
+        across = np.where(split & np.isfinite(prefix_low[ends]) & np.isfinite(suffix_high[starts]),
+                          prefix_low[ends] / suffix_high[starts], np.inf)
+        worst = np.minimum(np.minimum(suffix_fall[starts], prefix_fall[ends]), across)
+    out[window - 1:] = np.where(np.isinf(worst), np.nan, worst - 1.0)
+    return out
+
+
+def rolling_drawdown(prices, window):
+    """Drawdown from the trailing ``window``-bar high, and its rolling worst value.
+
+    ``max_drawdown`` is the maximum drawdown of each ``window``-bar window
+    on its own (see rolling_max_drawdown()), so a peak that has left the
+    window no longer counts.
+    """
+    with np.errstate(invalid='ignore'):
+        drawdown = prices / rolling_max(prices, window) - 1.0
+    return drawdown, rolling_max_drawdown(prices, window)
+
+
+def rolling_metrics(dates, symbols, prices, windows=DEFAULT_WINDOWS, min_periods=None,
+                    periods_per_year=TRADING_DAYS):
+    """Rolling risk metrics for a (bars x symbols) price matrix as a tidy panel.
+
+    Windows are counted in bars. Returns a long DataFrame with one row per
+    (Window, Date, Symbol) and ``volatility`` and ``sharpe_ratio``
+    annualised with ``periods_per_year`` bars per year, ``skewness``,
+    ``kurtosis``, historical ``var_95``, ``drawdown`` and ``max_drawdown``.
+    Rows where a symbol has no value for any metric are dropped.
+    """
+    returns = log_returns(prices)
+    n_rows, n_cols = prices.shape
+    frames = []
+
+    for window in windows:
+        moments = rolling_moments(returns, window, min_periods)
+        drawdown, max_drawdown = rolling_drawdown(prices, window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volatility = moments['std'] * np.sqrt(periods_per_year)
+            sharpe = np.where(moments['std'] > 0, moments['mean'] * periods_per_year / volatility, np.nan)
+        columns = {
+            'volatility': volatility,
+            'sharpe_ratio': sharpe,
+            'skewness': moments['skewness'],
+            'kurtosis': moments['kurtosis'],
+            'var_95': rolling_quantile(returns, window, 5, min_periods),
+            'drawdown': drawdown,
+            'max_drawdown': max_drawdown,
+        }
+        frame = pd.DataFrame({
+            'Window': np.full(n_rows * n_cols, window),
+            'Date': np.repeat(np.asarray(dates), n_cols),
+            'Symbol': np.tile(np.asarray(symbols, dtype=object), n_rows),
+            **{name: values.ravel() for name, values in columns.items()},
+        })
+        frames.append(frame.dropna(subset=ROLLING_COLUMNS, how='all'))
+
+    if not frames:
+        return pd.DataFrame(columns=['Window', 'Date', 'Symbol'] + ROLLING_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
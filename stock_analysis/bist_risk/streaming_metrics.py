@@ -0,0 +1,273 @@
+import json
+import math
+import os
+from bisect import bisect_left, bisect_right
+from heapq import heappush, heapreplace
+
+import numpy as np
+import pandas as pd
+
+from .metrics_engine import MIN_OBSERVATIONS, TRADING_DAYS, compute_universe_metrics
+
+STATE_VERSION = 2
+
+# Returns kept at each end of a symbol's distribution: the TAIL_CAPACITY
+# smallest and the TAIL_CAPACITY largest seen so far, which makes the state
+# a fixed size. VaR 95 needs the lowest 5% of returns, so quantiles are
+# exact for up to about 20 * TAIL_CAPACITY bars (ten years of daily bars);
+# past that they are NaN, as are |Z| > 2 counts larger than the capacity.
+TAIL_CAPACITY = 128
+
+# Metrics read from the stored tails, NaN when the tails cannot hold them
+TAIL_METRICS = ('var_95', 'var_99', 'extreme_positive', 'extreme_negative')
+
+
+class TickerState:
+    """Online risk metrics for one symbol, updated with constant work per bar.
+
+    Mean, variance, skewness and kurtosis use Welford/Pébay running central
+    moments, max drawdown a running peak. The ``capacity`` smallest and
+    largest returns are kept in two bounded heaps (O(log capacity) per bar,
+    and most bars are rejected by one comparison). Quantiles and |Z| > 2
+    counts read from them are exact whenever the tails hold the returns
+    they need and NaN otherwise, never an estimate.
+    """
+
+    __slots__ = ('last_price', 'last_date', 'n', 'mean', 'm2', 'm3', 'm4',
+                 'peak', 'max_drawdown', 'capacity', 'lower_tail', 'upper_tail')
+
+    def __init__(self, capacity=TAIL_CAPACITY):
+        self.last_price = math.nan
+        self.last_date = None
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.peak = -math.inf
+        self.max_drawdown = 0.0
+        self.capacity = capacity
+        # Max-heap of the smallest returns, stored negated for heapq
+        self.lower_tail = []
+        # Min-heap of the largest returns
+        self.upper_tail = []
+
+    def update(self, price, date=None):
+        """Add one bar; returns its log return (None for the first price).
+
+        Bars dated on or before the last processed date are ignored, so
+        replaying history after a restart is harmless.
+        """
+        if date is not None:
+            date = pd.Timestamp(date).isoformat()
+            if self.last_date is not None and date <= self.last_date:
+                return None
+            self.last_date = date
+        if not price == price or price <= 0:  # NaN or invalid
+            return None
+
+        previous, self.last_price = self.last_price, price
+        if not previous == previous:
+            return None
+
+        x = math.log(price / previous)
+        n1 = self.n
+        self.n = n = n1 + 1
+        delta = x - self.mean
+        delta_n = delta / n
+        delta_n2 = delta_n * delta_n
+        term1 = delta * delta_n * n1
+        self.mean += delta_n
+        self.m4 += term1 * delta_n2 * (n * n - 3 * n + 3) + 6 * delta_n2 * self.m2 - 4 * delta_n * self.m3
+        self.m3 += term1 * delta_n * (n - 2) - 3 * delta_n * self.m2
+        self.m2 += term1
+
+        lower, upper = self.lower_tail, self.upper_tail
+        if len(lower) < self.capacity:
+            heappush(lower, -x)
+        elif x < -lower[0]:
+            heapreplace(lower, -x)
+        if len(upper) < self.capacity:
+            heappush(upper, x)
+        elif x > upper[0]:
+            heapreplace(upper, x)
+
+        # Drawdown is measured from the first price that has a return
+        self.peak = max(self.peak, price)
+        self.max_drawdown = min(self.max_drawdown, price / self.peak - 1.0)
+        return x
+
+    def _quantile(self, tail, q):
+        """Lower-tail quantile matching np.percentile from the sorted ``tail``; NaN if it needs unstored returns."""
+        pos = (q / 100.0) * (self.n - 1)
+        lo = int(pos)
+        hi = min(lo + 1, self.n - 1)
+        if self.n == 0 or hi >= len(tail):
+            return math.nan
+        return tail[lo] + (tail[hi] - tail[lo]) * (pos - lo)
+
+    def metrics(self, periods_per_year=TRADING_DAYS):
+        """Current metrics with the same keys as compute_universe_metrics()."""
+        n = self.n
+        std = math.sqrt(self.m2 / n) if n else math.nan
+        skewness = math.sqrt(n) * self.m3 / self.m2 ** 1.5 if self.m2 > 0 else math.nan
+        kurtosis = n * self.m4 / self.m2 ** 2 - 3.0 if self.m2 > 0 else math.nan
+        annual_return = self.mean * periods_per_year
+        annual_volatility = std * math.sqrt(periods_per_year)
+        high, low = self.mean + 2 * std, self.mean - 2 * std
+        lower = sorted(-value for value in self.lower_tail)
+        upper = sorted(self.upper_tail)
+        # A count is exact if every return beyond the threshold is stored: all returns are, or a stored one is not
+        complete = len(lower) == n
+        extreme_negative = bisect_left(lower, low)
+        if not (complete or extreme_negative < len(lower)):
+            extreme_negative = math.nan
+        extreme_positive = len(upper) - bisect_right(upper, high)
+        if not (complete or extreme_positive < len(upper)):
+            extreme_positive = math.nan
+        return {
+            'mean_return': self.mean,
+            'std_return': std,
+            'annual_return': annual_return,
+            'annual_volatility': annual_volatility,
+            'sharpe_ratio': annual_return / annual_volatility if std > 0 else 0,
+            'skewness': skewness,
+            'kurtosis': kurtosis,
+            'var_95': self._quantile(lower, 5),
+            'var_99': self._quantile(lower, 1),
+            'max_drawdown': self.max_drawdown if n else math.nan,
+            'extreme_positive': extreme_positive,
+            'extreme_negative': extreme_negative,
+            'total_observations': n,
+        }
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, values):
+        state = cls()
+        for name in cls.__slots__:
+            setattr(state, name, values[name])
+        return state
+
+
+def _history_tail_metrics(data, state, periods_per_year):
+    """TAIL_METRICS of ``state`` recomputed from its price history, or None if ``data`` has other returns."""
+    price_col = 'Adj Close' if 'Adj Close' in data.columns else 'Close'
+    prices = data[price_col]
+    if state.last_date is not None:
+        prices = prices[prices.index <= pd.Timestamp(state.last_date)]
+    prices = prices.to_numpy(dtype=np.float64)
+    prices = prices[(prices > 0)]
+    metrics = compute_universe_metrics(prices[:, None], periods_per_year=periods_per_year)
+    if int(metrics['total_observations'][0]) != state.n:
+        return None
+    return {key: metrics[key][0].item() for key in TAIL_METRICS}
+
+
+class StreamingRiskEngine:
+    """Per-symbol TickerState objects behind create_risk_ranking()'s inputs.
+
+    ``periods_per_year`` is the number of bars a year of the fed prices
+    has; it annualises the metrics and is saved with the state, so bars of
+    another interval cannot be mixed into it.
+    """
+
+    def __init__(self, states=None, periods_per_year=TRADING_DAYS):
+        self.states = states or {}
+        self.periods_per_year = periods_per_year
+        self.recomputed = []
+
+    def update(self, symbol, price, date=None):
+        """Feed one bar for one symbol."""
+        state = self.states.get(symbol)
+        if state is None:
+            state = self.states[symbol] = TickerState()
+        return state.update(price, date)
+
+    def update_bar(self, prices, date):
+        """Feed one cross-section ``{symbol: price}`` for ``date``."""
+        for symbol, price in prices.items():
+            self.update(symbol, float(price), date)
+
+    def update_from_data(self, data_dict):
+        """Feed every bar newer than each symbol's last processed date.
+
+        Returns the number of bars applied, so a resumed engine only pays
+        for the days it has not seen yet.
+        """
+        applied = 0
+        for symbol, data in data_dict.items():
+            if data is None or data.empty:
+                continue
+            price_col = 'Adj Close' if 'Adj Close' in data.columns else 'Close'
+            prices = data[price_col]
+            state = self.states.get(symbol)
+            if state is not None and state.last_date is not None:
+                prices = prices[prices.index > pd.Timestamp(state.last_date)]
+            for date, price in zip(prices.index, prices.to_numpy(dtype=np.float64)):
+                self.update(symbol, float(price), date)
+                applied += 1
+        return applied
+
+    def results(self, universe, data_dict=None):
+        """``{symbol: metrics}`` in the layout create_risk_ranking() reads.
+
+        Tail metrics the state cannot hold (see TAIL_CAPACITY) are NaN,
+        unless ``data_dict`` has the symbol's price history with exactly
+        the returns the state has seen; they are then recomputed from it
+        and the symbol is listed in ``self.recomputed``.
+        """
+        results = {}
+        self.recomputed = []
+        for symbol, state in self.states.items():
+            if symbol in universe and state.n > MIN_OBSERVATIONS:
+                metrics = state.metrics(self.periods_per_year)
+                if data_dict and symbol in data_dict and any(metrics[key] != metrics[key] for key in TAIL_METRICS):
+                    history = _history_tail_metrics(data_dict[symbol], state, self.periods_per_year)
+                    if history is not None:
+                        metrics.update(history)
+                        self.recomputed.append(symbol)
+                results[symbol] = {
+                    'name': universe[symbol]['name'],
+                    'sector': universe[symbol]['sector'],
+                    **metrics,
+                }
+        return results
+
+    def save(self, path):
+        """Write all states to a JSON file (atomically replaced)."""
+        payload = {
+            'version': STATE_VERSION,
+            'periods_per_year': self.periods_per_year,
+            'states': {symbol: state.to_dict() for symbol, state in self.states.items()},
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, periods_per_year=TRADING_DAYS):
+        """Restore an engine saved with save(); an absent file gives an empty engine.
+
+        The saved state must have been built from bars of the same
+        ``periods_per_year`` (states saved without one are daily).
+        """
+        if not os.path.exists(path):
+            return cls(periods_per_year=periods_per_year)
+        with open(path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+        if payload.get('version') == 1:
+            # Version 1 kept margin-filtered tails that cannot be turned into bounded ones
+            print(f"Not: {path} eski sürümde, akış durumu fiyat geçmişinden yeniden oluşturuluyor")
+            return cls(periods_per_year=periods_per_year)
+        if payload.get('version') != STATE_VERSION:
+            raise ValueError(f"Desteklenmeyen durum dosyası sürümü: {payload.get('version')}")
+        saved = payload.get('periods_per_year', TRADING_DAYS)
+        if saved != periods_per_year:
+            raise ValueError(f"{path} başka bir bar aralığıyla oluşturulmuş (yılda {saved} bar, "
+                             f"şu an {periods_per_year})")
+        return cls({symbol: TickerState.from_dict(values) for symbol, values in payload['states'].items()},
+                   periods_per_year)
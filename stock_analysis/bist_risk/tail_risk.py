@@ -0,0 +1,118 @@
+"""Value at Risk and Expected Shortfall of daily log returns, per column.
+
+VaR and ES are returns at the left tail (negative = loss), like the
+historical ``var_95`` of metrics_engine: VaR at level 99 is the 1st
+percentile of returns and ES the mean return at or below it. Every
+function takes confidence ``levels`` in percent and returns ``(var, es)``
+arrays shaped (levels x columns).
+"""
+import numpy as np
+from scipy.special import ndtri
+
+from .metrics_engine import nan_percentile
+
+# Points of the quantile grid averaged for the Cornish-Fisher ES
+CF_GRID_POINTS = 2000
+
+
+def tail_probabilities(levels):
+    """Left-tail probability of each confidence level in percent (99 -> 0.01)."""
+    return 1.0 - np.asarray(levels, dtype=np.float64) / 100.0
+
+
+def historical_var_es(returns, levels):
+    """Empirical VaR (linear-interpolated percentile) and ES of each column, ignoring NaN."""
+    var = np.array([nan_percentile(returns, 100.0 - level) for level in levels]).reshape(len(levels), -1)
+    es = np.empty_like(var)
+    for i, threshold in enumerate(var):
+        with np.errstate(invalid='ignore'):
+            tail = returns <= threshold  # NaN compares False
+            es[i] = np.where(tail, returns, 0.0).sum(axis=0) / tail.sum(axis=0)
+    return var, es
+
+
+def normal_var_es(mean, std, levels):
+    """VaR and ES of normally distributed returns with the given moments."""
+    alpha = tail_probabilities(levels)[:, None]
+    z = ndtri(alpha)
+    var = mean + std * z
+    es = mean - std * np.exp(-0.5 * z * z) / np.sqrt(2 * np.pi) / alpha
+    return var, es
+
+
+def cornish_fisher_z(z, skewness, kurtosis):
+    """Normal quantile ``z`` adjusted for skewness and excess kurtosis (Cornish-Fisher expansion)."""
+    return (z + (z ** 2 - 1) * skewness / 6 + (z ** 3 - 3 * z) * kurtosis / 24
+            - (2 * z ** 3 - 5 * z) * skewness ** 2 / 36)
+
+
+def cornish_fisher_var_es(mean, std, skewness, kurtosis, levels, grid_points=CF_GRID_POINTS):
+    """VaR and ES from the Cornish-Fisher quantile of each column.
+
+    ``kurtosis`` is excess kurtosis, as computed by metrics_engine. ES is
+    the average of the adjusted quantile function over the tail,
+    integrated with the midpoint rule on ``grid_points`` probabilities.
+    """
+    alpha = tail_probabilities(levels)
+    var = mean + std * cornish_fisher_z(ndtri(alpha)[:, None], skewness, kurtosis)
+    es = np.empty_like(var)
+    grid = (np.arange(grid_points) + 0.5) / grid_points
+    for i, a in enumerate(alpha):
+        z = ndtri(a * grid)[:, None]
+        es[i] = mean + std * cornish_fisher_z(z, skewness, kurtosis).mean(axis=0)
+    return var, es
+
+
+def covariance_factor(cov):
+    """Matrix ``F`` with ``F @ F.T == cov``, via the eigendecomposition.
+
+    Unlike Cholesky this accepts singular and slightly indefinite estimates
+    (pairwise-complete covariances often are): negative eigenvalues are
+    clipped to zero and undefined entries treated as uncorrelated.
+    """
+    cov = np.nan_to_num(np.asarray(cov, dtype=np.float64))
+    values, vectors = np.linalg.eigh((cov + cov.T) / 2)
+    return vectors * np.sqrt(np.clip(values, 0.0, None))
+
+
+def monte_carlo_var_es(mean, cov, levels, paths, chunk_size, seed=None, weights=None):
+    """VaR and ES of correlated normal returns, simulated in memory-bounded batches.
+
+    ``paths`` joint return vectors are drawn ``chunk_size`` at a time as
+    ``mean + z @ F.T`` (see covariance_factor). Only the lowest simulated
+    returns of each column needed by the deepest level are kept between
+    batches, so memory is O(chunk_size x columns) for any number of paths.
+    The normal stream of ``np.random.default_rng(seed)`` is consumed in
+    the same order whatever ``chunk_size`` is, so a seed gives the same
+    result for every batch size.
+
+    With ``weights``, an extra last column is the portfolio log return
+    ``log(1 + sum(w * (exp(r) - 1)))``.
+    """
+    mean = np.asarray(mean, dtype=np.float64)
+    factor = covariance_factor(cov)
+    alpha = tail_probabilities(levels)
+    position = alpha * (paths - 1)
+    keep = min(paths, int(np.floor(position.max())) + 2)
+
+    rng = np.random.default_rng(seed)
+    lowest = None
+    for start in range(0, paths, chunk_size):
+        draws = mean + rng.standard_normal((min(chunk_size, paths - start), len(mean))) @ factor.T
+        if weights is not None:
+            portfolio = np.log1p(np.expm1(draws) @ np.asarray(weights, dtype=np.float64))
+            draws = np.column_stack([draws, portfolio])
+        lowest = draws if lowest is None else np.concatenate([lowest, draws])
+        if len(lowest) > keep:
+            lowest = np.partition(lowest, keep - 1, axis=0)[:keep]
+    lowest.sort(axis=0)
+
+    # Same linear-interpolated percentile as the historical VaR
+    lo = np.floor(position).astype(np.intp)
+    hi = np.minimum(lo + 1, paths - 1)
+    var = lowest[lo] + (lowest[hi] - lowest[lo]) * (position - lo)[:, None]
+    es = np.empty_like(var)
+    for i, threshold in enumerate(var):
+        tail = lowest <= threshold
+        es[i] = np.where(tail, lowest, 0.0).sum(axis=0) / tail.sum(axis=0)
+    return var, es
@@ -0,0 +1,177 @@
+"""Master trading calendar of a universe and per-ticker integer offset maps into it.
+
+The calendar is the sorted set of bars (sessions, for daily data) on which
+any ticker of the universe traded. Borsa Istanbul holidays, including the
+lunar ones whose dates move every year, are therefore absent without a
+holiday table. Each ticker's dates are turned once into an OffsetMap, the
+rows of its bars in the calendar, and aligning a panel is then an array
+gather (``matrix[offsets.rows, j] = values``) instead of pandas index
+unions and reindexing.
+
+Policies:
+
+* Listing window: a ticker is listed from its first bar to its last one.
+  Calendar rows before its listing or after its delisting (a last bar
+  before the end of the calendar) are NaN under every policy; they are not
+  missing bars and are never filled.
+* Missing bars are calendar rows inside the listing window without a bar
+  (trading halts, gaps in the data). 'gap' leaves them NaN, so the next
+  return spans the gap from the last traded price; 'ffill' carries the last
+  price forward, a zero return on every missing bar.
+"""
+import numpy as np
+import pandas as pd
+
+MISSING_BAR_POLICIES = ('gap', 'ffill')
+
+
+def _nanoseconds(index):
+    """Timestamps of a DatetimeIndex as int64 nanoseconds (UTC for tz-aware ones), whatever its unit."""
+    # Cheaper than DatetimeIndex.as_unit(), which builds a new index
+    return pd.DatetimeIndex(index).values.astype('datetime64[ns]', copy=False).view(np.int64)
+
+
+def _unique_rows(ns):
+    """Sorted unique values of ``ns`` (int64) and the row of each value among them.
+
+    Bar timestamps sit on a grid (days, or minutes of the session), so the
+    union is usually a mark-and-count over the grid slots rather than a
+    sort; sparse grids fall back to np.unique.
+    """
+    if len(ns) == 0:
+        return ns, np.empty(0, dtype=np.intp)
+    low = ns.min()
+    offsets = ns - low
+    step = int(np.gcd.reduce(offsets)) or 1
+    slots = offsets // step
+    span = int(slots.max()) + 1
+    if span > 4 * len(ns) + 1024:
+        unique, rows = np.unique(ns, return_inverse=True)
+        return unique, rows.reshape(-1)
+    present = np.zeros(span, dtype=bool)
+    present[slots] = True
+    positions = np.cumsum(present) - 1
+    return low + np.flatnonzero(present) * step, positions[slots]
+
+
+def check_missing_bars(policy):
+    """Raise ValueError for an unknown missing-bar policy."""
+    if policy not in MISSING_BAR_POLICIES:
+        raise ValueError(f"Bilinmeyen eksik bar politikası: {policy} "
+                         f"(seçenekler: {', '.join(MISSING_BAR_POLICIES)})")
+
+
+class OffsetMap:
+    """Rows of one ticker's bars in a TradingCalendar, in the order of its dates."""
+
+    __slots__ = ('rows',)
+
+    def __init__(self, rows):
+        self.rows = np.asarray(rows, dtype=np.intp)
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def listing(self):
+        """Calendar rows of the listing window, first bar to last bar, as a slice."""
+        if len(self.rows) == 0:
+            return slice(0, 0)
+        return slice(int(self.rows.min()), int(self.rows.max()) + 1)
+
+    @property
+    def missing(self):
+        """Calendar rows inside the listing window without a bar."""
+        listing = self.listing
+        return listing.stop - listing.start - len(np.unique(self.rows))
+
+
+class TradingCalendar:
+    """Sorted, unique bar timestamps shared by the tickers of a panel."""
+
+    __slots__ = ('dates', '_ns')
+
+    def __init__(self, dates):
+        dates = pd.DatetimeIndex(dates).as_unit('ns')
+        if not (dates.is_monotonic_increasing and dates.is_unique):
+            dates = dates.unique().sort_values()
+        self.dates = dates
+        # Nanosecond integers (UTC for tz-aware dates) that offsets are searched in
+        self._ns = _nanoseconds(dates)
+
+    @classmethod
+    def _union(cls, indexes):
+        """Calendar of ``indexes`` and the calendar row of each of their timestamps, ticker after ticker."""
+        indexes = [pd.DatetimeIndex(index) for index in indexes]
+        if not indexes:
+            return cls(pd.DatetimeIndex([])), [], np.empty(0, dtype=np.intp)
+        ns = [_nanoseconds(index) for index in indexes]
+        flat = np.concatenate(ns)
+        sessions, rows = _unique_rows(flat)
+        first = indexes[0]
+        dates = pd.DatetimeIndex(sessions.view('datetime64[ns]'), name=first.name)
+        if first.tz is not None:
+            dates = dates.tz_localize('UTC').tz_convert(first.tz)
+        return cls(dates), [len(values) for values in ns], rows
+
+    @classmethod
+    def from_indexes(cls, indexes):
+        """Calendar of every timestamp in ``indexes`` (one DatetimeIndex per ticker)."""
+        return cls._union(indexes)[0]
+
+    @classmethod
+    def with_offsets(cls, indexes):
+        """``(calendar, offsets)``: the calendar of ``indexes`` and the OffsetMap of each, in one pass."""
+        calendar, lengths, rows = cls._union(indexes)
+        return calendar, [OffsetMap(ticker_rows) for ticker_rows in np.split(rows, np.cumsum(lengths)[:-1])] \
+            if lengths else []
+
+    @classmethod
+    def from_frames(cls, data_dict):
+        """Calendar of the bars of a ``{symbol: DataFrame}`` mapping (empty frames are skipped)."""
+        return cls.from_indexes(data.index for data in data_dict.values() if data is not None and not data.empty)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def offsets(self, index):
+        """OffsetMap of ``index`` (dates of one ticker); ValueError for a date not in the calendar."""
+        ns = _nanoseconds(index)
+        rows = np.searchsorted(self._ns, ns)
+        if len(rows) and (rows[-1] >= len(self._ns) or (self._ns[np.minimum(rows, len(self._ns) - 1)] != ns).any()):
+            raise ValueError("İşlem takviminde olmayan bar tarihi")
+        return OffsetMap(rows)
+
+    def gather(self, columns, offsets, missing='gap'):
+        """(calendar x tickers) float64 matrix of ``columns`` placed at their ``offsets``.
+
+        ``columns`` holds one 1-D array of values per ticker, in the order
+        of its dates; ``missing`` is the missing-bar policy (see the
+        module docstring). Rows outside a ticker's listing window are NaN.
+        """
+        check_missing_bars(missing)
+        matrix = np.full((len(self), len(offsets)), np.nan)
+        for j, (values, offset) in enumerate(zip(columns, offsets)):
+            matrix[offset.rows, j] = values
+        if missing == 'ffill' and matrix.size:
+            rows = np.arange(len(self))[:, None]
+            index = np.where(np.isnan(matrix), 0, rows)
+            np.maximum.accumulate(index, axis=0, out=index)
+            filled = matrix[index, np.arange(matrix.shape[1])]
+            # Only inside the listing window: a delisted ticker is not carried to the end of the calendar
+            last = np.array([offset.listing.stop for offset in offsets])
+            filled[rows >= last] = np.nan
+            matrix = filled
+        return matrix
+
+    def coverage(self, symbols, offsets):
+        """Listing window, bars and missing bars of each ticker as a DataFrame indexed by symbol."""
+        listings = [offset.listing for offset in offsets]
+        listed = [bool(len(offset)) for offset in offsets]
+        return pd.DataFrame({
+            'Listed_From': [self.dates[window.start] if ok else pd.NaT for window, ok in zip(listings, listed)],
+            'Listed_To': [self.dates[window.stop - 1] if ok else pd.NaT for window, ok in zip(listings, listed)],
+            'Bars': [len(offset) for offset in offsets],
+            'Missing_Bars': [offset.missing for offset in offsets],
+            'Delisted': [ok and window.stop < len(self) for window, ok in zip(listings, listed)],
+        }, index=pd.Index(list(symbols), name='Symbol'))
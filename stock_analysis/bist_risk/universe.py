@@ -0,0 +1,267 @@
+"""Stock universes: named sets of symbols with display names and sectors.
+
+Besides the built-in BIST30 list, universes can be loaded from CSV, JSON
+or YAML files, either registered explicitly or passed to ``--universe`` as
+``PATH`` or ``PATH#NAME``. Files placed in ``universes/`` are picked up by
+name (``universes/bist100.csv`` is ``--universe bist100``).
+
+CSV files have ``symbol``, ``name`` and ``sector`` columns and an optional
+``universe`` column to hold several universes in one file. JSON and YAML
+files hold either one universe::
+
+    {"label": "İzleme Listesi", "symbols": [{"symbol": "AKBNK.IS", "name": "Akbank",
+                                             "sector": "Mali/Bankacılık"}]}
+
+or several under ``{"universes": {NAME: {...}}}``. ``symbols`` may also be a
+``{symbol: {"name", "sector"}}`` mapping. Sectors are hierarchical: a path
+such as ``Mali/Bankacılık`` (or a list), or a leaf sector whose parents are
+declared once in ``sector_parents``. The pipeline uses the leaf sector.
+"""
+import os
+from collections.abc import Mapping
+
+# Directory searched for universe files named after the requested universe
+UNIVERSES_DIR = 'universes'
+UNIVERSE_EXTENSIONS = ('.csv', '.json', '.yaml', '.yml')
+
+# Separates the levels of a sector path, e.g. 'Mali/Bankacılık'
+SECTOR_SEPARATOR = '/'
+
+# BIST30 hisse senetleri ve sektör bilgileri
+BIST30_STOCKS = {
+    'AKBNK.IS': {'name': 'Akbank', 'sector': 'Bankacılık'},
+    'ARCLK.IS': {'name': 'Arçelik', 'sector': 'Dayanıklı Tüketim'},
+    'ASELS.IS': {'name': 'Aselsan', 'sector': 'Savunma'},
+    'BIMAS.IS': {'name': 'BİM', 'sector': 'Perakende'},
+    'EKGYO.IS': {'name': 'Emlak Konut GYO', 'sector': 'Gayrimenkul'},
+    'EREGL.IS': {'name': 'Ereğli Demir Çelik', 'sector': 'Metal Ana'},
+    'FROTO.IS': {'name': 'Ford Otosan', 'sector': 'Otomotiv'},
+    'GARAN.IS': {'name': 'Garanti BBVA', 'sector': 'Bankacılık'},
+    'HALKB.IS': {'name': 'Halkbank', 'sector': 'Bankacılık'},
+    'ISCTR.IS': {'name': 'İş Bankası (C)', 'sector': 'Bankacılık'},
+    'KCHOL.IS': {'name': 'Koç Holding', 'sector': 'Holding'},
+    'KOZAL.IS': {'name': 'Koza Altın', 'sector': 'Madencilik'},
+    'KOZAA.IS': {'name': 'Koza Anadolu', 'sector': 'Madencilik'},
+    'PETKM.IS': {'name': 'Petkim', 'sector': 'Petrokimya'},
+    'PGSUS.IS': {'name': 'Pegasus', 'sector': 'Havacılık'},
+    'SAHOL.IS': {'name': 'Sabancı Holding', 'sector': 'Holding'},
+    'SISE.IS': {'name': 'Şişe Cam', 'sector': 'Cam'},
+    'TCELL.IS': {'name': 'Turkcell', 'sector': 'Telekomünikasyon'},
+    'THYAO.IS': {'name': 'Türk Hava Yolları', 'sector': 'Havacılık'},
+    'TOASO.IS': {'name': 'Tofaş', 'sector': 'Otomotiv'},
+    'TUPRS.IS': {'name': 'Tüpraş', 'sector': 'Petrol'},
+    'VAKBN.IS': {'name': 'VakıfBank', 'sector': 'Bankacılık'},
+    'YKBNK.IS': {'name': 'Yapı Kredi', 'sector': 'Bankacılık'},
+    'SMRTG.IS': {'name': 'Smart Güneş', 'sector': 'Enerji'},
+    'TAVHL.IS': {'name': 'TAV Havalimanları', 'sector': 'Ulaştırma'}
+}
+
+# Main sector group of each BIST30 sector
+BIST30_SECTOR_PARENTS = {
+    'Bankacılık': 'Mali', 'Holding': 'Mali', 'Gayrimenkul': 'Mali',
+    'Dayanıklı Tüketim': 'Sınai', 'Metal Ana': 'Sınai', 'Otomotiv': 'Sınai', 'Cam': 'Sınai',
+    'Petrokimya': 'Sınai', 'Petrol': 'Sınai', 'Madencilik': 'Sınai', 'Enerji': 'Sınai',
+    'Perakende': 'Hizmetler', 'Havacılık': 'Hizmetler', 'Ulaştırma': 'Hizmetler',
+    'Telekomünikasyon': 'Hizmetler',
+    'Savunma': 'Teknoloji',
+}
+
+DEFAULT_UNIVERSE = 'bist30'
+
+
+class Universe(Mapping):
+    """A named, read-only ``{symbol: {'name', 'sector'}}`` mapping.
+
+    Symbols, names and sector paths are kept in parallel lists with a
+    symbol -> position index, so lookups stay O(1) and whole columns can be
+    taken at once for thousands of symbols. ``sector`` is the leaf of each
+    sector path; ``sector_of(symbol, level)`` walks the hierarchy.
+    """
+
+    def __init__(self, name, stocks, label=None, sector_parents=None):
+        self.name = name
+        self.label = label or name.upper()
+        self.symbols, self.names, self.sector_paths = [], [], []
+        self.index = {}
+        for symbol, info in stocks.items():
+            if symbol in self.index:
+                raise ValueError(f"{name} evreninde tekrarlanan sembol: {symbol}")
+            self.index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            self.names.append(info.get('name') or symbol)
+            self.sector_paths.append(_sector_path(info.get('sector'), sector_parents or {}))
+        self.sectors = [path[-1] for path in self.sector_paths]
+
+    def __getitem__(self, symbol):
+        i = self.index[symbol]
+        return {'name': self.names[i], 'sector': self.sectors[i], 'sector_path': self.sector_paths[i]}
+
+    def __iter__(self):
+        return iter(self.symbols)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        return symbol in self.index
+
+    def __repr__(self):
+        return f"Universe({self.name!r}, {len(self)} hisse)"
+
+    def sector_of(self, symbol, level=None):
+        """Sector of ``symbol`` at hierarchy ``level`` (0 = top; None or too deep = leaf)."""
+        path = self.sector_paths[self.index[symbol]]
+        return path[-1] if level is None or level >= len(path) else path[level]
+
+    def by_sector(self, level=None):
+        """``{sector: [symbols]}`` at hierarchy ``level``, in universe order."""
+        groups = {}
+        for symbol in self.symbols:
+            groups.setdefault(self.sector_of(symbol, level), []).append(symbol)
+        return groups
+
+    def missing(self, all_data):
+        """Symbols without usable price data in ``all_data``."""
+        return [symbol for symbol in self.symbols
+                if all_data.get(symbol) is None or all_data[symbol].empty]
+
+
+def _sector_path(sector, parents):
+    """Sector path tuple from a 'A/B' string or a list, extended with declared parents."""
+    if isinstance(sector, (list, tuple)):
+        path = [str(part).strip() for part in sector]
+    else:
+        path = [part.strip() for part in str(sector or '').split(SECTOR_SEPARATOR)]
+    path = [part for part in path if part] or ['Diğer']
+    seen = set(path)
+    while path[0] in parents and parents[path[0]] not in seen:
+        path.insert(0, parents[path[0]])
+        seen.add(path[0])
+    return tuple(path)
+
+
+def _stocks_from_records(records, source):
+    """``{symbol: info}`` from a list of records or an existing mapping."""
+    if isinstance(records, Mapping):
+        return {symbol: dict(info or {}) for symbol, info in records.items()}
+    stocks = {}
+    for record in records:
+        symbol = str(record.get('symbol') or '').strip()
+        if not symbol:
+            raise ValueError(f"{source}: 'symbol' alanı olmayan kayıt: {record}")
+        if symbol in stocks:
+            raise ValueError(f"{source}: tekrarlanan sembol: {symbol}")
+        stocks[symbol] = {'name': record.get('name'), 'sector': record.get('sector')}
+    return stocks
+
+
+def _read_csv(path, default_name):
+    import csv
+
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        if 'symbol' not in (reader.fieldnames or []):
+            raise ValueError(f"{path}: 'symbol' sütunu bulunamadı (sütunlar: symbol, name, sector)")
+        groups = {}
+        for row in reader:
+            groups.setdefault((row.get('universe') or '').strip() or default_name, []).append(row)
+    return {name: {'symbols': rows} for name, rows in groups.items()}
+
+
+def _read_document(path):
+    if path.endswith('.json'):
+        import json
+
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError("YAML evren dosyaları için PyYAML gerekli: pip install 'bist-risk[yaml]'") from None
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+
+def load_universes(path):
+    """Load every universe defined in a CSV, JSON or YAML file.
+
+    Returns ``{name: Universe}``; a file without names defines one universe
+    named after the file.
+    """
+    default_name = os.path.splitext(os.path.basename(path))[0]
+    if path.endswith('.csv'):
+        definitions = _read_csv(path, default_name)
+    elif path.endswith(UNIVERSE_EXTENSIONS):
+        document = _read_document(path)
+        if isinstance(document, list):
+            document = {'symbols': document}
+        if not isinstance(document, Mapping):
+            raise ValueError(f"{path}: evren tanımı bir liste ya da sözlük olmalı")
+        definitions = document.get('universes') or {document.get('name') or default_name: document}
+    else:
+        raise ValueError(f"Desteklenmeyen evren dosyası: {path} (desteklenenler: {', '.join(UNIVERSE_EXTENSIONS)})")
+
+    return {
+        name: Universe(name, _stocks_from_records(definition.get('symbols') or [], path),
+                       label=definition.get('label'), sector_parents=definition.get('sector_parents'))
+        for name, definition in definitions.items()
+    }
+
+
+class UniverseRegistry:
+    """Universes selectable by name, from built-ins, registered files or ``directory``."""
+
+    def __init__(self, directory=UNIVERSES_DIR):
+        self.directory = directory
+        self._universes = {}
+
+    def register(self, universe):
+        self._universes[universe.name] = universe
+        return universe
+
+    def load(self, path):
+        """Register every universe in ``path``; returns their names."""
+        universes = load_universes(path)
+        for universe in universes.values():
+            self.register(universe)
+        return list(universes)
+
+    def names(self):
+        names = set(self._universes)
+        if os.path.isdir(self.directory):
+            names.update(os.path.splitext(entry)[0] for entry in os.listdir(self.directory)
+                         if entry.endswith(UNIVERSE_EXTENSIONS))
+        return sorted(names)
+
+    def get(self, spec):
+        """Universe for a registered name, a file path or ``PATH#NAME``."""
+        path, _, name = spec.partition('#')
+        if os.path.isfile(path):
+            universes = load_universes(path)
+            if not name and len(universes) > 1:
+                raise ValueError(f"{path} birden fazla evren içeriyor; seçmek için {path}#AD kullanın "
+                                 f"(seçenekler: {', '.join(universes)})")
+            name = name or next(iter(universes))
+            if name not in universes:
+                raise ValueError(f"{path} içinde {name} evreni yok (seçenekler: {', '.join(universes)})")
+            return universes[name]
+
+        if spec not in self._universes:
+            for extension in UNIVERSE_EXTENSIONS:
+                candidate = os.path.join(self.directory, spec + extension)
+                if os.path.isfile(candidate):
+                    self.load(candidate)
+                    break
+        try:
+            return self._universes[spec]
+        except KeyError:
+            raise ValueError(f"Bilinmeyen hisse evreni: {spec} (seçenekler: {', '.join(self.names())})") from None
+
+
+REGISTRY = UniverseRegistry()
+REGISTRY.register(Universe('bist30', BIST30_STOCKS, label='BIST30', sector_parents=BIST30_SECTOR_PARENTS))
+
+
+def get_universe(spec):
+    """Return the Universe for a registered name, a file path or ``PATH#NAME``."""
+    return REGISTRY.get(spec)
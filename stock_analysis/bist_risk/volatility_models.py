@@ -0,0 +1,343 @@
+"""Conditional (GARCH-family) volatility of every symbol, fitted in one batch.
+
+All models share the GJR-GARCH(1,1) variance recursion
+
+    s2[t+1] = omega + (alpha + gamma * 1[e[t] < 0]) * e[t]^2 + beta * s2[t]
+
+on demeaned returns ``e``, with a linear map from each model's free
+parameters to (omega, alpha, gamma, beta):
+
+- ``garch``: alpha, beta (gamma = 0)
+- ``gjr``: alpha, gamma, beta (negative returns add gamma)
+- ``ewma``: lambda, with omega = 0, alpha = 1 - lambda, beta = lambda
+
+GARCH and GJR use variance targeting: omega = v (1 - alpha - gamma / 2 - beta)
+with v the sample variance, so the long-run variance is the sample one
+and omega is not a free parameter.
+
+The Gaussian likelihood and its analytic scores are computed by one pass
+over the dates that is vectorised across symbols, and every symbol takes
+its own BHHH step each iteration. All step lengths of the line search are
+evaluated together in one more pass, so an iteration costs two passes for
+the whole universe instead of a generic optimizer per symbol. Fits start
+from given (e.g. yesterday's) parameters when available, and then usually
+converge in a few iterations; the others start from the best point of a
+small grid. fit_volatility_models() spreads symbol chunks over a process
+pool; results do not depend on the number of workers.
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .metrics_engine import TRADING_DAYS, column_chunks
+
+STATE_VERSION = 1
+
+# Returns are fitted in percent so the parameters have similar magnitudes
+SCALE = 100.0
+
+# A symbol needs at least this many returns to be fitted
+MIN_FIT_OBSERVATIONS = 100
+
+MAX_ITERATIONS = 100
+# Converged when a full BHHH step would gain, or the last step gained, less log-likelihood than this
+LOGLIK_TOLERANCE = 1e-5
+# Line search step lengths tried together: 1, 1/2, ..., 1/2^7
+LINE_SEARCH_STEPS = 0.5 ** np.arange(8)
+# Largest alpha + gamma / 2 + beta accepted for the stationary models
+MAX_PERSISTENCE = 0.9999
+# Lower bound of the conditional variance (percent squared)
+MIN_VARIANCE = 1e-8
+
+# Free parameter names, their bounds, and the map (omega / v, alpha, gamma, beta) = offset + jacobian @ params
+MODELS = {
+    'garch': {
+        'params': ('alpha', 'beta'),
+        'lower': np.zeros(2),
+        'upper': np.ones(2),
+        'offset': np.array([1.0, 0.0, 0.0, 0.0]),
+        'jacobian': np.array([[-1, -1], [1, 0], [0, 0], [0, 1]], dtype=np.float64),
+    },
+    'gjr': {
+        'params': ('alpha', 'gamma', 'beta'),
+        'lower': np.zeros(3),
+        'upper': np.array([1.0, 2.0, 1.0]),
+        'offset': np.array([1.0, 0.0, 0.0, 0.0]),
+        'jacobian': np.array([[-1, -0.5, -1], [1, 0, 0], [0, 1, 0], [0, 0, 1]], dtype=np.float64),
+    },
+    'ewma': {
+        'params': ('lambda',),
+        'lower': np.zeros(1),
+        'upper': np.array([MAX_PERSISTENCE]),
+        'offset': np.array([0.0, 1.0, 0.0, 0.0]),
+        'jacobian': np.array([[0], [-1], [0], [1]], dtype=np.float64),
+    },
+}
+
+
+def recursion_params(model, params, target):
+    """(omega, alpha, gamma, beta) columns for rows of ``params`` and their target variances."""
+    spec = MODELS[model]
+    omega, alpha, gamma, beta = (spec['offset'] + params @ spec['jacobian'].T).T
+    return omega * target, alpha, gamma, beta
+
+
+def feasible(model, params):
+    """Whether each row of ``params`` is within the model bounds (and, except EWMA, stationary)."""
+    spec = MODELS[model]
+    ok = np.all((params >= spec['lower']) & (params <= spec['upper']), axis=1)
+    if model == 'ewma':
+        return ok
+    _, alpha, gamma, beta = recursion_params(model, params, 1.0)
+    return ok & (alpha + gamma / 2 + beta <= MAX_PERSISTENCE)
+
+
+def start_grid(model):
+    """Candidate starting parameters (rows); fit_batch() starts each series from the best one."""
+    if model == 'garch':
+        grid = [(alpha, beta) for alpha in (0.02, 0.05, 0.1) for beta in (0.8, 0.9, 0.95)]
+    elif model == 'gjr':
+        grid = [(alpha, gamma, beta) for alpha in (0.02, 0.05) for gamma in (0.02, 0.1) for beta in (0.8, 0.9, 0.95)]
+    else:
+        grid = [(decay,) for decay in (0.9, 0.94, 0.97, 0.99)]
+    return np.array([row for row in grid if feasible(model, np.array([row]))[0]])
+
+
+def _date_sums(values):
+    """Sum over the first (date) axis, always in date order.
+
+    np.sum switches to pairwise summation when the summed axis is
+    contiguous (a single column), so its rounding would depend on how many
+    series are fitted together; a running sum does not.
+    """
+    return np.cumsum(values, axis=0)[-1]
+
+
+def log_likelihood(model, params, errors, backcast, scores=False):
+    """Gaussian log-likelihood of each column of ``errors`` under its row of ``params``.
+
+    ``errors`` is a (dates x symbols) matrix of demeaned returns with NaN on
+    missing days, which are skipped; ``backcast`` is each column's sample
+    variance, the target of GARCH/GJR and where every recursion starts.
+    Returns ``(loglik, next_variance)``, plus the summed scores and their
+    outer products (the BHHH matrix) with ``scores``. ``next_variance`` is
+    the forecast for the day after the last observation.
+
+    Only the recursions themselves step through the dates; the terms that
+    do not depend on the previous day are computed for all dates at once.
+    """
+    omega, alpha, gamma, beta = recursion_params(model, params, backcast)
+    valid = ~np.isnan(errors)
+    squared = np.where(valid, errors * errors, 0.0)
+    negative = np.where(valid & (errors < 0), squared, 0.0)
+
+    # s2[t+1] = shock[t] + beta * s2[t] on observed days, unchanged otherwise
+    shock = omega + alpha * squared + gamma * negative
+    paths = np.empty(errors.shape)
+    variance = np.asarray(backcast, dtype=np.float64).copy()
+    for t in range(len(errors)):
+        paths[t] = variance
+        variance = np.where(valid[t], shock[t] + beta * variance, variance)
+    np.maximum(paths, MIN_VARIANCE, out=paths)
+
+    loglik = -0.5 * _date_sums(np.where(valid, np.log(paths) + squared / paths + np.log(2 * np.pi), 0.0))
+    if not scores:
+        return loglik, variance
+
+    # d s2[t+1] / d params = (v, e^2, e^2 1[e < 0], s2[t]) @ jacobian + beta * d s2[t] / d params
+    jacobian = MODELS[model]['jacobian']
+    inputs = (backcast[:, None] * jacobian[0] + squared[:, :, None] * jacobian[1]
+              + negative[:, :, None] * jacobian[2] + paths[:, :, None] * jacobian[3])
+    derivatives = np.empty(inputs.shape)
+    derivative = np.zeros(inputs.shape[1:])
+    for t in range(len(errors)):
+        derivatives[t] = derivative
+        derivative = np.where(valid[t][:, None], inputs[t] + beta[:, None] * derivative, derivative)
+
+    weight = np.where(valid, 0.5 * (squared / paths - 1) / paths, 0.0)
+    per_day = weight[:, :, None] * derivatives
+    gradient = _date_sums(per_day)
+    k = per_day.shape[2]
+    outer = np.empty((per_day.shape[1], k, k))
+    for i in range(k):
+        for j in range(i, k):
+            outer[:, i, j] = outer[:, j, i] = _date_sums(per_day[:, :, i] * per_day[:, :, j])
+    return loglik, variance, gradient, outer
+
+
+def fit_batch(model, returns, start=None, max_iterations=MAX_ITERATIONS):
+    """Fit ``model`` to every column of a (dates x symbols) return matrix at once.
+
+    ``start`` holds starting parameters per column (rows with NaN start
+    from the best point of start_grid()). Columns with fewer than MIN_FIT_OBSERVATIONS
+    returns are not fitted (NaN). Returns a dict of per-column arrays:
+    ``params``, the implied ``omega`` and ``persistence``, ``loglik``,
+    ``iterations``, ``converged`` and ``variance``, the forecast for the
+    day after the last return (omega and variance in squared return units).
+    """
+    returns = np.asarray(returns, dtype=np.float64) * SCALE
+    n_cols = returns.shape[1]
+    k = len(MODELS[model]['params'])
+    out = {
+        'params': np.full((n_cols, k), np.nan),
+        'loglik': np.full(n_cols, np.nan),
+        'iterations': np.zeros(n_cols, dtype=np.int64),
+        'converged': np.zeros(n_cols, dtype=bool),
+        'omega': np.full(n_cols, np.nan),
+        'persistence': np.full(n_cols, np.nan),
+        'variance': np.full(n_cols, np.nan),
+    }
+
+    counts = np.sum(~np.isnan(returns), axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        errors = returns - np.nanmean(returns, axis=0)
+        backcast = np.nanmean(errors * errors, axis=0)
+    fit = np.flatnonzero((counts >= MIN_FIT_OBSERVATIONS) & (backcast > 0))
+    if not len(fit):
+        return out
+    errors, backcast = errors[:, fit], backcast[fit]
+
+    params = np.full((len(fit), k), np.nan)
+    if start is not None:
+        start = np.asarray(start, dtype=np.float64)[fit]
+        usable = ~np.isnan(start).any(axis=1) & feasible(model, np.nan_to_num(start))
+        params[usable] = start[usable]
+
+    # Series without a usable start begin from the best grid point, all scored in one pass
+    cold = np.flatnonzero(np.isnan(params).any(axis=1))
+    if len(cold):
+        grid = start_grid(model)
+        grid_loglik, _ = log_likelihood(model, np.repeat(grid, len(cold), axis=0), np.tile(errors[:, cold], len(grid)),
+                                        np.tile(backcast[cold], len(grid)))
+        params[cold] = grid[np.argmax(grid_loglik.reshape(len(grid), -1), axis=0)]
+
+    loglik, variance, gradient, outer = log_likelihood(model, params, errors, backcast, scores=True)
+    iterations = np.zeros(len(fit), dtype=np.int64)
+    converged = np.zeros(len(fit), dtype=bool)
+    n_steps = len(LINE_SEARCH_STEPS)
+
+    lower, upper = MODELS[model]['lower'], MODELS[model]['upper']
+    for _ in range(max_iterations):
+        active = np.flatnonzero(~converged)
+        if not len(active):
+            break
+        current, score = params[active], gradient[active]
+
+        # BHHH direction over the parameters not held at a bound by their score
+        held = ((current <= lower) & (score < 0)) | ((current >= upper) & (score > 0))
+        free = ~held
+        matrix = np.where(free[:, :, None] & free[:, None, :], outer[active], 0.0)
+        matrix += np.eye(k) * (held[:, :, None] + 1e-10 * (np.trace(matrix, axis1=1, axis2=2)[:, None, None] + 1))
+        score = np.where(free, score, 0.0)
+        direction = np.linalg.solve(matrix, score[:, :, None])[:, :, 0]
+
+        # Predicted gain of the full step: stop once it is negligible
+        done = np.sum(score * direction, axis=1) < LOGLIK_TOLERANCE
+        converged[active[done]] = True
+        active, current, direction = active[~done], current[~done], direction[~done]
+        if not len(active):
+            break
+        iterations[active] += 1
+
+        # Every step length of every active column, clipped to the bounds, in one likelihood pass
+        candidates = np.clip(current[None] + LINE_SEARCH_STEPS[:, None, None] * direction[None], lower, upper)
+        candidates = candidates.reshape(-1, k)
+        ok = feasible(model, candidates)
+        trial = np.where(ok[:, None], candidates, np.tile(current, (n_steps, 1)))
+        trial_loglik, _ = log_likelihood(model, trial, np.tile(errors[:, active], n_steps),
+                                         np.tile(backcast[active], n_steps))
+        trial_loglik = np.where(ok, trial_loglik, -np.inf).reshape(n_steps, -1)
+
+        # Longest step that improves the likelihood; none (or a negligible gain) means no further progress
+        better = trial_loglik > loglik[active]
+        improved = better.any(axis=0)
+        chosen = np.argmax(better, axis=0)
+        gain = np.where(improved, trial_loglik[chosen, np.arange(len(active))] - loglik[active], 0.0)
+        converged[active[gain < LOGLIK_TOLERANCE]] = True
+        chosen = chosen[improved]
+        moved = active[improved]
+        if len(moved):
+            params[moved] = candidates.reshape(n_steps, len(active), k)[chosen, np.flatnonzero(improved)]
+            result = log_likelihood(model, params[moved], errors[:, moved], backcast[moved], scores=True)
+            loglik[moved], variance[moved], gradient[moved], outer[moved] = result
+
+    omega, alpha, gamma, beta = recursion_params(model, params, backcast)
+    out['params'][fit] = params
+    out['omega'][fit] = omega / SCALE ** 2
+    out['persistence'][fit] = alpha + gamma / 2 + beta
+    # Density of the unscaled returns: one log(SCALE) per observation
+    out['loglik'][fit] = loglik + counts[fit] * np.log(SCALE)
+    out['iterations'][fit] = iterations
+    out['converged'][fit] = converged
+    out['variance'][fit] = variance / SCALE ** 2
+    return out
+
+
+def _fit_chunk(task):
+    model, returns, start, max_iterations = task
+    return fit_batch(model, returns, start, max_iterations)
+
+
+def fit_volatility_models(model, returns, start=None, workers=1, chunk_size=None, max_iterations=MAX_ITERATIONS):
+    """fit_batch() over column chunks of ``returns`` fanned out to ``workers`` processes.
+
+    Columns are fitted independently, so the result does not depend on the
+    number of workers.
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    n_cols = returns.shape[1]
+    if workers <= 1 or n_cols < 4:
+        return fit_batch(model, returns, start, max_iterations)
+
+    k = len(MODELS[model]['params'])
+    start = np.full((n_cols, k), np.nan) if start is None else np.asarray(start, dtype=np.float64)
+    chunks = column_chunks(n_cols, workers, chunk_size)
+    tasks = [(model, returns[:, lo:hi], start[lo:hi], max_iterations) for lo, hi in chunks]
+    out = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for (lo, hi), chunk in zip(chunks, pool.map(_fit_chunk, tasks)):
+            for key, values in chunk.items():
+                if key not in out:
+                    out[key] = np.empty((n_cols,) + values.shape[1:], dtype=values.dtype)
+                out[key][lo:hi] = values
+    return out
+
+
+def annualised_volatility(variance, periods_per_year=TRADING_DAYS):
+    """Annualised volatility of a one-bar variance (daily by default)."""
+    return np.sqrt(variance * periods_per_year)
+
+
+def load_warm_start(path, model, symbols):
+    """Saved parameters of ``model`` for ``symbols`` (NaN rows for unknown ones), or None."""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        state = json.load(f)
+    if state.get('version') != STATE_VERSION:
+        raise ValueError(f"Desteklenmeyen volatilite modeli durumu sürümü: {state.get('version')}")
+    saved = state['models'].get(model, {}).get('params', {})
+    k = len(MODELS[model]['params'])
+    return np.array([saved.get(symbol, [np.nan] * k) for symbol in symbols], dtype=np.float64)
+
+
+def save_warm_start(path, model, symbols, params, last_date):
+    """Store the fitted parameters of ``model`` for the next run's warm start.
+
+    Other models in the file are kept; the file is replaced atomically.
+    """
+    state = {'version': STATE_VERSION, 'models': {}}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+    saved = state['models'].setdefault(model, {'params': {}})
+    for symbol, row in zip(symbols, params):
+        if not np.isnan(row).any():
+            saved['params'][symbol] = row.tolist()
+    saved['last_date'] = last_date
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
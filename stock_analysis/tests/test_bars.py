@@ -0,0 +1,86 @@
+"""Bar intervals and resampling: streaming output must equal a pandas resample of the whole file."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from bist_risk.bars import (BarResampler, bar_label, bars_per_session, check_resample, periods_per_year,
+                            resample_bars)
+
+
+def minute_bars(n_days=3, seed=0):
+    """Minute bars over the 10:00-18:00 session, with a few missing minutes."""
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range('2024-03-04', periods=n_days)
+    index = pd.DatetimeIndex([day + pd.Timedelta(minutes=600 + m) for day in days for m in range(480)], name='Date')
+    index = index[rng.random(len(index)) > 0.1].as_unit('ns')
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, len(index))))
+    spread = rng.random(len(index)) * 0.2
+    return pd.DataFrame({'Open': close + spread - 0.1, 'High': close + spread, 'Low': close - spread,
+                         'Close': close, 'Volume': rng.integers(1, 1000, len(index)).astype(float)}, index=index)
+
+
+def pandas_resample(data, rule):
+    """Reference bars: pandas resample within each session (bars counted from 10:00)."""
+    bars = data.resample(rule, offset='10h').agg(
+        {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'})
+    return bars[bars['Close'].notna()]
+
+
+@pytest.mark.parametrize('interval, expected', [('1d', 252), ('1h', 252 * 8), ('90m', 252 * 6), ('1m', 252 * 480)])
+def test_periods_per_year(interval, expected):
+    assert periods_per_year(interval) == expected
+
+
+def test_labels_and_bad_intervals():
+    assert [bar_label(i) for i in ('1d', '1h', '5m')] == ['Günlük', '1 saatlik', '5 dakikalık']
+    assert bars_per_session('90m') == 6
+    with pytest.raises(ValueError):
+        bars_per_session('3m')
+    with pytest.raises(ValueError):
+        check_resample('15m', '5m')
+    with pytest.raises(ValueError):
+        check_resample('2m', '5m')
+    check_resample('1m', '1d')
+
+
+@pytest.mark.parametrize('interval, rule', [('15m', '15min'), ('1h', '1h')])
+def test_resample_matches_pandas(interval, rule):
+    data = minute_bars()
+    pd.testing.assert_frame_equal(resample_bars(data, interval), pandas_resample(data, rule), check_freq=False,
+                                  check_names=False)
+
+
+def test_daily_resample_matches_groupby():
+    data = minute_bars()
+    daily = resample_bars(data, '1d')
+    expected = data.groupby(data.index.normalize()).agg(
+        {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'})
+    pd.testing.assert_frame_equal(daily, expected, check_names=False, check_freq=False)
+
+
+@pytest.mark.parametrize('chunk', [1, 7, 100, 10_000])
+def test_streaming_resampler_matches_the_whole_frame(chunk):
+    data = minute_bars()
+    resampler = BarResampler('15m')
+    frames = [resampler.update(data.iloc[i:i + chunk]) for i in range(0, len(data), chunk)]
+    frames.append(resampler.flush())
+    streamed = pd.concat([frame for frame in frames if not frame.empty])
+    pd.testing.assert_frame_equal(streamed, resample_bars(data, '15m'), check_freq=False)
+
+
+def test_streaming_resampler_ignores_rows_already_seen():
+    data = minute_bars(n_days=1)
+    resampler = BarResampler('1h')
+    first = resampler.update(data.iloc[:200])
+    again = resampler.update(data.iloc[100:])
+    streamed = pd.concat([first, again, resampler.flush()])
+    pd.testing.assert_frame_equal(streamed, resample_bars(data, '1h'), check_freq=False)
+
+
+def test_auction_bars_join_the_first_and_last_bar():
+    index = pd.DatetimeIndex(['2024-03-04 09:55', '2024-03-04 10:05', '2024-03-04 17:50', '2024-03-04 18:08'])
+    data = pd.DataFrame({'Close': [1.0, 2.0, 3.0, 4.0], 'Volume': [1.0, 1.0, 1.0, 1.0]}, index=index)
+    bars = resample_bars(data, '1h')
+    assert list(bars.index.strftime('%H:%M')) == ['10:00', '17:00']
+    assert list(bars['Close']) == [2.0, 4.0]
+    assert list(bars['Volume']) == [2.0, 2.0]
@@ -0,0 +1,53 @@
+"""The benchmark suite's synthetic universes and regression check."""
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from bench_pipeline import regressions  # noqa: E402
+from synthetic_data import BAR_FREQUENCIES, write_universe  # noqa: E402
+from bist_risk.data_loader import load_cached_data  # noqa: E402
+from bist_risk.universe import get_universe  # noqa: E402
+
+
+@pytest.mark.parametrize('freq', ['1d', '1h'])
+def test_synthetic_universe_loads_like_saved_data(tmp_path, freq):
+    universe_path = write_universe(str(tmp_path), tickers=5, days=30, freq=freq)
+    symbols = list(pd.read_csv(universe_path)['symbol'])
+    all_data, missing = load_cached_data(symbols, str(tmp_path / 'data'))
+    assert missing == []
+    for data in all_data.values():
+        assert list(data.columns) == ['Close', 'High', 'Low', 'Open', 'Volume']
+        assert data.index.is_monotonic_increasing
+        assert len(data) <= 30 * BAR_FREQUENCIES[freq]
+        assert (data['Low'] <= data[['Open', 'Close']].min(axis=1)).all()
+        assert (data['High'] >= data[['Open', 'Close']].max(axis=1)).all()
+    assert list(get_universe(universe_path)) == symbols
+
+
+def run(seconds, peak_mb, tickers=300):
+    return {'days': 1260, 'freq': '1d',
+            'runs': [{'tickers': tickers, 'stages': {'metrics': {'seconds': seconds, 'peak_mb': peak_mb}}}]}
+
+
+THRESHOLDS = {'time_ratio': 1.5, 'memory_ratio': 1.25, 'min_seconds': 0.05, 'min_mb': 5.0,
+              'stages': {'metrics': {'time_ratio': 2.0}}}
+
+
+def test_regressions_flag_stages_over_their_threshold():
+    assert regressions(run(0.9, 10), run(1.0, 10), THRESHOLDS) == []
+    # Per-stage override: 1.8x is within metrics' 2x time limit, 1.3x memory is not within 1.25x
+    found = regressions(run(1.8, 13), run(1.0, 10), THRESHOLDS)
+    assert len(found) == 1 and 'MB' in found[0]
+    assert len(regressions(run(2.1, 10), run(1.0, 10), THRESHOLDS)) == 1
+
+
+def test_regressions_skip_small_or_unmatched_runs():
+    assert regressions(run(0.04, 1), run(0.01, 0.5), THRESHOLDS) == []
+    assert regressions(run(5.0, 10, tickers=30), run(1.0, 10), THRESHOLDS) == []
+    other = run(1.0, 10)
+    other['days'] = 2520
+    assert regressions(run(5.0, 10), other, THRESHOLDS) == []
@@ -0,0 +1,90 @@
+"""Incremental covariance estimators against direct computations on the full return matrix."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from bist_risk.covariance import load_estimator, make_estimator
+
+
+def return_matrix(n_rows=400, n_cols=5, seed=0, gaps=True):
+    rng = np.random.default_rng(seed)
+    mixing = rng.normal(0, 0.01, (n_cols, n_cols))
+    returns = rng.standard_t(5, (n_rows, n_cols)) @ mixing + 0.0005
+    if gaps:
+        returns[rng.random(returns.shape) < 0.05] = np.nan
+        returns[:100, 1] = np.nan
+    return returns
+
+
+def fed(kind, returns, pieces=(0,), **params):
+    """Estimator of ``kind`` updated with ``returns`` split at the row offsets ``pieces``."""
+    estimator = make_estimator(kind, **params)
+    dates = pd.bdate_range('2020-01-01', periods=len(returns))
+    symbols = [f'S{j}' for j in range(returns.shape[1])]
+    bounds = list(pieces) + [len(returns)]
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        estimator.update(dates[lo:hi], symbols, returns[lo:hi])
+    return estimator
+
+
+def naive_ledoit_wolf(returns):
+    """Ledoit-Wolf (2004) shrinkage of the sample covariance towards mean variance x identity."""
+    t, p = returns.shape
+    x = returns - returns.mean(axis=0)
+    s = x.T @ x / t
+    mu = np.trace(s) / p
+    delta = np.sum((s - mu * np.eye(p)) ** 2) / p
+    pi = sum(np.sum((np.outer(row, row) - s) ** 2) for row in x) / t ** 2 / p
+    intensity = min(pi, delta) / delta
+    sample = np.cov(returns, rowvar=False)
+    return (1 - intensity) * sample + intensity * np.trace(sample) / p * np.eye(p)
+
+
+def naive_ewma(returns, decay):
+    weighted = np.zeros((returns.shape[1],) * 2)
+    weights = np.zeros_like(weighted)
+    for row in returns:
+        valid = ~np.isnan(row)
+        x = np.where(valid, row, 0.0)
+        weighted = decay * weighted + (1 - decay) * np.outer(x, x)
+        weights = decay * weights + (1 - decay) * np.outer(valid, valid)
+    return weighted / weights
+
+
+@pytest.mark.parametrize('pieces', [(0,), (0, 1, 150, 151, 390)])
+def test_sample_matches_pandas(pieces):
+    returns = return_matrix()
+    expected = pd.DataFrame(returns).cov().to_numpy()
+    np.testing.assert_allclose(fed('sample', returns, pieces).covariance(), expected, rtol=1e-9)
+
+
+@pytest.mark.parametrize('pieces', [(0,), (0, 30, 31, 200, 333)])
+def test_rolling_matches_the_last_window(pieces):
+    returns = return_matrix()
+    expected = pd.DataFrame(returns[-60:]).cov().to_numpy()
+    np.testing.assert_allclose(fed('rolling', returns, pieces, window=60).covariance(), expected, rtol=1e-8)
+
+
+def test_ledoit_wolf_matches_direct_formula():
+    returns = return_matrix(gaps=False)
+    np.testing.assert_allclose(fed('ledoit-wolf', returns, (0, 200)).covariance(), naive_ledoit_wolf(returns),
+                               rtol=1e-9)
+
+
+@pytest.mark.parametrize('pieces', [(0,), (0, 1, 77, 300)])
+def test_ewma_matches_the_recursion(pieces):
+    returns = return_matrix()
+    np.testing.assert_allclose(fed('ewma', returns, pieces, decay=0.94).covariance(), naive_ewma(returns, 0.94),
+                               rtol=1e-10)
+
+
+@pytest.mark.parametrize('kind', ['sample', 'ledoit-wolf', 'rolling', 'ewma'])
+def test_saved_state_resumes_like_one_pass(tmp_path, kind):
+    returns = return_matrix()
+    path = str(tmp_path / 'cov.npz')
+    fed(kind, returns[:250], window=60).save(path)
+    resumed = load_estimator(path)
+    dates = pd.bdate_range('2020-01-01', periods=len(returns))
+    # Rows already applied are skipped
+    resumed.update(dates, [f'S{j}' for j in range(returns.shape[1])], returns)
+    np.testing.assert_allclose(resumed.covariance(), fed(kind, returns, window=60).covariance(), rtol=1e-9)
@@ -0,0 +1,223 @@
+"""sync_stock() against a local fake of the download function, and the incremental states a rewrite resets."""
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bist_risk.data_loader import OHLCV_COLUMNS, read_stock_csv, stock_csv_path
+from bist_risk.data_sync import rewritten_since, sync_stock
+from bist_risk.pipeline import calculate_returns_and_metrics, rewritten_histories, update_streaming_ranking
+from bist_risk.reporting import estimate_covariance
+from bist_risk.streaming_metrics import StreamingRiskEngine
+
+STOCK = 'AKBNK.IS'
+
+
+def prices(start, periods, scale=1.0):
+    """Business-day OHLCV frame with closes 100, 101, ... times ``scale``."""
+    dates = pd.bdate_range(start, periods=periods, name='Date')
+    close = (100.0 + pd.Series(range(periods), index=dates, dtype=float)) * scale
+    return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                         'Volume': 1000.0}, index=dates)[OHLCV_COLUMNS]
+
+
+class FakeDownload:
+    """Serves date ranges of a fixed frame (``end`` exclusive, as yfinance) and records every call."""
+
+    def __init__(self, data):
+        self.data = data
+        self.calls = []
+
+    def __call__(self, stock, start, end):
+        self.calls.append((stock, start, end))
+        return self.data[(self.data.index >= start) & (self.data.index < end)]
+
+
+def store(tmp_path, data):
+    data.to_csv(stock_csv_path(STOCK, tmp_path))
+
+
+def test_creates_missing_file(tmp_path):
+    download = FakeDownload(prices('2024-01-01', 10))
+    data, status = sync_stock(STOCK, download, '2024-01-01', '2024-02-01', data_dir=tmp_path)
+    assert status == {'action': 'created', 'rows_added': 10}
+    assert len(read_stock_csv(stock_csv_path(STOCK, tmp_path))) == 10
+
+
+def test_appends_only_new_rows(tmp_path):
+    full = prices('2024-01-01', 12)
+    store(tmp_path, full.iloc[:10])
+    download = FakeDownload(full)
+    data, status = sync_stock(STOCK, download, '2024-01-01', '2024-02-01', data_dir=tmp_path, overlap_rows=3)
+
+    assert status == {'action': 'appended', 'rows_added': 2}
+    # Only the overlap and the tail are fetched
+    assert download.calls == [(STOCK, full.index[7].strftime('%Y-%m-%d'), '2024-02-01')]
+    saved = read_stock_csv(stock_csv_path(STOCK, tmp_path))
+    assert saved.index.equals(full.index)
+    assert data['Close'].tolist() == full['Close'].tolist()
+
+
+def test_unchanged_without_new_rows(tmp_path):
+    full = prices('2024-01-01', 10)
+    store(tmp_path, full)
+    download = FakeDownload(full)
+    data, status = sync_stock(STOCK, download, '2024-01-01', '2024-02-01', data_dir=tmp_path)
+    assert status == {'action': 'unchanged', 'rows_added': 0}
+    assert len(data) == 10
+
+
+def test_unchanged_when_up_to_date_skips_download(tmp_path):
+    full = prices('2024-01-01', 10)
+    store(tmp_path, full)
+    download = FakeDownload(full)
+    end = (full.index[-1] + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+    _, status = sync_stock(STOCK, download, '2024-01-01', end, data_dir=tmp_path)
+    assert status['action'] == 'unchanged'
+    assert download.calls == []
+
+
+def test_rebuilds_adjusted_history_from_first_stored_date(tmp_path):
+    stored = prices('2023-06-01', 60)
+    store(tmp_path, stored)
+    # A split halves every price of the re-served history
+    adjusted = prices('2023-06-01', 65, scale=0.5)
+    download = FakeDownload(adjusted)
+    data, status = sync_stock(STOCK, download, '2023-07-01', '2023-12-01', data_dir=tmp_path)
+
+    assert status == {'action': 'rebuilt', 'rows_added': 65}
+    # Re-downloaded from the first stored date, not the later start of this run
+    assert download.calls[-1][1] == '2023-06-01'
+    saved = read_stock_csv(stock_csv_path(STOCK, tmp_path))
+    assert saved.index[0] == stored.index[0]
+    assert saved['Close'].tolist() == pytest.approx(adjusted['Close'].tolist())
+    assert data.index[0] >= pd.Timestamp('2023-07-01')
+
+
+def test_empty_rebuild_keeps_stored_history(tmp_path):
+    stored = prices('2024-01-01', 10)
+    store(tmp_path, stored)
+    adjusted = prices('2024-01-01', 12, scale=0.5)
+    calls = []
+
+    def download(stock, start, end):
+        calls.append(start)
+        # The overlap shows the adjustment, then the full re-download fails
+        return adjusted[adjusted.index >= start] if len(calls) == 1 else adjusted.iloc[:0]
+
+    data, status = sync_stock(STOCK, download, '2024-01-01', '2024-02-01', data_dir=tmp_path)
+    assert status == {'action': 'unchanged', 'rows_added': 0}
+    assert len(calls) == 2
+    saved = read_stock_csv(stock_csv_path(STOCK, tmp_path))
+    assert saved['Close'].tolist() == stored['Close'].tolist()
+    assert data['Close'].tolist() == stored['Close'].tolist()
+
+
+def test_backfills_history_before_first_stored_date(tmp_path):
+    full = prices('2024-01-01', 20)
+    store(tmp_path, full.iloc[5:])
+    download = FakeDownload(full)
+    end = (full.index[-1] + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+    data, status = sync_stock(STOCK, download, '2024-01-01', end, data_dir=tmp_path)
+
+    assert status == {'action': 'backfilled', 'rows_added': 5}
+    assert download.calls == [(STOCK, '2024-01-01', full.index[5].strftime('%Y-%m-%d'))]
+    saved = read_stock_csv(stock_csv_path(STOCK, tmp_path))
+    assert saved.index.equals(full.index)
+    assert data['Close'].tolist() == full['Close'].tolist()
+
+
+def test_backfill_and_append_in_one_sync(tmp_path):
+    full = prices('2024-01-01', 20)
+    store(tmp_path, full.iloc[5:15])
+    download = FakeDownload(full)
+    data, status = sync_stock(STOCK, download, '2024-01-01', '2024-02-01', data_dir=tmp_path, overlap_rows=2)
+    assert status == {'action': 'backfilled', 'rows_added': 10}
+    assert read_stock_csv(stock_csv_path(STOCK, tmp_path)).index.equals(full.index)
+    assert data.index.equals(full.index)
+
+
+def test_later_listing_is_not_backfilled_twice(tmp_path):
+    # Listed after the requested start: the head comes back empty once, then is not asked for again
+    listed = prices('2024-01-10', 10)
+    download = FakeDownload(listed)
+    sync_stock(STOCK, download, '2024-01-01', '2024-02-01', data_dir=tmp_path)
+    store(tmp_path, listed)
+    _, status = sync_stock(STOCK, download, '2024-01-01', '2024-02-01', data_dir=tmp_path)
+    assert status['action'] == 'unchanged'
+    assert [call[1] for call in download.calls] == ['2024-01-01', listed.index[-5].strftime('%Y-%m-%d')]
+
+
+def test_failed_append_keeps_stored_file(tmp_path, monkeypatch):
+    full = prices('2024-01-01', 12)
+    store(tmp_path, full.iloc[:10])
+    path = stock_csv_path(STOCK, tmp_path)
+    with open(path) as f:
+        before = f.read()
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(pd.DataFrame, 'to_csv', fail)
+    with pytest.raises(OSError):
+        sync_stock(STOCK, FakeDownload(full), '2024-01-01', '2024-02-01', data_dir=tmp_path)
+    with open(path) as f:
+        assert f.read() == before
+
+
+def test_only_rewrites_are_reported_as_rewritten(tmp_path):
+    full = prices('2024-01-01', 12)
+    store(tmp_path, full.iloc[:10])
+    sync_stock(STOCK, FakeDownload(full), '2024-01-01', '2024-02-01', data_dir=tmp_path)
+    assert rewritten_since([STOCK], 0, tmp_path) == []
+
+    sync_stock(STOCK, FakeDownload(prices('2024-01-01', 14, scale=0.5)), '2024-01-01', '2024-02-01',
+               data_dir=tmp_path)
+    assert rewritten_since([STOCK, 'THYAO.IS'], 0, tmp_path) == [STOCK]
+    assert rewritten_since([STOCK], time.time_ns() + 10**9, tmp_path) == []
+
+
+def test_rebuild_resets_streaming_state(tmp_path, monkeypatch):
+    monkeypatch.setattr('bist_risk.data_loader.interval_data_dir', lambda interval: str(tmp_path))
+    # The ranking is saved under reports/ of the working directory
+    (tmp_path / 'reports').mkdir()
+    monkeypatch.chdir(tmp_path)
+    stored = prices('2024-01-01', 80)
+    store(tmp_path, stored)
+    state_path = str(tmp_path / 'state.json')
+    universe = {STOCK: {'name': 'AKBANK', 'sector': 'Banka'}}
+    update_streaming_ranking({STOCK: stored}, universe, state_path)
+    os.utime(state_path, ns=(0, 0))
+
+    adjusted = prices('2024-01-01', 85, scale=0.5)
+    data, status = sync_stock(STOCK, FakeDownload(adjusted), '2024-01-01', '2024-06-01', data_dir=tmp_path)
+    assert status['action'] == 'rebuilt'
+    update_streaming_ranking({STOCK: data}, universe, state_path)
+
+    fresh = StreamingRiskEngine()
+    fresh.update_from_data({STOCK: adjusted})
+    resumed = StreamingRiskEngine.load(state_path)
+    assert resumed.states[STOCK].metrics() == pytest.approx(fresh.states[STOCK].metrics(), nan_ok=True)
+
+
+def test_rebuild_resets_covariance_state(tmp_path, monkeypatch):
+    monkeypatch.setattr('bist_risk.data_loader.interval_data_dir', lambda interval: str(tmp_path))
+    other = 'THYAO.IS'
+    stored, second = prices('2024-01-01', 80), prices('2024-01-01', 85, scale=2.0) ** 1.5
+    store(tmp_path, stored)
+    universe = {STOCK: {'name': 'AKBANK', 'sector': 'Banka'}, other: {'name': 'THY', 'sector': 'Ulaştırma'}}
+    state_path = str(tmp_path / 'cov.npz')
+    old = calculate_returns_and_metrics({STOCK: stored, other: second.iloc[:80]}, universe)
+    estimate_covariance(old, 'sample', state_path=state_path)
+    os.utime(state_path, ns=(0, 0))
+
+    # A dividend adjustment scales older prices more, so the stored returns change too
+    adjusted = prices('2024-01-01', 85).mul(np.linspace(0.5, 0.9, 85), axis=0)
+    data, _ = sync_stock(STOCK, FakeDownload(adjusted), '2024-01-01', '2024-06-01', data_dir=tmp_path)
+    results = calculate_returns_and_metrics({STOCK: data, other: second}, universe)
+    resumed = estimate_covariance(results, 'sample', state_path=state_path,
+                                  rewritten=rewritten_histories(state_path, results))
+    expected = estimate_covariance(results, 'sample')
+    np.testing.assert_allclose(resumed.to_numpy(), expected.to_numpy(), rtol=1e-12)
@@ -0,0 +1,79 @@
+"""drawdown_stats() against a direct scan of each column, chunked and unchunked."""
+import numpy as np
+import pytest
+
+from bist_risk.drawdown import drawdown_stats
+
+
+def naive_drawdown(path):
+    """Worst drawdown episode of one column by a plain Python scan over its valid rows."""
+    rows = [i for i, value in enumerate(path) if value == value]
+    if not rows:
+        return None
+    peak_row, best = rows[0], (0.0, rows[0], rows[0])
+    for i in rows:
+        if path[i] >= path[peak_row]:
+            peak_row = i
+        drawdown = path[i] / path[peak_row] - 1
+        if drawdown < best[0]:
+            best = (drawdown, peak_row, i)
+    max_drawdown, peak, trough = best
+    recovery = next((i for i in rows if i > trough and path[i] >= path[peak]), -1)
+    if max_drawdown == 0:
+        recovery = trough
+    return {'max_drawdown': max_drawdown, 'peak': peak, 'trough': trough, 'recovery': recovery,
+            'duration': (recovery if recovery >= 0 else rows[-1]) - peak}
+
+
+def paths(n_rows=500, n_cols=6, seed=0):
+    rng = np.random.default_rng(seed)
+    wealth = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_rows, n_cols)), axis=0))
+    wealth[rng.random(wealth.shape) < 0.05] = np.nan
+    wealth[:200, 1] = np.nan
+    wealth[:, 2] = np.linspace(100, 200, n_rows)  # never falls
+    wealth[:, 3] = np.nan
+    return wealth
+
+
+@pytest.mark.parametrize('chunk_rows', [None, 7, 64])
+def test_matches_direct_scan(chunk_rows):
+    wealth = paths()
+    stats = drawdown_stats(wealth, chunk_rows=chunk_rows)
+    for j in range(wealth.shape[1]):
+        expected = naive_drawdown(wealth[:, j])
+        if expected is None:
+            assert np.isnan(stats['max_drawdown'][j])
+            continue
+        for key, value in expected.items():
+            assert stats[key][j] == pytest.approx(value, rel=1e-12), (j, key)
+
+
+def test_recovery_statistics():
+    stats = drawdown_stats(np.array([100.0, 120.0, 90.0, 100.0, 125.0, 110.0]))
+    assert stats['max_drawdown'][0] == pytest.approx(-0.25)
+    assert (stats['peak'][0], stats['trough'][0], stats['recovery'][0]) == (1, 2, 4)
+    assert (stats['peak_to_trough'][0], stats['time_to_recovery'][0], stats['duration'][0]) == (1, 2, 3)
+
+
+def test_unrecovered_drawdown_lasts_to_the_last_row():
+    stats = drawdown_stats(np.array([100.0, 80.0, 90.0, 95.0]))
+    assert stats['recovery'][0] == -1 and np.isnan(stats['time_to_recovery'][0])
+    assert stats['duration'][0] == 3
+
+
+@pytest.mark.parametrize('method', ['simple', 'log'])
+def test_calculate_max_drawdown_matches_the_script_formulas(method):
+    import pandas as pd
+
+    from bist_risk.pipeline import calculate_max_drawdown
+
+    # Column 0 has missing prices; simple returns only compound the price path without them
+    prices = pd.Series(paths()[:, 0])
+    if method == 'simple':
+        prices = prices.dropna()
+    returns = np.log(prices / prices.shift(1)) if method == 'log' else prices.pct_change(fill_method=None)
+    cumulative = (1 + returns.fillna(0)).cumprod()
+    expected = (cumulative / cumulative.expanding().max() - 1).min()
+    assert calculate_max_drawdown(prices, method) == pytest.approx(expected, rel=1e-12)
+    with pytest.raises(ValueError):
+        calculate_max_drawdown(prices, 'geometric')
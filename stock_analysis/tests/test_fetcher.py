@@ -0,0 +1,58 @@
+"""fetch_all() retries, failures and rate limiting with fake fetch functions (no network)."""
+import pytest
+
+from bist_risk.fetcher import TokenBucket, fetch_all, rate_limited
+
+
+class Flaky:
+    """Raises ``error`` on the first ``failures`` calls per symbol, then returns the symbol."""
+
+    def __init__(self, error, failures):
+        self.error = error
+        self.failures = failures
+        self.calls = {}
+
+    def __call__(self, symbol):
+        self.calls[symbol] = self.calls.get(symbol, 0) + 1
+        if self.calls[symbol] <= self.failures:
+            raise self.error
+        return symbol
+
+
+@pytest.mark.parametrize('error', [TimeoutError("zaman aşımı"), ConnectionError("bağlantı koptu")])
+def test_transient_errors_are_retried(error):
+    fetch = Flaky(error, failures=2)
+    result = fetch_all(['A', 'B'], fetch, workers=2, retries=2, sleep=lambda seconds: None)
+    assert result.data == {'A': 'A', 'B': 'B'}
+    assert result.attempts == {'A': 3, 'B': 3}
+
+
+def test_other_errors_fail_at_once():
+    fetch = Flaky(ValueError("veri bulunamadı"), failures=1)
+    result = fetch_all(['A'], fetch, retries=2, sleep=lambda seconds: None)
+    assert result.failed == ['A'] and str(result.failures['A']) == "veri bulunamadı"
+    assert fetch.calls == {'A': 1}
+
+
+def test_retries_stop_after_the_last_attempt():
+    fetch = Flaky(TimeoutError("zaman aşımı"), failures=5)
+    waits = []
+    result = fetch_all(['A'], fetch, retries=2, backoff=1.0, sleep=waits.append)
+    assert result.failed == ['A'] and result.attempts['A'] == 3
+    assert waits == [1.0, 2.0]
+
+
+def test_rate_limited_takes_a_token_per_call():
+    now = [0.0]
+    waits = []
+
+    def sleep(seconds):
+        waits.append(seconds)
+        now[0] += seconds
+
+    limiter = TokenBucket(2, 1, clock=lambda: now[0], sleep=sleep)
+    download = rate_limited(lambda symbol: symbol, limiter)
+    # One fetch making three requests waits for the second and the third
+    result = fetch_all(['A'], lambda symbol: [download(symbol) for _ in range(3)], sleep=sleep)
+    assert result.data == {'A': ['A', 'A', 'A']}
+    assert waits == pytest.approx([0.5, 0.5])
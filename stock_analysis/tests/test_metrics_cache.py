@@ -0,0 +1,101 @@
+"""Cache keys of the per-stock metrics: reused results must equal a fresh computation."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from bist_risk.pipeline import calculate_returns_and_metrics, universe_hash
+from bist_risk.result_cache import ResultCache
+
+COMPARED = ('total_observations', 'mean_return', 'std_return', 'kurtosis', 'var_95', 'max_drawdown')
+
+
+def universe_data(n_stocks=4, n_bars=200, seed=0):
+    """Random-walk closes; every stock but the first skips some bars the others trade on."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2023-01-02', periods=n_bars, name='Date')
+    data, universe = {}, {}
+    for i in range(n_stocks):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars)))
+        keep = np.ones(n_bars, dtype=bool) if i == 0 else rng.random(n_bars) > 0.05
+        symbol = f'S{i}.IS'
+        data[symbol] = pd.DataFrame({'Close': close[keep]}, index=dates[keep])
+        universe[symbol] = {'name': f'S{i}', 'sector': 'Test'}
+    return data, universe
+
+
+def assert_same(results, expected):
+    assert set(results) == set(expected)
+    for symbol in expected:
+        for key in COMPARED:
+            assert results[symbol][key] == pytest.approx(expected[symbol][key], rel=1e-12), (symbol, key)
+
+
+@pytest.mark.parametrize('missing_bars', ['gap', 'ffill'])
+def test_entry_cached_on_another_calendar_is_not_reused(tmp_path, missing_bars):
+    data, universe = universe_data()
+    cache = ResultCache(str(tmp_path))
+    # S1 cached alone: under 'ffill' its missing bars are unknown without the other stocks
+    calculate_returns_and_metrics({'S1.IS': data['S1.IS']}, universe, cache=cache, missing_bars=missing_bars)
+    results = calculate_returns_and_metrics(data, universe, cache=cache, missing_bars=missing_bars)
+    assert_same(results, calculate_returns_and_metrics(data, universe, missing_bars=missing_bars))
+
+
+def test_ffill_entries_depend_on_the_calendar(tmp_path):
+    data, universe = universe_data()
+    cache = ResultCache(str(tmp_path))
+    alone = calculate_returns_and_metrics({'S1.IS': data['S1.IS']}, universe, cache=cache, missing_bars='ffill')
+    together = calculate_returns_and_metrics(data, universe, cache=cache, missing_bars='ffill')
+    # Carried prices add a zero return on each bar S1 misses
+    assert together['S1.IS']['total_observations'] > alone['S1.IS']['total_observations']
+
+
+@pytest.mark.parametrize('missing_bars', ['gap', 'ffill'])
+def test_partly_cached_universe_matches_fresh_results(tmp_path, missing_bars):
+    data, universe = universe_data()
+    cache = ResultCache(str(tmp_path))
+    calculate_returns_and_metrics(data, universe, cache=cache, missing_bars=missing_bars)
+    # One stock's history changes; the others are served from the cache
+    changed = dict(data)
+    changed['S2.IS'] = data['S2.IS'].iloc[:-10]
+    results = calculate_returns_and_metrics(changed, universe, cache=cache, missing_bars=missing_bars)
+    assert cache.hits >= len(data) - 1
+    assert_same(results, calculate_returns_and_metrics(changed, universe, missing_bars=missing_bars))
+
+
+def test_cache_keys_separate_missing_bar_policies(tmp_path):
+    data, universe = universe_data()
+    cache = ResultCache(str(tmp_path))
+    calculate_returns_and_metrics(data, universe, cache=cache, missing_bars='gap')
+    results = calculate_returns_and_metrics(data, universe, cache=cache, missing_bars='ffill')
+    assert_same(results, calculate_returns_and_metrics(data, universe, missing_bars='ffill'))
+
+
+def test_cached_entries_take_names_and_sectors_from_the_current_universe(tmp_path):
+    data, universe = universe_data()
+    cache = ResultCache(str(tmp_path))
+    calculate_returns_and_metrics(data, universe, cache=cache)
+    edited = dict(universe, **{'S1.IS': {'name': 'Yeni Ad', 'sector': 'Banka'}})
+    results = calculate_returns_and_metrics(data, edited, cache=cache)
+    assert cache.hits >= len(data)
+    assert (results['S1.IS']['name'], results['S1.IS']['sector']) == ('Yeni Ad', 'Banka')
+    assert results['S0.IS']['name'] == 'S0'
+
+
+def test_identical_histories_of_two_symbols_are_separate_entries(tmp_path):
+    data, universe = universe_data(n_stocks=1)
+    data['S9.IS'] = data['S0.IS'].copy()
+    universe['S9.IS'] = {'name': 'S9', 'sector': 'Diğer'}
+    cache = ResultCache(str(tmp_path))
+    calculate_returns_and_metrics(data, universe, cache=cache)
+    results = calculate_returns_and_metrics(data, universe, cache=cache)
+    assert results['S0.IS'].symbol == 'S0.IS' and results['S9.IS'].symbol == 'S9.IS'
+    assert results['S9.IS']['sector'] == 'Diğer'
+
+
+def test_universe_hash_covers_names_sectors_and_paths():
+    _, universe = universe_data()
+    renamed = dict(universe, **{'S1.IS': {'name': 'Yeni Ad', 'sector': 'Test'}})
+    moved = dict(universe, **{'S1.IS': {'name': 'S1', 'sector': 'Test', 'sector_path': ['Sanayi', 'Test']}})
+    hashes = {universe_hash(u) for u in (universe, renamed, moved)}
+    assert len(hashes) == 3
+    assert universe_hash(dict(universe)) == universe_hash(universe)
@@ -0,0 +1,78 @@
+"""The vectorised metrics engine against a per-stock loop over each column's own prices."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from bist_risk.metrics_engine import compute_universe_metrics, nan_correlation, nan_covariance, nan_percentile
+
+SCALARS = ('mean_return', 'std_return', 'annual_return', 'annual_volatility', 'sharpe_ratio', 'skewness', 'kurtosis',
+           'var_95', 'var_99', 'max_drawdown', 'extreme_positive', 'extreme_negative', 'total_observations')
+
+
+def price_matrix(n_bars=400, n_cols=6, seed=0):
+    """Random-walk prices with scattered gaps, a late listing and an early delisting."""
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.standard_t(4, (n_bars, n_cols)) * 0.02, axis=0))
+    prices[rng.random(prices.shape) < 0.05] = np.nan
+    prices[:150, 1] = np.nan
+    prices[300:, 2] = np.nan
+    return prices
+
+
+def stock_metrics(prices, periods_per_year=252):
+    """One stock the way the per-stock loop computed it: returns of its valid prices, pandas statistics."""
+    close = pd.Series(prices).dropna()
+    returns = np.log(close / close.shift(1)).dropna()
+    mean, std = returns.mean(), returns.std(ddof=0)
+    z = (returns - mean) / std
+    # The drawdown runs over the prices that have a return, i.e. from the second one
+    wealth = close.iloc[1:]
+    return {
+        'mean_return': mean,
+        'std_return': std,
+        'annual_return': mean * periods_per_year,
+        'annual_volatility': std * np.sqrt(periods_per_year),
+        'sharpe_ratio': mean * periods_per_year / (std * np.sqrt(periods_per_year)),
+        'skewness': ((returns - mean) ** 3).mean() / std ** 3,
+        'kurtosis': ((returns - mean) ** 4).mean() / std ** 4 - 3,
+        'var_95': np.percentile(returns, 5),
+        'var_99': np.percentile(returns, 1),
+        'max_drawdown': (wealth / wealth.cummax() - 1).min(),
+        'extreme_positive': int((z > 2).sum()),
+        'extreme_negative': int((z < -2).sum()),
+        'total_observations': len(returns),
+    }
+
+
+@pytest.mark.parametrize('block_bytes', [None, 4096])
+def test_matches_per_stock_loop(block_bytes):
+    prices = price_matrix()
+    kwargs = {} if block_bytes is None else {'block_bytes': block_bytes}
+    metrics = compute_universe_metrics(prices, **kwargs)
+    for j in range(prices.shape[1]):
+        expected = stock_metrics(prices[:, j])
+        for key in SCALARS:
+            assert metrics[key][j] == pytest.approx(expected[key], rel=1e-9, abs=1e-15), (j, key)
+
+
+def test_column_blocks_give_identical_results():
+    prices = price_matrix(n_cols=9)
+    dates = pd.bdate_range('2020-01-01', periods=len(prices)).to_numpy()
+    whole = compute_universe_metrics(prices, dates)
+    blocked = compute_universe_metrics(prices, dates, block_bytes=prices.shape[0] * 8 * 3)
+    for key, values in whole.items():
+        np.testing.assert_array_equal(blocked[key], values, err_msg=key)
+
+
+def test_nan_percentile_matches_numpy_per_column():
+    prices = price_matrix()
+    for q in (1, 5, 50, 99):
+        expected = [np.percentile(column[~np.isnan(column)], q) for column in prices.T]
+        np.testing.assert_allclose(nan_percentile(prices, q), expected, rtol=1e-12)
+
+
+def test_pairwise_statistics_match_pandas():
+    returns = np.diff(np.log(price_matrix()), axis=0)
+    frame = pd.DataFrame(returns)
+    np.testing.assert_allclose(nan_covariance(returns), frame.cov().to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(nan_correlation(returns), frame.corr().to_numpy(), rtol=1e-9)
@@ -0,0 +1,44 @@
+"""The process-pool metrics path gives the serial engine's results exactly."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from bist_risk.metrics_engine import compute_universe_metrics
+from bist_risk.parallel_metrics import compute_universe_metrics_parallel
+from bist_risk.pipeline import calculate_returns_and_metrics
+
+
+def price_matrix(n_bars=300, n_cols=11, seed=0):
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_bars, n_cols)), axis=0))
+    prices[rng.random(prices.shape) < 0.05] = np.nan
+    prices[:120, 3] = np.nan
+    return prices
+
+
+@pytest.mark.parametrize('workers, chunk_size', [(2, None), (3, 2), (2, 5)])
+def test_matches_serial_engine(workers, chunk_size):
+    prices = price_matrix()
+    dates = pd.bdate_range('2020-01-01', periods=len(prices)).to_numpy()
+    serial = compute_universe_metrics(prices, dates)
+    parallel = compute_universe_metrics_parallel(prices, dates, workers=workers, chunk_size=chunk_size)
+    assert set(parallel) == set(serial)
+    for key, values in serial.items():
+        np.testing.assert_array_equal(parallel[key], values, err_msg=key)
+
+
+def test_pipeline_results_do_not_depend_on_workers():
+    prices = price_matrix(n_cols=6)
+    dates = pd.bdate_range('2020-01-01', periods=len(prices), name='Date')
+    data = {f'S{j}.IS': pd.DataFrame({'Close': prices[:, j]}, index=dates).dropna() for j in range(prices.shape[1])}
+    universe = {symbol: {'name': symbol[:-3], 'sector': 'Test'} for symbol in data}
+    serial = calculate_returns_and_metrics(data, universe)
+    parallel = calculate_returns_and_metrics(data, universe, workers=2)
+    assert list(parallel) == list(serial)
+    for symbol in serial:
+        for key in serial[symbol].keys():
+            # NaN (no recovery yet) compares unequal to itself
+            expected = serial[symbol][key]
+            value = parallel[symbol][key]
+            assert value == expected or (expected != expected and value != expected), key
+        np.testing.assert_array_equal(parallel[symbol].returns, serial[symbol].returns)
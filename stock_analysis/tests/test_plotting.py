@@ -0,0 +1,57 @@
+"""Figure rendering: a figure is reused only for the inputs and render mode it was drawn with."""
+import json
+import os
+
+import pytest
+
+from bist_risk.plotting import MANIFEST_FILE, FigureSpec, render_figure, render_figures
+
+pytest.importorskip('matplotlib')
+
+
+def draw_line(values, title='Test'):
+    from bist_risk.plotting import _pyplot
+
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(4, 3))
+    ax.plot(values)
+    ax.set_title(title)
+    return fig
+
+
+def spec(tmp_path, values=(1, 2, 3)):
+    return FigureSpec(str(tmp_path / 'line.png'), draw_line, {'values': list(values)})
+
+
+def test_hash_depends_on_inputs_and_mode(tmp_path):
+    base = spec(tmp_path)
+    assert base.input_hash('draft') != base.input_hash('full')
+    assert base.input_hash('full') != spec(tmp_path, (1, 2, 4)).input_hash('full')
+    assert base.input_hash('full') == spec(tmp_path).input_hash('full')
+
+
+def test_draft_figure_is_not_reused_for_a_full_render(tmp_path):
+    figure = spec(tmp_path)
+    assert render_figures([figure], mode='draft', workers=1, plots_dir=str(tmp_path)) == ([figure.path], [])
+    assert render_figures([figure], mode='draft', workers=1, plots_dir=str(tmp_path)) == ([], [figure.path])
+    assert render_figures([figure], mode='full', workers=1, plots_dir=str(tmp_path)) == ([figure.path], [])
+
+    with open(os.path.join(tmp_path, MANIFEST_FILE), encoding='utf-8') as f:
+        assert json.load(f)[figure.path]['hash'] == figure.input_hash('full')
+
+
+def test_draft_skips_the_layout_passes(tmp_path, monkeypatch):
+    from matplotlib.figure import Figure
+
+    calls = []
+    monkeypatch.setattr(Figure, 'tight_layout', lambda self, *a, **k: calls.append(self))
+    figure = spec(tmp_path)
+    render_figure(figure, 'draft')
+    assert calls == [] and os.path.exists(figure.path)
+    render_figure(figure, 'full')
+    assert len(calls) == 1
+
+
+def test_none_renders_nothing(tmp_path):
+    assert render_figures([spec(tmp_path)], mode='none', plots_dir=str(tmp_path)) == ([], [])
+    assert not os.path.exists(tmp_path / 'line.png')
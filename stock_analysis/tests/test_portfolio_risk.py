@@ -0,0 +1,75 @@
+"""PortfolioRisk against dense matrix algebra, and the portfolio report's symbol-indexed inputs."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from bist_risk.pipeline import calculate_returns_and_metrics
+from bist_risk.portfolio_risk import PortfolioRisk
+from bist_risk.reporting import create_correlation_matrix, create_portfolio_report
+
+
+def random_portfolio(n=6, seed=0):
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(0, 0.01, (n, n))
+    cov = factors @ factors.T + np.diag(rng.uniform(1e-5, 1e-4, n))
+    symbols = [f'S{i}.IS' for i in range(n)]
+    return PortfolioRisk(cov, symbols, rng.dirichlet(np.ones(n)), mean=rng.normal(0, 1e-3, n),
+                         sectors=['Banka', 'Sanayi', 'Banka', 'Enerji', 'Sanayi', 'Banka'][:n])
+
+
+def test_contributions_match_dense_algebra():
+    portfolio = random_portfolio()
+    w, cov = portfolio.weights, portfolio.cov
+    volatility = np.sqrt(w @ cov @ w)
+    assert portfolio.volatility == pytest.approx(volatility, rel=1e-12)
+    np.testing.assert_allclose(portfolio.marginal_contributions(), cov @ w / volatility, rtol=1e-12)
+    components = portfolio.component_contributions()
+    np.testing.assert_allclose(components, w * (cov @ w) / volatility, rtol=1e-12)
+    assert components.sum() == pytest.approx(volatility, rel=1e-12)
+    banks = [i for i, sector in enumerate(portfolio.sectors) if sector == 'Banka']
+    assert portfolio.sector_contributions()['Banka'] == pytest.approx((w[banks].sum(), components[banks].sum()))
+
+
+def test_rank_one_updates_match_a_rebuilt_portfolio():
+    portfolio = random_portfolio()
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        symbol = portfolio.symbols[rng.integers(len(portfolio.symbols))]
+        weight = rng.uniform(-0.2, 0.6)
+        what_if = portfolio.volatility_if(symbol, weight)
+        portfolio.update_weight(symbol, weight)
+        assert portfolio.volatility == pytest.approx(what_if, rel=1e-10)
+    rebuilt = PortfolioRisk(portfolio.cov, portfolio.symbols, portfolio.weights)
+    assert portfolio.variance == pytest.approx(rebuilt.variance, rel=1e-10)
+    np.testing.assert_allclose(portfolio.cov_w, rebuilt.cov_w, rtol=1e-10, atol=1e-15)
+    positions = np.arange(len(portfolio.symbols))
+    expected = [portfolio.volatility_if(symbol, 0.1) for symbol in portfolio.symbols]
+    np.testing.assert_allclose(portfolio.volatilities_if(positions, np.full(len(positions), 0.1)), expected)
+
+
+def test_portfolio_without_volatility_has_no_contributions():
+    portfolio = PortfolioRisk(np.zeros((2, 2)), ['A', 'B'], [0.5, 0.5])
+    assert np.isnan(portfolio.marginal_contributions()).all()
+    assert (portfolio.component_contributions() == 0).all()
+
+
+def test_report_uses_symbols_when_names_repeat(tmp_path):
+    rng = np.random.default_rng(2)
+    dates = pd.bdate_range('2023-01-02', periods=150, name='Date')
+    data = {symbol: pd.DataFrame({'Close': 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 150)))}, index=dates)
+            for symbol in ('AAA.IS', 'BBB.IS', 'CCC.IS')}
+    # Two share classes listed under one display name
+    universe = {'AAA.IS': {'name': 'Holding', 'sector': 'Holding'}, 'BBB.IS': {'name': 'Holding', 'sector': 'Holding'},
+                'CCC.IS': {'name': 'Banka', 'sector': 'Banka'}}
+    results = calculate_returns_and_metrics(data, universe)
+    correlation = create_correlation_matrix(results, path=str(tmp_path / 'correlation.csv'))
+    assert list(correlation.index) == list(results)
+    assert list(pd.read_csv(tmp_path / 'correlation.csv', index_col=0).index) == ['Holding', 'Holding', 'Banka']
+
+    path = tmp_path / 'portfolio.csv'
+    portfolio = create_portfolio_report(results, correlation, path=str(path), sector_path=None)
+    returns = np.column_stack([results[symbol].returns.to_numpy() for symbol in results])
+    cov = np.cov(returns, rowvar=False, ddof=0)
+    weights = np.full(3, 1 / 3)
+    assert portfolio.variance == pytest.approx(weights @ cov @ weights, rel=1e-6)
+    assert pd.read_csv(path)['Symbol'].tolist() == list(results)
@@ -0,0 +1,97 @@
+"""Columnar price store: round trips and rewrites underneath open readers."""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bist_risk import price_store
+from bist_risk.price_store import PriceStore
+
+FIELDS = ('Open', 'Close', 'Volume')
+
+
+def prices(n_bars=60, offset=0.0, seed=0):
+    """Two symbols; the second lists later and skips a few bars."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2024-01-02', periods=n_bars, name='Date').as_unit('ns')
+    data = {}
+    for i, symbol in enumerate(('A.IS', 'B.IS')):
+        close = offset + 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+        frame = pd.DataFrame({'Open': close * 0.99, 'Close': close, 'Volume': rng.integers(1, 100, n_bars) * 1.0},
+                             index=dates)
+        data[symbol] = frame if i == 0 else frame.iloc[10:].drop(frame.index[[20, 30]])
+    return data
+
+
+def store_files(path):
+    return sorted(name for name in os.listdir(path) if name.endswith('.npy'))
+
+
+def test_round_trip(tmp_path):
+    data = prices()
+    store = PriceStore.write(data, str(tmp_path), fields=FIELDS)
+    for symbol, frame in data.items():
+        pd.testing.assert_frame_equal(store.frame(symbol), frame, check_freq=False)
+    assert store.column('B.IS', start='2024-02-01').base is not None
+    pd.testing.assert_frame_equal(PriceStore(str(tmp_path)).frame('A.IS', '2024-01-10', '2024-01-20'),
+                                  data['A.IS'].loc['2024-01-10':'2024-01-20'], check_freq=False)
+
+
+def test_rewrite_swaps_generations_under_an_open_reader(tmp_path):
+    old = PriceStore.write(prices(), str(tmp_path), fields=FIELDS)
+    before = old.frame('A.IS').copy()
+
+    new_data = prices(n_bars=80, offset=50.0, seed=1)
+    new = PriceStore.write(new_data, str(tmp_path), fields=FIELDS)
+
+    # The open store still reads its own generation; a new one reads the rewrite
+    pd.testing.assert_frame_equal(old.frame('A.IS'), before)
+    pd.testing.assert_frame_equal(PriceStore(str(tmp_path)).frame('A.IS'), new_data['A.IS'], check_freq=False)
+    assert new.generation == old.generation + 1
+    assert store_files(tmp_path) == sorted(f'{name}.{new.generation}.npy' for name in ('dates',) + FIELDS)
+
+
+def test_files_in_use_are_removed_by_a_later_write(tmp_path, monkeypatch):
+    PriceStore.write(prices(), str(tmp_path), fields=FIELDS)
+
+    def locked(path):
+        raise PermissionError(path)
+
+    # As on Windows, where a memory-mapped file cannot be deleted
+    with monkeypatch.context() as patch:
+        patch.setattr(price_store.os, 'remove', locked)
+        second = PriceStore.write(prices(seed=2), str(tmp_path), fields=FIELDS)
+    assert len(store_files(tmp_path)) == 2 * (len(FIELDS) + 1)
+    pd.testing.assert_frame_equal(second.frame('A.IS'), prices(seed=2)['A.IS'], check_freq=False)
+
+    third = PriceStore.write(prices(seed=3), str(tmp_path), fields=FIELDS)
+    assert store_files(tmp_path) == sorted(f'{name}.{third.generation}.npy' for name in ('dates',) + FIELDS)
+
+
+def test_version_1_store_is_read_and_replaced(tmp_path):
+    data = prices()
+    store = PriceStore.write(data, str(tmp_path), fields=FIELDS)
+    # Lay the files out as a version 1 store
+    for name in store_files(tmp_path):
+        os.replace(tmp_path / name, tmp_path / name.replace(f'.{store.generation}.npy', '.npy'))
+    with open(tmp_path / 'meta.json', 'w', encoding='utf-8') as f:
+        json.dump({'version': 1, 'symbols': store.symbols, 'fields': list(FIELDS)}, f)
+    del store
+
+    legacy = PriceStore(str(tmp_path))
+    assert legacy.generation is None and legacy.interval == '1d'
+    pd.testing.assert_frame_equal(legacy.frame('B.IS'), data['B.IS'], check_freq=False)
+
+    rewritten = PriceStore.write(data, str(tmp_path), fields=FIELDS)
+    assert rewritten.generation == 1
+    assert store_files(tmp_path) == sorted(f'{name}.1.npy' for name in ('dates',) + FIELDS)
+
+
+def test_unknown_version_is_rejected(tmp_path):
+    PriceStore.write(prices(), str(tmp_path), fields=FIELDS)
+    with open(tmp_path / 'meta.json', 'w', encoding='utf-8') as f:
+        json.dump({'version': 99, 'symbols': [], 'fields': []}, f)
+    with pytest.raises(ValueError, match='sürümü'):
+        PriceStore(str(tmp_path))
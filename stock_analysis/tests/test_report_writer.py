@@ -0,0 +1,78 @@
+"""Incremental report regeneration gives the same files as a full render."""
+import json
+
+import pandas as pd
+import pytest
+
+from bist_risk.report_writer import ReportSection, write_report
+
+FORMATS = ('md', 'html', 'json')
+
+
+def report_model(label='BIST30', best_return=0.25, high_risk=('Petkim',)):
+    ranking = pd.DataFrame({'Symbol': ['PETKM.IS', 'AKBNK.IS'], 'Name': ['Petkim', 'Akbank'],
+                            'Risk_Category': ['Yüksek Risk', 'Düşük Risk'], 'Risk_Score': [0.9, float('nan')]})
+    return [
+        ReportSection('header', {'label': label, 'generated': '2024-06-03 10:00', 'start': '2020-01-01',
+                                 'end': '2024-06-01', 'interval': '1d', 'periods_per_year': 252, 'stocks': 2}),
+        ReportSection('summary', {'mean_annual_return': 0.12, 'mean_annual_volatility': 0.35,
+                                  'mean_sharpe_ratio': float('nan')}),
+        ReportSection('categories', {'categories': [{'category': 'Yüksek Risk', 'count': 1, 'percent': 50.0},
+                                                    {'category': 'Düşük Risk', 'count': 1, 'percent': 50.0}]}),
+        ReportSection('performance', {'annual_return': [{'name': 'Akbank', 'value': best_return,
+                                                         'category': 'Düşük Risk'}],
+                                      'sharpe_ratio': [{'name': 'Akbank', 'value': 0.8, 'category': 'Düşük Risk'}]}),
+        ReportSection('sectors', {'best_sector': {'sector': 'Bankacılık', 'annual_return': 0.2,
+                                                  'annual_volatility': 0.3, 'sharpe_ratio': 0.66}}),
+        ReportSection('warnings', {'high_risk': [{'name': name} for name in high_risk]}),
+        ReportSection('ranking', {'ranking': ranking}),
+        ReportSection('methodology', {'factors': [{'label': 'Yıllık Volatilite', 'weight': 1.0}]}),
+    ]
+
+
+def read_all(directory):
+    return {fmt: (directory / f'summary_report.{fmt}').read_text(encoding='utf-8') for fmt in FORMATS}
+
+
+def test_only_changed_sections_are_rendered_again(tmp_path):
+    incremental = tmp_path / 'incremental'
+    incremental.mkdir()
+    rendered, reused = write_report(report_model(), str(incremental / 'summary_report.md'), FORMATS)
+    assert reused == [] and len(rendered) == 8
+
+    changed = report_model(best_return=0.3, high_risk=('Petkim', 'Sasa <A>'))
+    rendered, reused = write_report(changed, str(incremental / 'summary_report.md'), FORMATS)
+    assert rendered == ['performance', 'warnings']
+    assert len(reused) == 6
+
+    full = tmp_path / 'full'
+    full.mkdir()
+    write_report(changed, str(full / 'summary_report.md'), FORMATS)
+    assert read_all(incremental) == read_all(full)
+
+
+def test_missing_fragment_is_rendered_again(tmp_path):
+    path = str(tmp_path / 'summary_report.md')
+    write_report(report_model(), path, ('md',))
+    (tmp_path / '.report_sections' / 'summary_report.summary.md').unlink()
+    rendered, _ = write_report(report_model(), path, ('md',))
+    assert rendered == ['summary']
+
+
+def test_formats(tmp_path):
+    write_report(report_model(high_risk=('Sasa <A>',)), str(tmp_path / 'summary_report.md'), FORMATS)
+    files = read_all(tmp_path)
+    assert files['md'].startswith('# BIST30 Risk Analizi Raporu\n')
+    assert 'Sasa &lt;A&gt;' in files['html'] and files['html'].endswith('</html>\n')
+    # Markdown has no ranking table; HTML and JSON do
+    assert 'PETKM.IS' not in files['md'] and 'PETKM.IS' in files['html']
+
+    report = json.loads(files['json'])
+    assert report['summary']['mean_sharpe_ratio'] is None
+    assert report['ranking'][1] == {'Symbol': 'AKBNK.IS', 'Name': 'Akbank', 'Risk_Category': 'Düşük Risk',
+                                    'Risk_Score': None}
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match='pdf'):
+        write_report(report_model(), str(tmp_path / 'summary_report.md'), ('md', 'pdf'))
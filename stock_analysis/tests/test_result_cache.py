@@ -0,0 +1,91 @@
+"""Content-hash keys, memoization and LRU eviction of ResultCache."""
+import os
+
+import numpy as np
+import pandas as pd
+
+from bist_risk.result_cache import MISSING, ResultCache, hash_frame, hash_value
+
+
+def test_keys_follow_content():
+    frame = pd.DataFrame({'Close': [1.0, 2.0]}, index=pd.bdate_range('2024-01-01', periods=2))
+    changed = frame.copy()
+    changed.iloc[1, 0] = 2.5
+    assert hash_frame(frame) == hash_frame(frame.copy())
+    assert hash_frame(frame) != hash_frame(changed)
+    assert hash_value(np.arange(3.0)) != hash_value(np.arange(3))
+    assert ResultCache.key('metrics', {'a': 1, 'b': 2}) == ResultCache.key('metrics', {'b': 2, 'a': 1})
+
+
+def test_memoize_computes_once(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    calls = []
+    compute = lambda: calls.append(1) or {'value': 42}
+    assert cache.memoize('k', compute) == {'value': 42}
+    assert cache.memoize('k', compute) == {'value': 42}
+    assert len(calls) == 1
+    # A new instance reads the entries on disk
+    assert ResultCache(str(tmp_path)).get('k') == {'value': 42}
+
+
+def test_memoize_recomputes_missing_outputs(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache'))
+    output = tmp_path / 'report.csv'
+    calls = []
+
+    def compute():
+        calls.append(1)
+        output.write_text('x')
+        return 'done'
+
+    cache.memoize('k', compute, outputs=[str(output)])
+    output.unlink()
+    cache.memoize('k', compute, outputs=[str(output)])
+    assert len(calls) == 2
+    assert output.exists()
+
+
+def test_disabled_cache_stores_nothing():
+    cache = ResultCache(None)
+    cache.set('k', 1)
+    assert cache.get('k') is MISSING
+    assert cache.stats()['entries'] == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    payload = b'x' * 1000
+    cache = ResultCache(str(tmp_path), max_bytes=2500)
+    cache.set('a', payload)
+    cache.set('b', payload)
+    assert cache.get('a') == payload
+    cache.set('c', payload)
+    assert cache.evictions == 1
+    assert cache.get('b') is MISSING
+    assert cache.get('a') == payload and cache.get('c') == payload
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.set('k', [1, 2, 3])
+    with open(os.path.join(str(tmp_path), 'k.pkl'), 'wb') as f:
+        f.write(b'not a pickle')
+    assert cache.get('k') is MISSING
+
+
+def test_memoize_rewrites_outputs_another_run_overwrote(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache'))
+    output = tmp_path / 'correlation_matrix.csv'
+
+    def compute(text):
+        output.write_text(text)
+        return text
+
+    cache.memoize('full', lambda: compute('full history'), outputs=[str(output)])
+    # A run over another date range writes the same file
+    cache.memoize('short', lambda: compute('short history'), outputs=[str(output)])
+    assert cache.memoize('full', lambda: compute('full history'), outputs=[str(output)]) == 'full history'
+    assert output.read_text() == 'full history'
+    # Unchanged since 'full' wrote it: served without running again
+    assert ResultCache(str(tmp_path / 'cache')).memoize('full', lambda: compute('again'), outputs=[str(output)]) \
+        == 'full history'
+    assert output.read_text() == 'full history'
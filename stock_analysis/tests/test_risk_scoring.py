@@ -0,0 +1,75 @@
+"""Vectorised risk scores against pandas ranking one date at a time."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from bist_risk.metrics_engine import compute_universe_metrics
+from bist_risk.risk_scoring import (FACTOR_SIGNS, RISK_BINS, RISK_CATEGORIES, factor_history, percentile_ranks,
+                                    risk_categories, risk_scores, risk_transitions, rolling_extreme_days)
+from bist_risk.rolling_metrics import rolling_moments
+
+WEIGHTS = {'Annual_Volatility': 0.3, 'Kurtosis': 0.2, 'Extreme_Days': 0.2, 'Max_Drawdown': 0.2, 'VaR_95': 0.1}
+
+
+def factor_array(n_dates=40, n_tickers=9, seed=0):
+    """Factors with ties (rounded values) and missing entries."""
+    rng = np.random.default_rng(seed)
+    factors = np.round(rng.normal(size=(n_dates, n_tickers, len(FACTOR_SIGNS))), 1)
+    factors[rng.random(factors.shape) < 0.05] = np.nan
+    return factors
+
+
+@pytest.mark.parametrize('method', ['dense', 'average'])
+def test_percentile_ranks_match_pandas(method):
+    values = factor_array()[:, :, 0]
+    expected = pd.DataFrame(values).rank(axis=1, method=method, pct=True).to_numpy()
+    np.testing.assert_allclose(percentile_ranks(values, method), expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize('method', ['dense', 'average'])
+def test_scores_match_ranking_each_date(method):
+    factors = factor_array()
+    scores = risk_scores(factors, WEIGHTS, method)
+    for t, snapshot in enumerate(factors):
+        frame = pd.DataFrame(snapshot * np.array(list(FACTOR_SIGNS.values())), columns=list(FACTOR_SIGNS))
+        frame = frame[~frame.isna().any(axis=1)]
+        expected = sum(frame[name].rank(method=method, pct=True) * weight for name, weight in WEIGHTS.items())
+        np.testing.assert_allclose(scores[t, frame.index], expected.to_numpy(), rtol=1e-12)
+        assert np.isnan(np.delete(scores[t], frame.index)).all()
+
+
+def test_categories_match_pd_cut_including_the_lowest_edge():
+    scores = np.array([0.0, 0.1, 0.33, 0.34, 0.66, 0.7, 1.0, np.nan, 1.2])
+    expected = pd.cut(scores, RISK_BINS, labels=list(RISK_CATEGORIES), include_lowest=True).codes
+    np.testing.assert_array_equal(risk_categories(scores), expected)
+
+
+def test_transitions_carry_the_last_known_category():
+    codes = np.array([[0, 1], [-1, 1], [2, 0], [2, 0]])
+    transitions = risk_transitions(['d0', 'd1', 'd2', 'd3'], ['A', 'B'], codes)
+    assert transitions.values.tolist() == [['d2', 'A', RISK_CATEGORIES[0], RISK_CATEGORIES[2]],
+                                           ['d2', 'B', RISK_CATEGORIES[1], RISK_CATEGORIES[0]]]
+
+
+def test_rolling_extreme_days_match_each_window():
+    returns = np.random.default_rng(1).standard_t(3, (200, 4)) * 0.02
+    moments = rolling_moments(returns, 30)
+    counts = rolling_extreme_days(returns, moments['mean'], moments['std'], 30)
+    for t in range(29, len(returns)):
+        window = returns[t - 29:t + 1]
+        z = (window - window.mean(axis=0)) / window.std(axis=0)
+        np.testing.assert_array_equal(counts[t], (np.abs(z) > 2).sum(axis=0))
+
+
+def test_factor_history_is_the_snapshot_of_each_window():
+    rng = np.random.default_rng(2)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (120, 5)), axis=0))
+    history = factor_history(prices, 60)
+    for t in (60, 90, 119):
+        # 61 prices give the window's 60 returns; the drawdown is over the window's 60 prices
+        snapshot = compute_universe_metrics(prices[t - 60:t + 1])
+        expected = [snapshot['annual_volatility'], snapshot['kurtosis'],
+                    snapshot['extreme_positive'] + snapshot['extreme_negative'], snapshot['max_drawdown'],
+                    snapshot['var_95']]
+        np.testing.assert_allclose(history[t].T, expected, rtol=1e-8)
+    assert np.isnan(history[:59]).all() and not np.isnan(history[60]).any()
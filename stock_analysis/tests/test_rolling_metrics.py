@@ -0,0 +1,84 @@
+"""Rolling window kernels against a naive computation on every window."""
+import numpy as np
+import pytest
+
+from bist_risk.drawdown import drawdown_stats
+from bist_risk.risk_scoring import factor_history
+from bist_risk.rolling_metrics import rolling_drawdown, rolling_max, rolling_moments, rolling_quantile
+
+
+def price_matrix(n_bars=300, n_cols=5, seed=0):
+    """Random-walk prices with scattered gaps, a late listing and a column without prices."""
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, (n_bars, n_cols)), axis=0))
+    prices[rng.random(prices.shape) < 0.1] = np.nan
+    prices[:40, 2] = np.nan
+    prices[:, -1] = np.nan
+    return prices
+
+
+def per_window(values, window, func):
+    """``func`` of every full trailing window, NaN before the first."""
+    out = np.full(values.shape, np.nan)
+    for t in range(window - 1, len(values)):
+        out[t] = func(values[t - window + 1:t + 1])
+    return out
+
+
+@pytest.mark.parametrize('n_bars, window', [(300, 20), (301, 60), (50, 50), (100, 7), (60, 1)])
+def test_max_drawdown_matches_drawdown_stats_per_window(n_bars, window):
+    prices = price_matrix(n_bars)
+    expected = per_window(prices, window, lambda block: drawdown_stats(block)['max_drawdown'])
+    np.testing.assert_allclose(rolling_drawdown(prices, window)[1], expected, rtol=1e-12)
+
+
+def test_peak_before_the_window_does_not_count():
+    # A crash from 200 to 100, then flat: once the peak leaves the window the drawdown is gone
+    prices = np.array([200.0, 100.0] + [100.0] * 8)[:, None]
+    max_drawdown = rolling_drawdown(prices, 3)[1][:, 0]
+    assert max_drawdown[2] == pytest.approx(-0.5)
+    assert np.all(max_drawdown[3:] == 0.0)
+
+
+def test_factor_history_drawdown_is_the_window_max_drawdown():
+    prices = price_matrix(200)
+    expected = per_window(prices, 30, lambda block: drawdown_stats(block)['max_drawdown'])
+    np.testing.assert_allclose(factor_history(prices, 30)[:, :, 3], expected, rtol=1e-12)
+
+
+def test_rolling_max_matches_naive():
+    prices = price_matrix(200)
+    expected = per_window(prices, 25, lambda block: np.where(np.isnan(block).all(axis=0), np.nan,
+                                                               np.nanmax(np.nan_to_num(block, nan=-np.inf), axis=0)))
+    np.testing.assert_array_equal(rolling_max(prices, 25)[24:], expected[24:])
+
+
+def test_rolling_moments_match_naive():
+    returns = np.diff(np.log(price_matrix(250)), axis=0)
+    moments = rolling_moments(returns, 40, min_periods=30)
+
+    def stats(block):
+        out = np.full((4, block.shape[1]), np.nan)
+        for j in range(block.shape[1]):
+            x = block[:, j][~np.isnan(block[:, j])]
+            if len(x) >= 30:
+                d = x - x.mean()
+                m2 = (d ** 2).mean()
+                out[:, j] = [x.mean(), np.sqrt(m2), (d ** 3).mean() / m2 ** 1.5, (d ** 4).mean() / m2 ** 2 - 3]
+        return out
+
+    expected = np.full((4,) + returns.shape, np.nan)
+    for t in range(39, len(returns)):
+        expected[:, t] = stats(returns[t - 39:t + 1])
+    for i, key in enumerate(('mean', 'std', 'skewness', 'kurtosis')):
+        np.testing.assert_allclose(moments[key], expected[i], rtol=1e-8, atol=1e-12, err_msg=key)
+
+
+def test_rolling_quantile_matches_nanpercentile():
+    returns = np.diff(np.log(price_matrix(250)), axis=0)
+
+    def percentile(block):
+        return [np.percentile(x[~np.isnan(x)], 5) if (~np.isnan(x)).sum() >= 45 else np.nan for x in block.T]
+
+    np.testing.assert_allclose(rolling_quantile(returns, 50, 5, min_periods=45),
+                               per_window(returns, 50, percentile), rtol=1e-12)
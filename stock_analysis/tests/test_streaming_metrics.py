@@ -0,0 +1,109 @@
+"""Streaming state against the batch metric engine, its size bound and saved-state round trips."""
+import json
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bist_risk.metrics_engine import compute_universe_metrics
+from bist_risk.streaming_metrics import TAIL_METRICS, StreamingRiskEngine, TickerState
+
+COMPARED = ('mean_return', 'std_return', 'skewness', 'kurtosis', 'max_drawdown', 'total_observations') + TAIL_METRICS
+
+
+def price_frame(n_bars, seed=0, volatility_change=False):
+    """Random-walk close prices; with ``volatility_change`` the second half is five times calmer."""
+    rng = np.random.default_rng(seed)
+    scale = np.full(n_bars, 0.02)
+    if volatility_change:
+        scale[n_bars // 2:] = 0.004
+    close = 100 * np.exp(np.cumsum(rng.standard_t(4, n_bars) * scale))
+    return pd.DataFrame({'Close': close}, index=pd.bdate_range('2015-01-01', periods=n_bars, name='Date'))
+
+
+def batch(data):
+    metrics = compute_universe_metrics(data['Close'].to_numpy()[:, None])
+    return {key: metrics[key][0].item() for key in COMPARED}
+
+
+def streamed(data, capacity):
+    state = TickerState(capacity)
+    for date, price in data['Close'].items():
+        state.update(price, date)
+    return state
+
+
+@pytest.mark.parametrize('volatility_change', [False, True])
+def test_matches_batch_metrics_within_capacity(volatility_change):
+    data = price_frame(1200, volatility_change=volatility_change)
+    metrics = streamed(data, 128).metrics()
+    expected = batch(data)
+    for key in COMPARED:
+        assert metrics[key] == pytest.approx(expected[key], rel=1e-9), key
+
+
+def test_state_size_is_bounded():
+    state = streamed(price_frame(3000), 64)
+    assert len(state.lower_tail) == len(state.upper_tail) == 64
+    assert state.n == 2999
+
+
+def test_overflowing_tails_are_nan_not_estimates():
+    data = price_frame(3000, seed=1)
+    metrics = streamed(data, 32).metrics()
+    # VaR 95 needs the lowest ~150 returns, more than 32 stored ones
+    assert math.isnan(metrics['var_95'])
+    assert math.isnan(metrics['extreme_negative'])
+    assert metrics['std_return'] == pytest.approx(batch(data)['std_return'])
+
+
+def test_results_recompute_overflowing_tails_from_history():
+    data = {'AKBNK.IS': price_frame(3000, seed=2)}
+    universe = {'AKBNK.IS': {'name': 'Akbank', 'sector': 'Bankacılık'}}
+    engine = StreamingRiskEngine({'AKBNK.IS': TickerState(32)})
+    engine.update_from_data(data)
+
+    assert math.isnan(engine.results(universe)['AKBNK.IS']['var_95'])
+    results = engine.results(universe, data)
+    assert engine.recomputed == ['AKBNK.IS']
+    expected = batch(data['AKBNK.IS'])
+    for key in TAIL_METRICS:
+        assert results['AKBNK.IS'][key] == pytest.approx(expected[key]), key
+
+
+def test_results_do_not_recompute_from_other_history():
+    data = price_frame(3000, seed=3)
+    engine = StreamingRiskEngine({'AKBNK.IS': TickerState(32)})
+    engine.update_from_data({'AKBNK.IS': data})
+    # A shorter loaded history has other returns than the state has seen
+    results = engine.results({'AKBNK.IS': {'name': 'Akbank', 'sector': 'Bankacılık'}}, {'AKBNK.IS': data.iloc[500:]})
+    assert engine.recomputed == []
+    assert math.isnan(results['AKBNK.IS']['var_95'])
+
+
+def test_resumed_state_matches_one_pass(tmp_path):
+    data = price_frame(800, seed=4)
+    path = str(tmp_path / 'state.json')
+    engine = StreamingRiskEngine()
+    engine.update_from_data({'AKBNK.IS': data.iloc[:500]})
+    engine.save(path)
+
+    resumed = StreamingRiskEngine.load(path)
+    # Replayed bars are skipped, only the 300 new ones are applied
+    assert resumed.update_from_data({'AKBNK.IS': data}) == 300
+    one_pass = streamed(data, resumed.states['AKBNK.IS'].capacity).metrics()
+    assert resumed.states['AKBNK.IS'].metrics() == pytest.approx(one_pass)
+
+
+def test_old_state_version_is_rebuilt(tmp_path):
+    path = tmp_path / 'state.json'
+    path.write_text(json.dumps({'version': 1, 'states': {'AKBNK.IS': {}}}), encoding='utf-8')
+    assert StreamingRiskEngine.load(str(path)).states == {}
+
+
+def test_state_of_another_interval_is_rejected(tmp_path):
+    path = str(tmp_path / 'state.json')
+    StreamingRiskEngine(periods_per_year=252).save(path)
+    with pytest.raises(ValueError):
+        StreamingRiskEngine.load(path, periods_per_year=24192)
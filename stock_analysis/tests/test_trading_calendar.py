@@ -0,0 +1,58 @@
+"""Missing-bar policies of the trading calendar and the metrics computed on it."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from bist_risk.metrics_engine import align_prices
+from bist_risk.trading_calendar import TradingCalendar
+
+DATES = pd.bdate_range('2024-01-01', periods=6, name='Date')
+
+
+def frame(dates, closes):
+    return pd.DataFrame({'Close': closes}, index=pd.DatetimeIndex(dates, name='Date'))
+
+
+@pytest.fixture
+def panel():
+    return {
+        # Full history
+        'AKBNK.IS': frame(DATES, [10.0, 11, 12, 13, 14, 15]),
+        # Listed on the third bar, missing the fifth
+        'SMRTG.IS': frame(DATES[[2, 3, 5]], [20.0, 21, 23]),
+        # Delisted after the fourth bar
+        'KOZAL.IS': frame(DATES[:4], [30.0, 31, 32, 33]),
+    }
+
+
+def test_offsets_and_coverage(panel):
+    calendar, offsets = TradingCalendar.with_offsets(data.index for data in panel.values())
+    assert calendar.dates.equals(DATES)
+    assert [offset.rows.tolist() for offset in offsets] == [[0, 1, 2, 3, 4, 5], [2, 3, 5], [0, 1, 2, 3]]
+    coverage = calendar.coverage(list(panel), offsets)
+    assert coverage['Missing_Bars'].tolist() == [0, 1, 0]
+    assert coverage['Delisted'].tolist() == [False, False, True]
+
+
+def test_gap_leaves_missing_bars_empty(panel):
+    _, symbols, prices = align_prices(panel)
+    column = prices[:, symbols.index('SMRTG.IS')]
+    np.testing.assert_array_equal(column, [np.nan, np.nan, 20, 21, np.nan, 23])
+
+
+def test_ffill_fills_only_inside_the_listing_window(panel):
+    _, symbols, prices = align_prices(panel, missing='ffill')
+    np.testing.assert_array_equal(prices[:, symbols.index('SMRTG.IS')], [np.nan, np.nan, 20, 21, 21, 23])
+    # Not listed before its first bar, not carried past its last one
+    np.testing.assert_array_equal(prices[:, symbols.index('KOZAL.IS')], [30, 31, 32, 33, np.nan, np.nan])
+
+
+def test_unknown_policy_is_rejected(panel):
+    with pytest.raises(ValueError):
+        align_prices(panel, missing='bfill')
+
+
+def test_offsets_reject_dates_outside_the_calendar():
+    calendar = TradingCalendar(DATES[:3])
+    with pytest.raises(ValueError):
+        calendar.offsets(DATES[2:4])
@@ -0,0 +1,91 @@
+"""Universe files: formats, sector hierarchies and ``PATH#NAME`` selection."""
+import json
+
+import pytest
+
+from bist_risk.universe import BIST30_SECTOR_PARENTS, BIST30_STOCKS, Universe, UniverseRegistry, load_universes
+
+
+def write_csv(path, rows, header='symbol,name,sector'):
+    path.write_text('\n'.join([header] + rows) + '\n', encoding='utf-8')
+    return str(path)
+
+
+def test_csv_without_universe_column_is_named_after_the_file(tmp_path):
+    path = write_csv(tmp_path / 'izleme.csv', ['AKBNK.IS,Akbank,Mali/Bankacılık', 'THYAO.IS,THY,Havacılık'])
+    universes = load_universes(path)
+    assert list(universes) == ['izleme']
+    universe = universes['izleme']
+    assert list(universe) == ['AKBNK.IS', 'THYAO.IS']
+    assert universe['AKBNK.IS'] == {'name': 'Akbank', 'sector': 'Bankacılık', 'sector_path': ('Mali', 'Bankacılık')}
+
+
+def test_csv_universe_column_splits_the_file(tmp_path):
+    path = write_csv(tmp_path / 'liste.csv', ['a,AKBNK.IS,Akbank,Banka', 'b,THYAO.IS,THY,Havacılık',
+                                               'a,GARAN.IS,Garanti,Banka'],
+                     header='universe,symbol,name,sector')
+    universes = load_universes(path)
+    assert {name: list(u) for name, u in universes.items()} == {'a': ['AKBNK.IS', 'GARAN.IS'], 'b': ['THYAO.IS']}
+
+
+def test_csv_without_symbol_column_is_rejected(tmp_path):
+    path = write_csv(tmp_path / 'bozuk.csv', ['AKBNK.IS,Akbank'], header='ticker,name')
+    with pytest.raises(ValueError, match='symbol'):
+        load_universes(path)
+
+
+def test_json_mapping_and_declared_parents(tmp_path):
+    path = tmp_path / 'mali.json'
+    path.write_text(json.dumps({'label': 'Mali', 'sector_parents': {'Bankacılık': 'Mali', 'Mali': 'Tümü'},
+                                'symbols': {'AKBNK.IS': {'name': 'Akbank', 'sector': 'Bankacılık'},
+                                            'XYZ.IS': {}}}), encoding='utf-8')
+    universe = load_universes(str(path))['mali']
+    assert universe.label == 'Mali'
+    assert universe['AKBNK.IS']['sector_path'] == ('Tümü', 'Mali', 'Bankacılık')
+    assert universe['XYZ.IS'] == {'name': 'XYZ.IS', 'sector': 'Diğer', 'sector_path': ('Diğer',)}
+
+
+def test_cyclic_parents_do_not_loop():
+    universe = Universe('x', {'A.IS': {'sector': 'B'}}, sector_parents={'B': 'C', 'C': 'B'})
+    assert universe['A.IS']['sector_path'] == ('C', 'B')
+
+
+@pytest.mark.parametrize('records', [
+    [{'symbol': 'AKBNK.IS'}, {'symbol': 'AKBNK.IS'}],
+    [{'symbol': 'AKBNK.IS'}, {'name': 'Adsız'}],
+])
+def test_invalid_records_are_rejected(tmp_path, records):
+    path = tmp_path / 'bozuk.json'
+    path.write_text(json.dumps(records), encoding='utf-8')
+    with pytest.raises(ValueError):
+        load_universes(str(path))
+
+
+def test_sector_levels_and_grouping():
+    universe = Universe('bist30', BIST30_STOCKS, sector_parents=BIST30_SECTOR_PARENTS)
+    assert universe.sector_of('AKBNK.IS') == 'Bankacılık'
+    assert universe.sector_of('AKBNK.IS', 0) == 'Mali'
+    assert universe.sector_of('AKBNK.IS', 5) == 'Bankacılık'
+    groups = universe.by_sector(0)
+    assert sorted(symbol for symbols in groups.values() for symbol in symbols) == sorted(BIST30_STOCKS)
+    assert groups['Mali'][0] == 'AKBNK.IS'
+
+
+def test_registry_selects_a_universe_with_path_and_name(tmp_path):
+    path = write_csv(tmp_path / 'liste.csv', ['a,AKBNK.IS,Akbank,Banka', 'b,THYAO.IS,THY,Havacılık'],
+                     header='universe,symbol,name,sector')
+    registry = UniverseRegistry(directory=str(tmp_path))
+    assert list(registry.get(f'{path}#b')) == ['THYAO.IS']
+    with pytest.raises(ValueError, match='birden fazla'):
+        registry.get(path)
+    with pytest.raises(ValueError, match='evreni yok'):
+        registry.get(f'{path}#c')
+
+
+def test_registry_finds_files_in_its_directory(tmp_path):
+    write_csv(tmp_path / 'izleme.csv', ['AKBNK.IS,Akbank,Banka'])
+    registry = UniverseRegistry(directory=str(tmp_path))
+    assert 'izleme' in registry.names()
+    assert list(registry.get('izleme')) == ['AKBNK.IS']
+    with pytest.raises(ValueError, match='Bilinmeyen'):
+        registry.get('yok')
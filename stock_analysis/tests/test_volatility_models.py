@@ -0,0 +1,114 @@
+"""Batched GARCH-family fits against a scalar recursion, finite differences and simulated data."""
+import numpy as np
+import pytest
+
+from bist_risk.volatility_models import (MODELS, fit_batch, fit_volatility_models, load_warm_start, log_likelihood,
+                                         save_warm_start)
+
+PARAMS = {'garch': [0.08, 0.9], 'gjr': [0.04, 0.08, 0.9], 'ewma': [0.94]}
+
+
+def simulate_gjr(n_days, n_cols, omega=0.02, alpha=0.04, gamma=0.08, beta=0.9, seed=0):
+    """GJR-GARCH(1,1) returns in percent; gamma=0 gives GARCH."""
+    rng = np.random.default_rng(seed)
+    returns = np.empty((n_days, n_cols))
+    variance = np.full(n_cols, omega / (1 - alpha - gamma / 2 - beta))
+    for t in range(n_days):
+        returns[t] = np.sqrt(variance) * rng.standard_normal(n_cols)
+        variance = omega + (alpha + gamma * (returns[t] < 0)) * returns[t] ** 2 + beta * variance
+    return returns
+
+
+def scalar_loglik(model, params, errors, backcast):
+    """One column's likelihood by a plain loop over its observed days."""
+    spec = MODELS[model]
+    omega, alpha, gamma, beta = spec['offset'] + spec['jacobian'] @ np.asarray(params)
+    omega *= backcast
+    variance, total = backcast, 0.0
+    for e in errors:
+        if e != e:
+            continue
+        total += -0.5 * (np.log(2 * np.pi) + np.log(variance) + e * e / variance)
+        variance = omega + (alpha + gamma * (e < 0)) * e * e + beta * variance
+    return total, variance
+
+
+def errors_and_backcast(n_days=300, n_cols=3, seed=0):
+    returns = simulate_gjr(n_days, n_cols, seed=seed)
+    returns[np.random.default_rng(seed + 1).random(returns.shape) < 0.05] = np.nan
+    errors = returns - np.nanmean(returns, axis=0)
+    return errors, np.nanmean(errors * errors, axis=0)
+
+
+@pytest.mark.parametrize('model', list(MODELS))
+def test_log_likelihood_matches_scalar_recursion(model):
+    errors, backcast = errors_and_backcast()
+    params = np.tile(PARAMS[model], (errors.shape[1], 1))
+    loglik, variance = log_likelihood(model, params, errors, backcast)
+    for j in range(errors.shape[1]):
+        expected_loglik, expected_variance = scalar_loglik(model, params[j], errors[:, j], backcast[j])
+        assert loglik[j] == pytest.approx(expected_loglik, rel=1e-12)
+        assert variance[j] == pytest.approx(expected_variance, rel=1e-12)
+
+
+@pytest.mark.parametrize('model', list(MODELS))
+def test_scores_match_finite_differences(model):
+    errors, backcast = errors_and_backcast()
+    params = np.tile(PARAMS[model], (errors.shape[1], 1))
+    _, _, gradient, outer = log_likelihood(model, params, errors, backcast, scores=True)
+    step = 1e-6
+    for i in range(params.shape[1]):
+        shifted = params.copy()
+        shifted[:, i] += step
+        up, _ = log_likelihood(model, shifted, errors, backcast)
+        shifted[:, i] -= 2 * step
+        down, _ = log_likelihood(model, shifted, errors, backcast)
+        np.testing.assert_allclose(gradient[:, i], (up - down) / (2 * step), rtol=1e-5, atol=1e-5)
+    # The BHHH matrix is a sum of outer products: symmetric positive semi-definite
+    np.testing.assert_allclose(outer, np.swapaxes(outer, 1, 2))
+    assert (np.linalg.eigvalsh(outer) > -1e-9).all()
+
+
+def test_fit_recovers_simulated_parameters():
+    returns = simulate_gjr(4000, 3, seed=3) / 100
+    fit = fit_batch('gjr', returns)
+    assert fit['converged'].all()
+    np.testing.assert_allclose(fit['params'].mean(axis=0), PARAMS['gjr'], atol=0.04)
+
+
+@pytest.mark.parametrize('model', list(MODELS))
+def test_fit_is_a_local_maximum_and_warm_start_stays_there(model):
+    returns = simulate_gjr(1500, 4, seed=4) / 100
+    fit = fit_batch(model, returns)
+    warm = fit_batch(model, returns, start=fit['params'])
+    assert (warm['iterations'] <= 1).all()
+    np.testing.assert_allclose(warm['loglik'], fit['loglik'], rtol=1e-7)
+    errors = (returns - returns.mean(axis=0)) * 100
+    backcast = (errors * errors).mean(axis=0)
+    best, _ = log_likelihood(model, fit['params'], errors, backcast)
+    for i in range(fit['params'].shape[1]):
+        for delta in (-0.005, 0.005):
+            moved = fit['params'].copy()
+            moved[:, i] += delta
+            inside = (moved >= MODELS[model]['lower']).all(axis=1) & (moved <= MODELS[model]['upper']).all(axis=1)
+            loglik, _ = log_likelihood(model, moved, errors, backcast)
+            assert (loglik[inside] <= best[inside] + 1e-6).all()
+
+
+def test_workers_do_not_change_the_fit():
+    returns = simulate_gjr(600, 6, seed=5) / 100
+    returns[:550, 2] = np.nan  # too short to fit
+    serial = fit_volatility_models('garch', returns)
+    parallel = fit_volatility_models('garch', returns, workers=2, chunk_size=2)
+    for key, values in serial.items():
+        np.testing.assert_array_equal(parallel[key], values, err_msg=key)
+    assert np.isnan(serial['params'][2]).all()
+
+
+def test_warm_start_round_trip(tmp_path):
+    path = str(tmp_path / 'vol.json')
+    save_warm_start(path, 'garch', ['A', 'B'], np.array([[0.05, 0.9], [np.nan, np.nan]]), '2024-01-02')
+    save_warm_start(path, 'ewma', ['A'], np.array([[0.94]]), '2024-01-02')
+    np.testing.assert_array_equal(load_warm_start(path, 'garch', ['B', 'A', 'C']),
+                                  [[np.nan, np.nan], [0.05, 0.9], [np.nan, np.nan]])
+    np.testing.assert_array_equal(load_warm_start(path, 'ewma', ['A']), [[0.94]])